@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from apps.blobs.models import ImageBlob
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ["name", "size", "ref_count", "created_at"]
+    search_fields = ["digest", "name"]
+    # Counts are maintained by BlobService; `manage.py image_blobs --recount` repairs them.
+    readonly_fields = ["digest", "name", "derivatives", "size", "ref_count", "created_at"]
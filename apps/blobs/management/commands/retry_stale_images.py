@@ -0,0 +1,64 @@
+"""Finish image uploads whose job was lost with the worker that queued it.
+
+Image jobs live only in the memory of the gunicorn worker that queued them
+(see core.images), so a restart or crash leaves their pictograms and profile
+pictures "processing" for good. This command picks up every row that has
+been processing for longer than `--older-than` minutes (or since before the
+timestamp existed) and processes its stored upload inline, leaving it
+"ready", or "failed" if the upload is gone or is not a valid image. Run it
+after each deploy, or from cron.
+
+    python manage.py retry_stale_images --older-than 15
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.pictograms.models import Pictogram
+from apps.pictograms.services import PictogramService
+from apps.users.models import User
+from apps.users.services import UserService
+from core.images import ImageStatus
+
+
+class Command(BaseCommand):
+    help = "Process pictograms and profile pictures left 'processing' by a lost image job."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than", type=float, default=15, help="Minutes a row must have been processing (default 15)."
+        )
+
+    def handle(self, *args, older_than, **options):
+        if older_than < 0:
+            raise CommandError("--older-than must not be negative.")
+        cutoff = timezone.now() - timedelta(minutes=older_than)
+
+        pictograms = Pictogram.objects.filter(
+            Q(processing_since__lte=cutoff) | Q(processing_since__isnull=True), status=ImageStatus.PROCESSING
+        )
+        users = User.objects.filter(
+            Q(profile_picture_processing_since__lte=cutoff) | Q(profile_picture_processing_since__isnull=True),
+            profile_picture_status=ImageStatus.PROCESSING,
+        )
+
+        ready = failed = 0
+        for pictogram in pictograms.order_by("id").iterator():
+            if PictogramService.retry_upload(pictogram):
+                ready += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Pictogram {pictogram.id}: upload is missing or not a valid image.")
+        for user in users.order_by("id").iterator():
+            if UserService.retry_profile_picture(user):
+                ready += 1
+            else:
+                failed += 1
+                self.stderr.write(f"User {user.id}: profile picture is missing or not a valid image.")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Retried {ready + failed} stale uploads: {ready} ready, {failed} failed.")
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Storage name of the original file', max_length=255, unique=True)),
+                ('derivatives', models.JSONField(blank=True, default=dict)),
+                ('size', models.PositiveBigIntegerField(default=0, help_text='Bytes stored: the original plus its derivatives')),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'image_blobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
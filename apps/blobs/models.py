@@ -0,0 +1,29 @@
+"""Content-addressed image blobs.
+
+Uploaded images are stored once per distinct picture, under a name derived
+from the SHA-256 of their decoded pixels (see core.images.verify_image), so
+the same standard pictogram uploaded by every organization takes the space
+of one. Pictograms and profile pictures point at a blob by its storage
+name; `ref_count` counts those references.
+"""
+
+from django.db import models
+
+
+class ImageBlob(models.Model):
+    """One stored image file (and its derivatives) shared by every upload of the same picture."""
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the original file")
+    # Stored names of resized copies, as on Pictogram.derivatives; empty for profile pictures.
+    derivatives = models.JSONField(default=dict, blank=True)
+    size = models.PositiveBigIntegerField(default=0, help_text="Bytes stored: the original plus its derivatives")
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "image_blobs"
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:
+        return self.name
@@ -0,0 +1,109 @@
+"""Business logic for content-addressed image storage.
+
+An upload is first stored under its model field's `upload_to` name. Once
+the image pool has decoded it, `BlobService.acquire()` turns that file into
+a reference to the blob with the same pixel digest: the first upload of a
+picture is copied to `blobs/<d[:2]>/<digest>.<ext>`, later ones are simply
+dropped. `BlobService.release()` gives a reference back and deletes the
+files once the last one is gone.
+
+Callers hold the blob's row lock (select_for_update) for the whole
+transaction, so a blob is never deleted while another upload is adopting it.
+"""
+
+import os
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import BigIntegerField, Count, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from apps.blobs.models import ImageBlob
+
+BLOB_PREFIX = "blobs"
+
+
+def blob_name(digest: str, extension: str) -> str:
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest}{extension.lower()}"
+
+
+def _derivative_names(derivatives: dict) -> list[str]:
+    return [name for formats in derivatives.values() for name in formats.values()]
+
+
+def _delete_files(names: list[str]) -> None:
+    for name in names:
+        default_storage.delete(name)
+
+
+def _delete_unless_recreated(name: str, names: list[str]) -> None:
+    # Blob names follow from the digest, so the same picture uploaded again may already own them.
+    if not ImageBlob.objects.filter(name=name).exists():
+        _delete_files(names)
+
+
+class BlobService:
+    @staticmethod
+    @transaction.atomic
+    def acquire(*, digest: str, upload: str) -> ImageBlob:
+        """Take a reference to the blob with this pixel digest, creating it from the stored file `upload`.
+
+        `upload` is removed either way: copied into a new blob, or dropped as a duplicate.
+        """
+        name = blob_name(digest, os.path.splitext(upload)[1])
+        # Two first uploads of a picture race on the unique digest; the loser waits for the
+        # winner's commit and takes a reference to its row instead of failing.
+        blob, created = ImageBlob.objects.select_for_update().get_or_create(digest=digest, defaults={"name": name})
+        if created:
+            # Only the row's creator writes its file. One left by an acquire that rolled back is replaced.
+            default_storage.delete(name)
+            with default_storage.open(upload, "rb") as original:
+                blob.name = default_storage.save(name, original)
+            blob.size = default_storage.size(blob.name)
+            ImageBlob.objects.filter(pk=blob.pk).update(name=blob.name, size=blob.size)
+        blob.ref_count += 1
+        ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+        transaction.on_commit(lambda: _delete_files([upload]))
+        return blob
+
+    @staticmethod
+    def set_derivatives(blob: ImageBlob, derivatives: dict[str, dict[str, str]]) -> None:
+        """Record derivatives written next to `blob.name`, counting their bytes in its size."""
+        blob.derivatives = derivatives
+        blob.size = default_storage.size(blob.name) + sum(
+            default_storage.size(n) for n in _derivative_names(derivatives)
+        )
+        ImageBlob.objects.filter(pk=blob.pk).update(derivatives=derivatives, size=blob.size)
+
+    @staticmethod
+    @transaction.atomic
+    def release(name: str, derivatives: dict | None = None) -> None:
+        """Drop a reference to the stored image `name`; its files are deleted once nothing references it.
+
+        A file that is not a blob (uploaded before blobs existed, or still being processed)
+        is deleted outright, along with the given `derivatives`. Files go after commit.
+        """
+        if not name:
+            return
+        blob = ImageBlob.objects.select_for_update().filter(name=name).first()
+        if blob is None:
+            names = [name, *_derivative_names(derivatives or {})]
+            transaction.on_commit(lambda: _delete_files(names))
+            return
+        if blob.ref_count > 1:
+            ImageBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") - 1)
+            return
+        names = [name, *_derivative_names(blob.derivatives)]
+        blob.delete()
+        transaction.on_commit(lambda: _delete_unless_recreated(name, names))
+
+    @staticmethod
+    def storage_report() -> dict[str, int]:
+        """Return blob and reference counts, bytes stored, and bytes saved by sharing blobs."""
+        duplicate_bytes = ExpressionWrapper(F("size") * (F("ref_count") - 1), output_field=BigIntegerField())
+        return ImageBlob.objects.aggregate(
+            blobs=Count("id"),
+            references=Coalesce(Sum("ref_count"), 0),
+            stored_bytes=Coalesce(Sum("size"), 0),
+            saved_bytes=Coalesce(Sum(duplicate_bytes, filter=Q(ref_count__gt=1)), 0),
+        )
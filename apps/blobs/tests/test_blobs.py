@@ -0,0 +1,289 @@
+"""Tests for content-addressed, reference-counted image storage."""
+
+import io
+from io import StringIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.blobs.models import ImageBlob
+from apps.blobs.services import BlobService
+from apps.organizations.models import Organization
+from apps.organizations.services import OrganizationService
+from apps.pictograms.models import Pictogram
+from apps.pictograms.services import PictogramService
+from apps.users.models import User
+from apps.users.services import UserService
+from apps.users.tests.factories import UserFactory
+from core.images import ImageStatus
+
+
+def _upload(color="red", filename="apple.png", compress_level=6) -> SimpleUploadedFile:
+    buf = io.BytesIO()
+    Image.new("RGB", (100, 100), color=color).save(buf, format="PNG", compress_level=compress_level)
+    return SimpleUploadedFile(filename, buf.getvalue(), content_type="image/png")
+
+
+def _files(root) -> set[str]:
+    return {str(path.relative_to(root)) for path in root.rglob("*") if path.is_file()}
+
+
+def _upload_pictogram(name="Apple", **kwargs) -> Pictogram:
+    pictogram = PictogramService.upload_pictogram(name=name, image=_upload(**kwargs))
+    pictogram.refresh_from_db()
+    return pictogram
+
+
+@pytest.mark.django_db
+class TestDeduplication:
+    def test_identical_uploads_share_one_blob(self, media_root, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            first = _upload_pictogram("Apple", filename="apple.png")
+            second = _upload_pictogram("Apple too", filename="other-name.png")
+
+        assert first.image.name == second.image.name
+        assert first.image.name.startswith("blobs/")
+        assert first.derivatives == second.derivatives
+        blob = ImageBlob.objects.get()
+        assert blob.ref_count == 2
+        # One original plus one 64px WebP and PNG; the uploads themselves are gone.
+        assert _files(media_root) == {blob.name, *(n for f in blob.derivatives.values() for n in f.values())}
+
+    def test_same_pixels_in_another_encoding_share_a_blob(self):
+        first = _upload_pictogram(compress_level=0)
+        second = _upload_pictogram(compress_level=9)
+
+        assert first.image.name == second.image.name
+
+    def test_different_pictures_get_their_own_blobs(self):
+        _upload_pictogram(color="red")
+        _upload_pictogram(color="blue")
+
+        assert ImageBlob.objects.count() == 2
+
+    def test_profile_pictures_share_blobs_with_pictograms(self):
+        pictogram = _upload_pictogram()
+        user = UserFactory()
+
+        UserService.upload_profile_picture(user_id=user.id, file=_upload())
+
+        user.refresh_from_db()
+        assert user.profile_picture.name == pictogram.image.name
+        assert ImageBlob.objects.get().ref_count == 2
+
+
+@pytest.mark.django_db
+class TestAcquireRace:
+    def test_losing_a_first_upload_race_shares_the_winners_blob(
+        self, media_root, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        from django.db.models import QuerySet
+
+        winner = _upload_pictogram()
+        digest, name = ImageBlob.objects.values_list("digest", "name").get()
+        ImageBlob.objects.all().delete()
+        get = QuerySet.get
+
+        def racing_get(queryset, *args, **kwargs):
+            # The other upload commits its row just after our lookup missed it.
+            monkeypatch.setattr(QuerySet, "get", get)
+            ImageBlob(digest=digest, name=name, ref_count=1).save()
+            raise ImageBlob.DoesNotExist
+
+        monkeypatch.setattr(QuerySet, "get", racing_get)
+        upload = default_storage.save("pictograms/late.png", _upload())
+
+        with django_capture_on_commit_callbacks(execute=True):
+            blob = BlobService.acquire(digest=digest, upload=upload)
+
+        assert (blob.name, blob.ref_count) == (winner.image.name, 2)
+        assert ImageBlob.objects.get().ref_count == 2
+        assert not (media_root / upload).exists()
+        assert (media_root / name).exists()
+
+    def test_file_left_by_a_rolled_back_acquire_is_replaced(self, media_root):
+        from django.core.files.base import ContentFile
+
+        first = _upload_pictogram()
+        ImageBlob.objects.all().delete()
+        default_storage.delete(first.image.name)
+        default_storage.save(first.image.name, ContentFile(b"partial"))
+
+        second = _upload_pictogram()
+
+        assert second.image.name == first.image.name
+        assert (media_root / second.image.name).read_bytes() != b"partial"
+
+    def test_released_blob_keeps_files_of_a_new_upload_of_the_same_picture(self, media_root):
+        from apps.blobs.services import _delete_unless_recreated
+
+        pictogram = _upload_pictogram()
+
+        # Deletion queued by the last release runs after the same picture was uploaded again.
+        _delete_unless_recreated(pictogram.image.name, [pictogram.image.name])
+
+        assert (media_root / pictogram.image.name).exists()
+
+
+@pytest.mark.django_db
+class TestRelease:
+    def test_blob_outlives_all_but_its_last_reference(self, media_root, django_capture_on_commit_callbacks):
+        first = _upload_pictogram()
+        second = _upload_pictogram()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PictogramService.delete_pictogram(pictogram_id=first.id)
+        assert (media_root / second.image.name).exists()
+        assert ImageBlob.objects.get().ref_count == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            PictogramService.delete_pictogram(pictogram_id=second.id)
+        assert not ImageBlob.objects.exists()
+        assert not (media_root / second.image.name).exists()
+        assert not (media_root / second.derivatives["64"]["webp"]).exists()
+
+    def test_replacing_a_profile_picture_releases_the_old_one(self, media_root, django_capture_on_commit_callbacks):
+        user = UserFactory()
+        UserService.upload_profile_picture(user_id=user.id, file=_upload(color="red"))
+        user.refresh_from_db()
+        old = user.profile_picture.name
+
+        with django_capture_on_commit_callbacks(execute=True):
+            UserService.upload_profile_picture(user_id=user.id, file=_upload(color="blue"))
+
+        assert not ImageBlob.objects.filter(name=old).exists()
+        assert not (media_root / old).exists()
+
+    def test_replacing_a_picture_still_processing_keeps_the_verified_one(
+        self, media_root, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        from apps.users import services
+
+        user = UserFactory()
+        UserService.upload_profile_picture(user_id=user.id, file=_upload(color="red"))
+        user.refresh_from_db()
+        verified = user.profile_picture.name
+        finishes = []
+        monkeypatch.setattr(services, "_finish_profile_picture", lambda *args: finishes.append(args))
+        UserService.upload_profile_picture(user_id=user.id, file=_upload(color="blue"))
+        first = User.objects.get(pk=user.id).profile_picture.name
+
+        with django_capture_on_commit_callbacks(execute=True):
+            UserService.upload_profile_picture(user_id=user.id, file=_upload(color="green"))
+        monkeypatch.undo()
+        with django_capture_on_commit_callbacks(execute=True):
+            services._finish_profile_picture(*finishes[0])  # The superseded upload is ignored.
+            services._finish_profile_picture(*finishes[1][:2], None, ValueError("corrupt"))
+
+        user.refresh_from_db()
+        assert (user.profile_picture.name, user.profile_picture_status) == (verified, ImageStatus.FAILED)
+        assert (media_root / verified).exists()
+        assert not (media_root / first).exists()
+        assert not (media_root / finishes[1][1]).exists()
+
+    def test_deleting_an_organization_releases_its_pictograms(self, django_capture_on_commit_callbacks):
+        org = Organization.objects.create(name="School")
+        PictogramService.upload_pictogram(name="Apple", image=_upload(), organization_id=org.id)
+        _upload_pictogram()  # A global copy keeps the blob alive.
+
+        with django_capture_on_commit_callbacks(execute=True):
+            OrganizationService.delete_organization(org_id=org.id)
+
+        assert ImageBlob.objects.get().ref_count == 1
+
+    def test_files_outside_blobs_are_deleted_outright(self, media_root, django_capture_on_commit_callbacks):
+        (media_root / "legacy.png").write_bytes(b"x")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            BlobService.release("legacy.png")
+
+        assert not (media_root / "legacy.png").exists()
+
+
+@pytest.mark.django_db
+class TestStorageReport:
+    def test_counts_bytes_saved_by_sharing(self):
+        for _ in range(3):
+            _upload_pictogram(color="red")
+        _upload_pictogram(color="blue")
+        red = ImageBlob.objects.get(ref_count=3)
+
+        report = BlobService.storage_report()
+
+        assert report["blobs"] == 2
+        assert report["references"] == 4
+        assert report["saved_bytes"] == 2 * red.size
+        assert report["stored_bytes"] == sum(ImageBlob.objects.values_list("size", flat=True))
+
+    def test_empty_report(self):
+        assert BlobService.storage_report() == {"blobs": 0, "references": 0, "stored_bytes": 0, "saved_bytes": 0}
+
+    def test_command_recounts_and_reports(self, django_capture_on_commit_callbacks):
+        kept = _upload_pictogram(color="red")
+        _upload_pictogram(color="red")
+        orphan = _upload_pictogram(color="blue")
+        Pictogram.objects.filter(pk=orphan.pk).delete()  # Bypasses the services, as the admin does.
+        out = StringIO()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("image_blobs", "--recount", stdout=out)
+
+        assert "0 blobs corrected, 1 unreferenced blobs deleted" in out.getvalue()
+        assert list(ImageBlob.objects.values_list("name", "ref_count")) == [(kept.image.name, 2)]
+        assert "Saved by deduplication" in out.getvalue()
+
+
+@pytest.mark.django_db
+class TestRetryStaleImages:
+    def _stale_pictogram(self, data: bytes, minutes=60, **kwargs) -> Pictogram:
+        from datetime import timedelta
+
+        from django.core.files.base import ContentFile
+        from django.utils import timezone
+
+        name = default_storage.save("pictograms/lost.png", ContentFile(data))
+        since = timezone.now() - timedelta(minutes=minutes)
+        return Pictogram.objects.create(
+            name="Lost", image=name, status=ImageStatus.PROCESSING, processing_since=since, **kwargs
+        )
+
+    def test_finishes_uploads_whose_job_was_lost(self, django_capture_on_commit_callbacks):
+        pictogram = self._stale_pictogram(_upload().read())
+        user = UserFactory()
+        picture = default_storage.save("profile_pictures/face.png", _upload(color="blue"))
+        # Processing since before the timestamp existed.
+        User.objects.filter(pk=user.pk).update(profile_picture=picture, profile_picture_status=ImageStatus.PROCESSING)
+        out = StringIO()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("retry_stale_images", stdout=out)
+
+        pictogram.refresh_from_db()
+        user.refresh_from_db()
+        assert (pictogram.status, pictogram.processing_since) == (ImageStatus.READY, None)
+        assert pictogram.image.name.startswith("blobs/")
+        assert pictogram.derivatives
+        assert user.profile_picture_status == ImageStatus.READY
+        assert user.profile_picture.name.startswith("blobs/")
+        assert "2 stale uploads: 2 ready, 0 failed" in out.getvalue()
+
+    def test_marks_unreadable_uploads_failed(self):
+        pictogram = self._stale_pictogram(b"not an image")
+        err = StringIO()
+
+        call_command("retry_stale_images", stdout=StringIO(), stderr=err)
+
+        pictogram.refresh_from_db()
+        assert (pictogram.status, pictogram.image.name) == (ImageStatus.FAILED, "")
+        assert f"Pictogram {pictogram.id}" in err.getvalue()
+
+    def test_leaves_recent_jobs_to_the_image_pool(self):
+        pictogram = self._stale_pictogram(_upload().read(), minutes=1)
+
+        call_command("retry_stale_images", "--older-than", "15", stdout=StringIO())
+
+        pictogram.refresh_from_db()
+        assert pictogram.status == ImageStatus.PROCESSING
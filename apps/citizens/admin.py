@@ -1,10 +1,11 @@
 from django.contrib import admin
 
 from apps.citizens.models import Citizen
+from core.etags import OrgDataAdminMixin
 
 
 @admin.register(Citizen)
-class CitizenAdmin(admin.ModelAdmin):
+class CitizenAdmin(OrgDataAdminMixin, admin.ModelAdmin):
     list_display = ["first_name", "last_name", "organization"]
     list_filter = ["organization"]
     search_fields = ["first_name", "last_name"]
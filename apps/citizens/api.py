@@ -1,13 +1,23 @@
 """Citizen API endpoints."""
 
+from django.http import HttpResponse, StreamingHttpResponse
 from ninja import Router
-from ninja.pagination import LimitOffsetPagination, paginate
-
-from apps.citizens.schemas import CitizenCreateIn, CitizenOut, CitizenUpdateIn
-from apps.citizens.services import CitizenService
+from ninja.pagination import paginate
+
+from apps.citizens.schemas import (
+    CitizenBulkCreateIn,
+    CitizenBulkCreateOut,
+    CitizenCreateIn,
+    CitizenOut,
+    CitizenUpdateIn,
+)
+from apps.citizens.services import EXPORT_FIELDS, CitizenService
 from apps.organizations.models import OrgRole
+from core.etags import check_etag
+from core.export import ExportFormat, stream_rows
+from core.pagination import CursorPagination
 from core.permissions import check_role_or_raise
-from core.schemas import ErrorOut
+from core.schemas import ErrorOut, RowErrorsOut
 
 router = Router(tags=["citizens"])
 
@@ -26,15 +36,43 @@ def create_citizen(request, org_id: int, payload: CitizenCreateIn):
     return 201, citizen
 
 
+@router.post(
+    "/organizations/{org_id}/citizens/bulk",
+    response={201: CitizenBulkCreateOut, 403: ErrorOut, 422: RowErrorsOut},
+)
+def bulk_create_citizens(request, org_id: int, payload: CitizenBulkCreateIn):
+    """Create up to 5000 citizens in one transaction. Requires membership.
+
+    Ids are returned in input order. If any row is invalid nothing is created,
+    and the 422 lists each invalid row by index.
+    """
+    check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
+    ids = CitizenService.bulk_create_citizens(org_id=org_id, citizens=[row.model_dump() for row in payload.citizens])
+    return 201, {"ids": ids}
+
+
 @router.get(
     "/organizations/{org_id}/citizens",
     response=list[CitizenOut],
 )
-@paginate(LimitOffsetPagination)
-def list_citizens(request, org_id: int):
-    """List citizens in an organization. Requires membership."""
+@paginate(CursorPagination)
+def list_citizens(request, response: HttpResponse, org_id: int, q: str | None = None):
+    """List citizens in an organization, optionally searching names with `q`. Requires membership."""
+    check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
+    check_etag(request, response, org_id)
+    return CitizenService.list_citizens(org_id, q=q)
+
+
+@router.get("/organizations/{org_id}/citizens/export", response={403: ErrorOut})
+def export_citizens(request, org_id: int, format: ExportFormat = "ndjson") -> StreamingHttpResponse:
+    """Stream every citizen in an organization, with grade ids, as NDJSON or CSV. Requires membership."""
     check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
-    return CitizenService.list_citizens(org_id)
+    return stream_rows(
+        CitizenService.export_citizens(org_id),
+        fields=EXPORT_FIELDS,
+        export_format=format,
+        filename=f"organization-{org_id}-citizens",
+    )
 
 
 # --- Citizen-scoped endpoints ---
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:37
+
+import unicodedata
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# PostgreSQL only: prefix (LIKE 'x%') indexes per org, and a trigram index for fuzzy matching.
+# SQLite cannot use an index for Django's LIKE ... ESCAPE, so it gets none.
+POSTGRES_INDEXES = [
+    "CREATE INDEX citizens_org_first_key_idx ON citizens (organization_id, first_name_key text_pattern_ops)",
+    "CREATE INDEX citizens_org_last_key_idx ON citizens (organization_id, last_name_key text_pattern_ops)",
+    "CREATE INDEX citizens_name_keys_trgm_idx ON citizens USING gin (first_name_key gin_trgm_ops, last_name_key gin_trgm_ops)",
+]
+INDEX_NAMES = ["citizens_org_first_key_idx", "citizens_org_last_key_idx", "citizens_name_keys_trgm_idx"]
+
+# A frozen copy of core.search.normalize_name as of this migration, so later
+# changes to the live function cannot change what this backfill writes.
+_FOLD = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ð": "d", "đ": "d", "ł": "l", "þ": "th"})
+
+
+def normalize_name(value):
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().translate(_FOLD).split())
+
+
+def fill_name_keys(apps, schema_editor):
+    Citizen = apps.get_model("citizens", "Citizen")
+    batch = []
+    for citizen in Citizen.objects.only("first_name", "last_name").iterator(chunk_size=2000):
+        citizen.first_name_key = normalize_name(citizen.first_name)
+        citizen.last_name_key = normalize_name(citizen.last_name)
+        batch.append(citizen)
+        if len(batch) == 2000:
+            Citizen.objects.bulk_update(batch, ["first_name_key", "last_name_key"])
+            batch = []
+    Citizen.objects.bulk_update(batch, ["first_name_key", "last_name_key"])
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        for sql in POSTGRES_INDEXES:
+            schema_editor.execute(sql)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in INDEX_NAMES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizens', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='citizen',
+            name='first_name_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='citizen',
+            name='last_name_key',
+            field=models.CharField(default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(fill_name_keys, migrations.RunPython.noop),
+        TrigramExtension(),  # A no-op off PostgreSQL.
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
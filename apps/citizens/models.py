@@ -5,12 +5,22 @@ Citizens are children with autism served by an organization.
 
 from django.db import models
 
+from core.search import normalize_name
+
 
 class Citizen(models.Model):
-    """A child with autism belonging to an organization."""
+    """A child with autism belonging to an organization.
+
+    `first_name_key` and `last_name_key` hold the normalized names that
+    search matches against. They are set on save() and by
+    `refresh_name_keys()` for bulk writes; their PostgreSQL indexes are
+    created in migration 0003.
+    """
 
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
+    first_name_key = models.CharField(max_length=255, default="", editable=False)
+    last_name_key = models.CharField(max_length=255, default="", editable=False)
     organization = models.ForeignKey(
         "organizations.Organization",
         on_delete=models.CASCADE,
@@ -25,3 +35,14 @@ class Citizen(models.Model):
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name}"
+
+    def refresh_name_keys(self) -> None:
+        self.first_name_key = normalize_name(self.first_name)
+        self.last_name_key = normalize_name(self.last_name)
+
+    def save(self, *args, **kwargs) -> None:
+        self.refresh_name_keys()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "first_name_key", "last_name_key"}
+        super().save(*args, **kwargs)
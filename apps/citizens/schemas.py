@@ -1,6 +1,8 @@
 """Pydantic schemas for citizens."""
 
-from ninja import Schema
+from ninja import Field, Schema
+
+BULK_CREATE_MAX_CITIZENS = 5000
 
 
 class CitizenCreateIn(Schema):
@@ -8,6 +10,14 @@ class CitizenCreateIn(Schema):
     last_name: str
 
 
+class CitizenBulkCreateIn(Schema):
+    citizens: list[CitizenCreateIn] = Field(..., min_length=1, max_length=BULK_CREATE_MAX_CITIZENS)
+
+
+class CitizenBulkCreateOut(Schema):
+    ids: list[int]
+
+
 class CitizenUpdateIn(Schema):
     first_name: str | None = None
     last_name: str | None = None
@@ -1,9 +1,21 @@
 """Business logic for citizen operations."""
 
+from collections.abc import Iterator
+from itertools import groupby
+
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.db.models import Q
 
 from apps.citizens.models import Citizen
-from core.exceptions import ResourceNotFoundError
+from apps.grades.models import Grade
+from core.etags import bump_org_data
+from core.exceptions import ResourceNotFoundError, RowValidationError
+from core.search import FUZZY_MIN_LENGTH, normalize_name
+
+BULK_CREATE_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = ["id", "first_name", "last_name", "grade_ids"]
 
 
 class CitizenService:
@@ -17,15 +29,78 @@ class CitizenService:
     @staticmethod
     @transaction.atomic
     def create_citizen(*, org_id: int, first_name: str, last_name: str) -> Citizen:
-        return Citizen.objects.create(
+        citizen = Citizen.objects.create(
             organization_id=org_id,
             first_name=first_name,
             last_name=last_name,
         )
+        bump_org_data(org_id)
+        return citizen
+
+    @staticmethod
+    @transaction.atomic
+    def bulk_create_citizens(*, org_id: int, citizens: list[dict[str, str]]) -> list[int]:
+        """Create all citizens or none; return their ids in input order.
+
+        Every row is validated before anything is written, so a bad row costs
+        no queries.
+
+        Raises:
+            RowValidationError: One or more rows are invalid; nothing was created.
+        """
+        objs = [Citizen(organization_id=org_id, **row) for row in citizens]
+        errors = []
+        for index, obj in enumerate(objs):
+            obj.refresh_name_keys()  # bulk_create() skips save()
+            try:
+                obj.clean_fields(exclude=["organization"])
+            except ValidationError as exc:
+                detail = "; ".join(f"{field}: {' '.join(msgs)}" for field, msgs in exc.message_dict.items())
+                errors.append({"index": index, "detail": detail})
+        if errors:
+            raise RowValidationError(f"{len(errors)} of {len(objs)} citizens are invalid.", errors)
+
+        created = Citizen.objects.bulk_create(objs, batch_size=BULK_CREATE_BATCH_SIZE)
+        bump_org_data(org_id)
+        return [citizen.id for citizen in created]
+
+    @staticmethod
+    def list_citizens(org_id: int, *, q: str | None = None):
+        """Return the org's citizens, narrowed to those whose names match `q` if given.
+
+        Every word of `q` must match the start of the first or last name, or
+        (from three letters on) be similar to a word in either; see core.search.
+        Accents and case are ignored.
+        """
+        citizens = Citizen.objects.filter(organization_id=org_id)
+        for term in normalize_name(q or "").split():
+            match = Q(first_name_key__startswith=term) | Q(last_name_key__startswith=term)
+            if len(term) >= FUZZY_MIN_LENGTH:
+                match |= Q(first_name_key__word_similar=term) | Q(last_name_key__word_similar=term)
+            citizens = citizens.filter(match)
+        return citizens
 
     @staticmethod
-    def list_citizens(org_id: int):
-        return Citizen.objects.filter(organization_id=org_id)
+    def export_citizens(org_id: int, *, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+        """Yield every citizen of the org with its grade ids, in id order, one chunk in memory at a time.
+
+        Citizens are read through a server-side cursor; each chunk's grade ids
+        come from one query on the grade membership table.
+        """
+        rows = (
+            Citizen.objects.filter(organization_id=org_id)
+            .order_by("id")
+            .values_list("id", "first_name", "last_name")
+            .iterator(chunk_size=chunk_size)
+        )
+        chunk: list[tuple] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                yield from _with_grade_ids(chunk)
+                chunk = []
+        if chunk:
+            yield from _with_grade_ids(chunk)
 
     @staticmethod
     def get_citizen(citizen_id: int) -> Citizen:
@@ -44,6 +119,7 @@ class CitizenService:
             update_fields.append("last_name")
         if update_fields:
             citizen.save(update_fields=update_fields)
+            bump_org_data(citizen.organization_id)
         return citizen
 
     @staticmethod
@@ -51,3 +127,20 @@ class CitizenService:
     def delete_citizen(*, citizen_id: int) -> None:
         citizen = CitizenService._get_citizen_or_raise(citizen_id)
         citizen.delete()
+        bump_org_data(citizen.organization_id)
+
+
+def _with_grade_ids(chunk: list[tuple]) -> Iterator[dict]:
+    links = (
+        Grade.citizens.through.objects.filter(citizen_id__in=[row[0] for row in chunk])
+        .order_by("citizen_id", "grade_id")
+        .values_list("citizen_id", "grade_id")
+    )
+    grade_ids = {citizen_id: [g for _, g in group] for citizen_id, group in groupby(links, key=lambda link: link[0])}
+    for citizen_id, first_name, last_name in chunk:
+        yield {
+            "id": citizen_id,
+            "first_name": first_name,
+            "last_name": last_name,
+            "grade_ids": grade_ids.get(citizen_id, []),
+        }
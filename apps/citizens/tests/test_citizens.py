@@ -189,3 +189,212 @@ class TestUpdateCitizenBothFields:
         data = response.json()
         assert data["first_name"] == "Bob"
         assert data["last_name"] == "Z"
+
+
+@pytest.mark.django_db
+class TestBulkCreateCitizens:
+    def _post(self, client, org, rows, user="member"):
+        return client.post(
+            f"/api/v1/organizations/{org.id}/citizens/bulk",
+            data={"citizens": rows},
+            content_type="application/json",
+            **auth_header(client, user),
+        )
+
+    def test_creates_all_and_returns_ids_in_input_order(self, client, org, member):
+        from apps.citizens.models import Citizen
+
+        rows = [{"first_name": f"Kid{n}", "last_name": "Z" if n % 2 else "A"} for n in range(1200)]
+        response = self._post(client, org, rows)
+
+        assert response.status_code == 201
+        ids = response.json()["ids"]
+        assert len(ids) == 1200
+        names = dict(Citizen.objects.filter(organization=org).values_list("id", "first_name"))
+        assert [names[i] for i in ids] == [row["first_name"] for row in rows]
+
+    def test_invalid_rows_are_reported_and_nothing_is_created(self, client, org, member):
+        from apps.citizens.models import Citizen
+
+        rows = [
+            {"first_name": "Alice", "last_name": "A"},
+            {"first_name": "", "last_name": "B"},
+            {"first_name": "Carl", "last_name": "C" * 256},
+        ]
+        response = self._post(client, org, rows)
+
+        assert response.status_code == 422
+        errors = response.json()["errors"]
+        assert [e["index"] for e in errors] == [1, 2]
+        assert errors[0]["detail"].startswith("first_name:")
+        assert errors[1]["detail"].startswith("last_name:")
+        assert not Citizen.objects.filter(organization=org).exists()
+
+    def test_checks_permission_once(self, client, org, member):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        rows = [{"first_name": f"Kid{n}", "last_name": "A"} for n in range(50)]
+        headers = auth_header(client, "member")
+        with CaptureQueriesContext(connection) as ctx:
+            client.post(
+                f"/api/v1/organizations/{org.id}/citizens/bulk",
+                data={"citizens": rows},
+                content_type="application/json",
+                **headers,
+            )
+
+        assert len([q for q in ctx.captured_queries if 'INSERT INTO "citizens"' in q["sql"]]) == 1
+        assert len([q for q in ctx.captured_queries if "memberships" in q["sql"]]) <= 1
+
+    def test_non_member_cannot_bulk_create(self, client, org, non_member):
+        response = self._post(client, org, [{"first_name": "Alice", "last_name": "A"}], user="outsider")
+
+        assert response.status_code == 403
+
+    def test_empty_list_is_rejected(self, client, org, member):
+        response = self._post(client, org, [])
+
+        assert response.status_code == 422
+
+
+@pytest.mark.django_db
+class TestExportCitizens:
+    @pytest.fixture
+    def roster(self, org):
+        from apps.citizens.models import Citizen
+        from apps.grades.models import Grade
+
+        citizens = [Citizen.objects.create(first_name=f"Kid{n}", last_name="Z", organization=org) for n in range(5)]
+        grade_a = Grade.objects.create(name="A", organization=org)
+        grade_b = Grade.objects.create(name="B", organization=org)
+        grade_a.citizens.add(citizens[0], citizens[1])
+        grade_b.citizens.add(citizens[1])
+        other = Organization.objects.create(name="Other")
+        Citizen.objects.create(first_name="Elsewhere", last_name="Y", organization=other)
+        return citizens, grade_a, grade_b
+
+    def _get(self, client, org, **params):
+        return client.get(f"/api/v1/organizations/{org.id}/citizens/export", params, **auth_header(client, "member"))
+
+    def test_ndjson_streams_every_citizen_with_grade_ids(self, client, org, member, roster):
+        import json
+
+        citizens, grade_a, grade_b = roster
+        response = self._get(client, org)
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        assert [row["id"] for row in rows] == [c.id for c in citizens]
+        assert rows[0]["grade_ids"] == [grade_a.id]
+        assert rows[1]["grade_ids"] == sorted([grade_a.id, grade_b.id])
+        assert rows[2]["grade_ids"] == []
+
+    def test_csv_has_header_and_space_separated_grade_ids(self, client, org, member, roster):
+        import csv
+        import io
+
+        citizens, grade_a, grade_b = roster
+        response = self._get(client, org, format="csv")
+
+        assert response["Content-Disposition"] == f'attachment; filename="organization-{org.id}-citizens.csv"'
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[0] == ["id", "first_name", "last_name", "grade_ids"]
+        assert rows[2] == [
+            str(citizens[1].id),
+            "Kid1",
+            "Z",
+            f"{min(grade_a.id, grade_b.id)} {max(grade_a.id, grade_b.id)}",
+        ]
+        assert len(rows) == 6
+
+    def test_csv_escapes_formula_cells(self, client, org, member):
+        import csv
+        import io
+
+        from apps.citizens.models import Citizen
+
+        Citizen.objects.create(first_name='=HYPERLINK("http://x")', last_name="-2+3", organization=org)
+        response = self._get(client, org, format="csv")
+
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert rows[1][1:3] == ['\'=HYPERLINK("http://x")', "'-2+3"]
+
+    def test_grade_ids_are_fetched_once_per_chunk(self, org, roster):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from apps.citizens.services import CitizenService
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = list(CitizenService.export_citizens(org.id, chunk_size=2))
+
+        assert len(rows) == 5
+        assert len([q for q in ctx.captured_queries if "grades_citizens" in q["sql"]]) == 3
+
+    def test_non_member_cannot_export(self, client, org, non_member):
+        response = client.get(f"/api/v1/organizations/{org.id}/citizens/export", **auth_header(client, "outsider"))
+
+        assert response.status_code == 403
+
+    def test_unknown_format_is_rejected(self, client, org, member):
+        assert self._get(client, org, format="xml").status_code == 422
+
+
+@pytest.mark.django_db
+class TestSearchCitizens:
+    @pytest.fixture
+    def citizens(self, org):
+        from apps.citizens.models import Citizen
+
+        names = [("Søren", "Jensen"), ("Sofie", "Hansen"), ("Anna", "Sørensen"), ("Peter", "Olsen"), ("Ali", "Bo")]
+        return {
+            first: Citizen.objects.create(first_name=first, last_name=last, organization=org) for first, last in names
+        }
+
+    def _search(self, client, org, q):
+        response = client.get(f"/api/v1/organizations/{org.id}/citizens", {"q": q}, **auth_header(client, "member"))
+        assert response.status_code == 200
+        return sorted(item["first_name"] for item in response.json()["items"])
+
+    def test_prefix_on_either_name_ignores_case_and_accents(self, client, org, member, citizens):
+        assert self._search(client, org, "so") == ["Anna", "Sofie", "Søren"]
+
+    def test_every_term_must_match(self, client, org, member, citizens):
+        assert self._search(client, org, "soren jen") == ["Søren"]
+
+    def test_fuzzy_match_tolerates_typos(self, client, org, member, citizens):
+        assert self._search(client, org, "jensem") == ["Søren"]
+
+    def test_short_terms_only_prefix_match(self, client, org, member, citizens):
+        assert self._search(client, org, "bo") == ["Ali"]
+
+    def test_other_orgs_are_not_searched(self, client, org, member, citizens):
+        from apps.citizens.models import Citizen
+
+        other = Organization.objects.create(name="Other")
+        Citizen.objects.create(first_name="Sofie", last_name="X", organization=other)
+
+        assert self._search(client, org, "sofie") == ["Sofie"]
+
+    def test_keys_follow_updates(self, client, org, member, citizens):
+        client.patch(
+            f"/api/v1/citizens/{citizens['Peter'].id}",
+            data={"last_name": "Østergård"},
+            content_type="application/json",
+            **auth_header(client, "member"),
+        )
+
+        assert self._search(client, org, "oster") == ["Peter"]
+
+    def test_bulk_created_citizens_are_searchable(self, client, org, member):
+        client.post(
+            f"/api/v1/organizations/{org.id}/citizens/bulk",
+            data={"citizens": [{"first_name": "Åse", "last_name": "Lund"}]},
+            content_type="application/json",
+            **auth_header(client, "member"),
+        )
+
+        assert self._search(client, org, "ase") == ["Åse"]
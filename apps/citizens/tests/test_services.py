@@ -11,3 +11,17 @@ class TestCitizenService:
     def test_get_citizen_nonexistent_raises(self):
         with pytest.raises(ResourceNotFoundError, match="Citizen 99999 not found"):
             CitizenService.get_citizen(99999)
+
+    def test_bulk_create_validates_before_writing(self, org):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from core.exceptions import RowValidationError
+
+        with CaptureQueriesContext(connection) as ctx, pytest.raises(RowValidationError) as exc:
+            CitizenService.bulk_create_citizens(
+                org_id=org.id, citizens=[{"first_name": "Ok", "last_name": "A"}, {"first_name": "", "last_name": ""}]
+            )
+
+        assert exc.value.errors[0]["index"] == 1
+        assert not [q for q in ctx.captured_queries if "INSERT" in q["sql"]]
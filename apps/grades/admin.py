@@ -1,10 +1,11 @@
 from django.contrib import admin
 
 from apps.grades.models import Grade
+from core.etags import OrgDataAdminMixin
 
 
 @admin.register(Grade)
-class GradeAdmin(admin.ModelAdmin):
+class GradeAdmin(OrgDataAdminMixin, admin.ModelAdmin):
     list_display = ["name", "organization"]
     list_filter = ["organization"]
     search_fields = ["name"]
@@ -1,13 +1,27 @@
 """Grade API endpoints."""
 
-from ninja import Router
-from ninja.pagination import LimitOffsetPagination, paginate
+from typing import Literal
 
-from apps.grades.schemas import GradeCitizenAssignIn, GradeCreateIn, GradeOut, GradeUpdateIn
+from django.http import HttpResponse
+from ninja import Router
+from ninja.pagination import paginate
+
+from apps.citizens.schemas import CitizenOut
+from apps.grades.schemas import (
+    GradeCitizenAssignIn,
+    GradeCreateIn,
+    GradeListOut,
+    GradeOut,
+    GradeRosterBatchIn,
+    GradeRosterBatchOut,
+    GradeUpdateIn,
+)
 from apps.grades.services import GradeService
 from apps.organizations.models import OrgRole
+from core.etags import check_etag
+from core.pagination import CursorPagination
 from core.permissions import check_role_or_raise
-from core.schemas import ErrorOut
+from core.schemas import ErrorOut, RowErrorsOut
 
 router = Router(tags=["grades"])
 
@@ -25,13 +39,34 @@ def create_grade(request, org_id: int, payload: GradeCreateIn):
 
 @router.get(
     "/organizations/{org_id}/grades",
-    response=list[GradeOut],
+    response=list[GradeListOut],
 )
-@paginate(LimitOffsetPagination)
-def list_grades(request, org_id: int):
-    """List grades in an organization. Requires membership."""
+@paginate(CursorPagination)
+def list_grades(request, response: HttpResponse, org_id: int, include: Literal["roster", "counts"] | None = None):
+    """List grades in an organization. Requires membership.
+
+    `include=counts` adds each grade's `citizen_count`; `include=roster` adds its `citizens`.
+    """
     check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
-    return GradeService.list_grades(org_id)
+    check_etag(request, response, org_id)
+    return GradeService.list_grades(org_id, include=include)
+
+
+@router.post(
+    "/organizations/{org_id}/grades/rosters",
+    response={200: GradeRosterBatchOut, 403: ErrorOut, 422: RowErrorsOut},
+)
+def apply_roster_operations(request, org_id: int, payload: GradeRosterBatchIn):
+    """Apply add/remove/replace operations to many grades in one transaction. Requires admin role.
+
+    Operations run in order. If any names a grade or citizen outside the
+    organization nothing is changed, and the 422 lists the bad operations by index.
+    """
+    check_role_or_raise(request.auth, org_id, OrgRole.ADMIN)
+    rosters = GradeService.apply_roster_operations(
+        org_id=org_id, operations=[op.model_dump() for op in payload.operations]
+    )
+    return 200, {"grades": [{"grade_id": g, "citizen_ids": ids} for g, ids in rosters.items()]}
 
 
 @router.patch(
@@ -69,6 +104,19 @@ def get_grade(request, grade_id: int):
     return 200, grade
 
 
+@router.get(
+    "/grades/{grade_id}/citizens",
+    response={200: list[CitizenOut], 403: ErrorOut, 404: ErrorOut},
+)
+@paginate(CursorPagination)
+def list_grade_citizens(request, response: HttpResponse, grade_id: int):
+    """List the citizens in a grade. Requires membership in the grade's org."""
+    grade = GradeService.get_grade(grade_id)
+    check_role_or_raise(request.auth, grade.organization_id, OrgRole.MEMBER)
+    check_etag(request, response, grade.organization_id)
+    return GradeService.list_grade_citizens(grade_id)
+
+
 @router.post(
     "/grades/{grade_id}/citizens",
     response={200: GradeOut, 400: ErrorOut, 403: ErrorOut, 404: ErrorOut},
@@ -1,6 +1,13 @@
 """Pydantic schemas for grades."""
 
-from ninja import Schema
+from typing import Literal
+
+from ninja import Field, Schema
+from pydantic import SerializerFunctionWrapHandler, model_serializer
+
+from apps.citizens.schemas import CitizenOut
+
+ROSTER_BATCH_MAX_OPERATIONS = 500
 
 
 class GradeCreateIn(Schema):
@@ -17,5 +24,44 @@ class GradeOut(Schema):
     organization_id: int
 
 
+class GradeListOut(GradeOut):
+    """A grade with what `include=` asked for; unrequested fields are omitted."""
+
+    citizen_count: int | None = None
+    citizens: list[CitizenOut] | None = None
+
+    @staticmethod
+    def resolve_citizens(obj) -> list | None:
+        return getattr(obj, "roster", None)
+
+    @model_serializer(mode="wrap")
+    def _omit_unrequested(self, handler: SerializerFunctionWrapHandler):
+        # Only these two: the page envelope's `count` and `next_cursor` stay even when null.
+        data = handler(self)
+        for name in ("citizen_count", "citizens"):
+            if data.get(name) is None:
+                data.pop(name, None)
+        return data
+
+
 class GradeCitizenAssignIn(Schema):
     citizen_ids: list[int]
+
+
+class GradeRosterOperationIn(Schema):
+    grade_id: int
+    op: Literal["add", "remove", "replace"]
+    citizen_ids: list[int]
+
+
+class GradeRosterBatchIn(Schema):
+    operations: list[GradeRosterOperationIn] = Field(..., min_length=1, max_length=ROSTER_BATCH_MAX_OPERATIONS)
+
+
+class GradeRosterOut(Schema):
+    grade_id: int
+    citizen_ids: list[int]
+
+
+class GradeRosterBatchOut(Schema):
+    grades: list[GradeRosterOut]
@@ -1,10 +1,14 @@
 """Business logic for grade operations."""
 
 from django.db import transaction
+from django.db.models import Count, Prefetch, Q
 
 from apps.citizens.models import Citizen
 from apps.grades.models import Grade
-from core.exceptions import BadRequestError, ResourceNotFoundError
+from core.etags import bump_org_data
+from core.exceptions import BadRequestError, ResourceNotFoundError, RowValidationError
+
+ROSTER_INSERT_BATCH_SIZE = 1000
 
 
 class GradeService:
@@ -30,11 +34,30 @@ class GradeService:
     @staticmethod
     @transaction.atomic
     def create_grade(*, name: str, org_id: int) -> Grade:
-        return Grade.objects.create(name=name, organization_id=org_id)
+        grade = Grade.objects.create(name=name, organization_id=org_id)
+        bump_org_data(org_id)
+        return grade
+
+    @staticmethod
+    def list_grades(org_id: int, *, include: str | None = None):
+        """Return the org's grades, with `citizen_count` ("counts") or a `roster` list ("roster") loaded.
+
+        Either costs one extra aggregate or one prefetch query per page, however many grades are listed.
+        """
+        grades = Grade.objects.filter(organization_id=org_id)
+        if include == "counts":
+            grades = grades.annotate(citizen_count=Count("citizens"))
+        elif include == "roster":
+            grades = grades.prefetch_related(
+                Prefetch(
+                    "citizens", queryset=Citizen.objects.order_by("first_name", "last_name", "id"), to_attr="roster"
+                )
+            )
+        return grades
 
     @staticmethod
-    def list_grades(org_id: int):
-        return Grade.objects.filter(organization_id=org_id)
+    def list_grade_citizens(grade_id: int):
+        return Citizen.objects.filter(grades__id=grade_id)
 
     @staticmethod
     @transaction.atomic
@@ -43,6 +66,7 @@ class GradeService:
         if name is not None:
             grade.name = name
             grade.save(update_fields=["name"])
+            bump_org_data(grade.organization_id)
         return grade
 
     @staticmethod
@@ -50,6 +74,7 @@ class GradeService:
     def delete_grade(*, grade_id: int) -> None:
         grade = GradeService._get_grade_or_raise(grade_id)
         grade.delete()
+        bump_org_data(grade.organization_id)
 
     @staticmethod
     @transaction.atomic
@@ -57,6 +82,7 @@ class GradeService:
         grade = GradeService._get_grade_or_raise(grade_id)
         GradeService._validate_citizens_belong_to_org(citizen_ids, grade.organization_id)
         grade.citizens.set(citizen_ids)
+        bump_org_data(grade.organization_id)
         return grade
 
     @staticmethod
@@ -65,6 +91,7 @@ class GradeService:
         grade = GradeService._get_grade_or_raise(grade_id)
         GradeService._validate_citizens_belong_to_org(citizen_ids, grade.organization_id)
         grade.citizens.add(*citizen_ids)
+        bump_org_data(grade.organization_id)
         return grade
 
     @staticmethod
@@ -73,4 +100,81 @@ class GradeService:
         grade = GradeService._get_grade_or_raise(grade_id)
         GradeService._validate_citizens_belong_to_org(citizen_ids, grade.organization_id)
         grade.citizens.remove(*citizen_ids)
+        bump_org_data(grade.organization_id)
         return grade
+
+    @staticmethod
+    @transaction.atomic
+    def apply_roster_operations(*, org_id: int, operations: list[dict]) -> dict[int, list[int]]:
+        """Apply add/remove/replace operations to many grades of one org, all or nothing.
+
+        Operations run in order, so several may target the same grade. Grades
+        and citizens are each validated with one query, the touched grades are
+        locked, and the net change is written to the link table with one
+        delete and a batched insert. Returns the final roster of each touched
+        grade, keyed by grade id in first-touched order.
+
+        Raises:
+            RowValidationError: Operations name grades or citizens outside this
+                organization; nothing was changed.
+        """
+        grade_ids = list(dict.fromkeys(op["grade_id"] for op in operations))
+        citizen_ids = {citizen_id for op in operations for citizen_id in op["citizen_ids"]}
+        found_grades = set(
+            Grade.objects.select_for_update()
+            .filter(id__in=grade_ids, organization_id=org_id)
+            .values_list("id", flat=True)
+        )
+        found_citizens = set(
+            Citizen.objects.filter(id__in=citizen_ids, organization_id=org_id).values_list("id", flat=True)
+        )
+
+        errors = []
+        for index, op in enumerate(operations):
+            if op["grade_id"] not in found_grades:
+                errors.append({"index": index, "detail": f"Grade {op['grade_id']} not found."})
+            invalid = set(op["citizen_ids"]) - found_citizens
+            if invalid:
+                errors.append(
+                    {"index": index, "detail": f"Citizens do not belong to this organization: {sorted(invalid)}"}
+                )
+        if errors:
+            raise RowValidationError(
+                f"{len({e['index'] for e in errors})} of {len(operations)} roster operations are invalid.", errors
+            )
+
+        link = Grade.citizens.through
+        before: dict[int, set[int]] = {grade_id: set() for grade_id in grade_ids}
+        for grade_id, citizen_id in link.objects.filter(grade_id__in=grade_ids).values_list("grade_id", "citizen_id"):
+            before[grade_id].add(citizen_id)
+
+        after = {grade_id: set(members) for grade_id, members in before.items()}
+        for op in operations:
+            members = after[op["grade_id"]]
+            if op["op"] == "add":
+                members.update(op["citizen_ids"])
+            elif op["op"] == "remove":
+                members.difference_update(op["citizen_ids"])
+            else:
+                after[op["grade_id"]] = set(op["citizen_ids"])
+
+        removed = Q()
+        for grade_id in grade_ids:
+            gone = before[grade_id] - after[grade_id]
+            if gone:
+                removed |= Q(grade_id=grade_id, citizen_id__in=gone)
+        if removed:
+            link.objects.filter(removed).delete()
+        link.objects.bulk_create(
+            [
+                link(grade_id=grade_id, citizen_id=citizen_id)
+                for grade_id in grade_ids
+                for citizen_id in sorted(after[grade_id] - before[grade_id])
+            ],
+            batch_size=ROSTER_INSERT_BATCH_SIZE,
+            # add_citizens() does not lock the grade, so a concurrent add may have inserted a link already.
+            ignore_conflicts=True,
+        )
+
+        bump_org_data(org_id)
+        return {grade_id: sorted(after[grade_id]) for grade_id in grade_ids}
@@ -237,3 +237,182 @@ class TestCrossOrgCitizenAssignment:
         )
         assert response.status_code == 200
         assert grade.citizens.count() == 2
+
+
+@pytest.mark.django_db
+class TestRosterOperations:
+    @pytest.fixture
+    def school(self, org):
+        citizens = [Citizen.objects.create(first_name=f"Kid{n}", last_name="Z", organization=org) for n in range(6)]
+        grades = [Grade.objects.create(name=f"Class {n}", organization=org) for n in range(3)]
+        grades[0].citizens.add(citizens[0], citizens[1])
+        grades[1].citizens.add(citizens[2])
+        return citizens, grades
+
+    def _post(self, client, org, operations, user="owner"):
+        return client.post(
+            f"/api/v1/organizations/{org.id}/grades/rosters",
+            data={"operations": operations},
+            content_type="application/json",
+            **auth_header(client, user),
+        )
+
+    def test_applies_operations_in_order(self, client, org, owner, school):
+        c, g = school
+        response = self._post(
+            client,
+            org,
+            [
+                {"grade_id": g[0].id, "op": "remove", "citizen_ids": [c[0].id]},
+                {"grade_id": g[1].id, "op": "replace", "citizen_ids": [c[0].id, c[3].id]},
+                {"grade_id": g[2].id, "op": "add", "citizen_ids": [c[4].id, c[5].id]},
+                {"grade_id": g[2].id, "op": "remove", "citizen_ids": [c[5].id]},
+            ],
+        )
+
+        assert response.status_code == 200
+        assert response.json()["grades"] == [
+            {"grade_id": g[0].id, "citizen_ids": [c[1].id]},
+            {"grade_id": g[1].id, "citizen_ids": sorted([c[0].id, c[3].id])},
+            {"grade_id": g[2].id, "citizen_ids": [c[4].id]},
+        ]
+        assert set(g[1].citizens.values_list("id", flat=True)) == {c[0].id, c[3].id}
+        assert list(g[2].citizens.values_list("id", flat=True)) == [c[4].id]
+
+    def test_link_added_concurrently_is_not_an_error(self, client, org, owner, school, monkeypatch):
+        c, g = school
+        link_objects = Grade.citizens.through.objects
+        bulk_create = link_objects.bulk_create
+
+        def racing_bulk_create(objs, **kwargs):
+            g[2].citizens.add(c[4])  # A single-grade add that committed after the roster was read.
+            return bulk_create(objs, **kwargs)
+
+        monkeypatch.setattr(link_objects, "bulk_create", racing_bulk_create)
+        response = self._post(client, org, [{"grade_id": g[2].id, "op": "add", "citizen_ids": [c[4].id, c[5].id]}])
+
+        assert response.status_code == 200
+        assert set(g[2].citizens.values_list("id", flat=True)) == {c[4].id, c[5].id}
+
+    def test_writes_in_bulk(self, client, org, owner, school):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        c, g = school
+        operations = [{"grade_id": grade.id, "op": "replace", "citizen_ids": [x.id for x in c]} for grade in g]
+        headers = auth_header(client, "owner")
+        with CaptureQueriesContext(connection) as ctx:
+            client.post(
+                f"/api/v1/organizations/{org.id}/grades/rosters",
+                data={"operations": operations},
+                content_type="application/json",
+                **headers,
+            )
+
+        link_writes = [q for q in ctx.captured_queries if "grades_citizens" in q["sql"] and "SELECT" not in q["sql"]]
+        assert len(link_writes) == 1  # nothing to delete; one batched insert
+        assert Grade.citizens.through.objects.count() == 18
+
+    def test_invalid_operations_change_nothing(self, client, org, owner, school):
+        c, g = school
+        other_org = Organization.objects.create(name="Other School")
+        foreign_grade = Grade.objects.create(name="Theirs", organization=other_org)
+        foreign_citizen = Citizen.objects.create(first_name="Eve", last_name="F", organization=other_org)
+
+        response = self._post(
+            client,
+            org,
+            [
+                {"grade_id": g[0].id, "op": "replace", "citizen_ids": []},
+                {"grade_id": foreign_grade.id, "op": "add", "citizen_ids": [c[0].id]},
+                {"grade_id": g[1].id, "op": "add", "citizen_ids": [foreign_citizen.id]},
+            ],
+        )
+
+        assert response.status_code == 422
+        assert [e["index"] for e in response.json()["errors"]] == [1, 2]
+        assert g[0].citizens.count() == 2
+
+    def test_member_cannot_apply(self, client, org, member, school):
+        c, g = school
+        response = self._post(client, org, [{"grade_id": g[0].id, "op": "add", "citizen_ids": []}], user="member")
+
+        assert response.status_code == 403
+
+    def test_unknown_op_is_rejected(self, client, org, owner, school):
+        c, g = school
+        response = self._post(client, org, [{"grade_id": g[0].id, "op": "merge", "citizen_ids": []}])
+
+        assert response.status_code == 422
+
+
+@pytest.mark.django_db
+class TestGradeRosterReads:
+    @pytest.fixture
+    def school(self, org):
+        citizens = [Citizen.objects.create(first_name=f"Kid{n}", last_name="Z", organization=org) for n in range(4)]
+        grades = [Grade.objects.create(name=f"Class {n}", organization=org) for n in range(3)]
+        grades[0].citizens.add(*citizens)
+        grades[1].citizens.add(citizens[1])
+        return citizens, grades
+
+    def _list(self, client, org, **params):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        headers = auth_header(client, "member")
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(f"/api/v1/organizations/{org.id}/grades", params, **headers)
+        return response, len([q for q in ctx.captured_queries if '"grades' in q["sql"]])
+
+    def test_grade_citizens_are_paginated(self, client, org, member, school):
+        citizens, grades = school
+        headers = auth_header(client, "member")
+        response = client.get(f"/api/v1/grades/{grades[0].id}/citizens?limit=3", **headers)
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["count"] == 4
+        assert [c["id"] for c in body["items"]] == [c.id for c in citizens[:3]]
+
+    def test_grade_citizens_requires_membership(self, client, org, non_member, school):
+        citizens, grades = school
+        response = client.get(f"/api/v1/grades/{grades[0].id}/citizens", **auth_header(client, "outsider"))
+
+        assert response.status_code == 403
+
+    def test_plain_list_omits_optional_fields(self, client, org, member, school):
+        response, _ = self._list(client, org)
+
+        assert set(response.json()["items"][0]) == {"id", "name", "organization_id"}
+
+    def test_page_envelope_keeps_null_fields(self, client, org, member, school):
+        response, _ = self._list(client, org, include="counts", count="none")
+
+        body = response.json()
+        assert body["count"] is None
+        assert body["next_cursor"] is None
+        assert "citizen_count" in body["items"][0]
+
+    def test_counts(self, client, org, member, school):
+        response, _ = self._list(client, org, include="counts")
+
+        assert [g["citizen_count"] for g in response.json()["items"]] == [4, 1, 0]
+
+    def test_roster(self, client, org, member, school):
+        citizens, _ = school
+        response, _ = self._list(client, org, include="roster")
+
+        rosters = [[c["id"] for c in g["citizens"]] for g in response.json()["items"]]
+        assert rosters == [[c.id for c in citizens], [citizens[1].id], []]
+
+    @pytest.mark.parametrize("include", ["counts", "roster"])
+    def test_query_count_does_not_grow_with_grades(self, client, org, member, school, include):
+        _, few = self._list(client, org, include=include)
+        for n in range(10):
+            grade = Grade.objects.create(name=f"Extra {n}", organization=org)
+            grade.citizens.add(*school[0])
+
+        _, many = self._list(client, org, include=include)
+
+        assert many == few == {"counts": 1, "roster": 2}[include]
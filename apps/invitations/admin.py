@@ -1,10 +1,11 @@
 from django.contrib import admin
 
 from apps.invitations.models import Invitation
+from core.etags import OrgDataAdminMixin
 
 
 @admin.register(Invitation)
-class InvitationAdmin(admin.ModelAdmin):
+class InvitationAdmin(OrgDataAdminMixin, admin.ModelAdmin):
     list_display = ["receiver", "organization", "sender", "status", "created_at"]
     list_filter = ["status", "organization"]
     search_fields = ["receiver__username", "sender__username", "organization__name"]
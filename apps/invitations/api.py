@@ -8,12 +8,13 @@ Two routers:
 
 from ninja import Router
 from ninja.errors import HttpError
-from ninja.pagination import LimitOffsetPagination, paginate
-from ninja_jwt.authentication import JWTAuth
+from ninja.pagination import paginate
 
 from apps.invitations.schemas import InvitationCreateIn, InvitationOut
 from apps.invitations.services import InvitationService
 from apps.organizations.models import OrgRole
+from core.authentication import GirafJWTAuth
+from core.pagination import CursorPagination
 from core.permissions import check_role_or_raise
 from core.schemas import ErrorOut
 from core.throttling import InvitationSendRateThrottle
@@ -30,7 +31,7 @@ receiver_router = Router(tags=["Invitations"])
 @org_router.post(
     "/{org_id}/invitations",
     response={201: InvitationOut, 400: ErrorOut, 403: ErrorOut, 404: ErrorOut, 409: ErrorOut},
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
     throttle=[InvitationSendRateThrottle()],
 )
 def send_invitation(request, org_id: int, payload: InvitationCreateIn):
@@ -50,9 +51,9 @@ def send_invitation(request, org_id: int, payload: InvitationCreateIn):
 @org_router.get(
     "/{org_id}/invitations",
     response=list[InvitationOut],
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
-@paginate(LimitOffsetPagination)
+@paginate(CursorPagination)
 def list_org_invitations(request, org_id: int):
     check_role_or_raise(request.auth, org_id, OrgRole.ADMIN)
     return InvitationService.list_for_org(org_id)
@@ -66,7 +67,7 @@ def list_org_invitations(request, org_id: int):
 @org_router.delete(
     "/{org_id}/invitations/{invitation_id}",
     response={204: None, 403: ErrorOut, 404: ErrorOut},
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
 def delete_invitation(request, org_id: int, invitation_id: int):
     check_role_or_raise(request.auth, org_id, OrgRole.ADMIN)
@@ -85,9 +86,9 @@ def delete_invitation(request, org_id: int, invitation_id: int):
 @receiver_router.get(
     "/received",
     response=list[InvitationOut],
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
-@paginate(LimitOffsetPagination)
+@paginate(CursorPagination)
 def list_received_invitations(request):
     return InvitationService.list_received(request.auth)
 
@@ -100,7 +101,7 @@ def list_received_invitations(request):
 @receiver_router.post(
     "/{invitation_id}/accept",
     response={200: InvitationOut, 400: ErrorOut, 403: ErrorOut, 404: ErrorOut},
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
 def accept_invitation(request, invitation_id: int):
     inv = InvitationService.get_invitation(invitation_id)
@@ -117,7 +118,7 @@ def accept_invitation(request, invitation_id: int):
 @receiver_router.post(
     "/{invitation_id}/reject",
     response={200: InvitationOut, 400: ErrorOut, 403: ErrorOut, 404: ErrorOut},
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
 def reject_invitation(request, invitation_id: int):
     inv = InvitationService.get_invitation(invitation_id)
@@ -5,7 +5,9 @@ from django.db import IntegrityError, transaction
 
 from apps.invitations.models import Invitation, InvitationStatus
 from apps.organizations.models import Membership, OrgRole
+from core.etags import bump_org_data
 from core.exceptions import BadRequestError, DuplicateInvitationError, InvitationSendError, ResourceNotFoundError
+from core.permissions import get_membership_or_none, invalidate_memberships
 
 User = get_user_model()
 
@@ -36,7 +38,7 @@ class InvitationService:
         except (User.DoesNotExist, User.MultipleObjectsReturned):
             raise InvitationSendError("Cannot send invitation.")
 
-        if Membership.objects.filter(user=receiver, organization_id=org_id).exists():
+        if get_membership_or_none(receiver, org_id) is not None:
             raise InvitationSendError("Cannot send invitation.")
 
         try:
@@ -47,12 +49,13 @@ class InvitationService:
             )
         except IntegrityError:
             raise DuplicateInvitationError("Pending invitation already exists.")
+        bump_org_data(org_id)
 
         return Invitation.objects.select_related("organization", "sender", "receiver").get(id=inv.id)
 
     @staticmethod
     def list_received(user):
-        return Invitation.objects.filter(receiver=user, status=InvitationStatus.PENDING).select_related(
+        return Invitation.objects.filter(receiver_id=user.id, status=InvitationStatus.PENDING).select_related(
             "organization", "sender", "receiver"
         )
 
@@ -75,8 +78,10 @@ class InvitationService:
             organization=invitation.organization,
             defaults={"role": OrgRole.MEMBER},
         )
+        invalidate_memberships(user_ids=(invitation.receiver_id,))
         invitation.status = InvitationStatus.ACCEPTED
         invitation.save(update_fields=["status"])
+        bump_org_data(invitation.organization_id)
         return invitation
 
     @staticmethod
@@ -86,9 +91,11 @@ class InvitationService:
             raise BadRequestError("Invitation is no longer pending.")
         invitation.status = InvitationStatus.REJECTED
         invitation.save(update_fields=["status"])
+        bump_org_data(invitation.organization_id)
         return invitation
 
     @staticmethod
     def delete(*, invitation_id: int) -> None:
         invitation = InvitationService._get_invitation_or_raise(invitation_id)
         invitation.delete()
+        bump_org_data(invitation.organization_id)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
 from apps.organizations.models import Membership, Organization
+from core.etags import OrgDataAdminMixin, bump_org_data
+from core.permissions import invalidate_memberships
 
 
 class MembershipInline(admin.TabularInline):
@@ -14,9 +16,42 @@ class OrganizationAdmin(admin.ModelAdmin):
     search_fields = ["name"]
     inlines = [MembershipInline]
 
+    # Admin edits bypass the services, so invalidate cached roles and ETags here too.
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_memberships(org_id=form.instance.id)
+        bump_org_data(form.instance.id)
+
+    def delete_model(self, request, obj):
+        org_id = obj.id
+        super().delete_model(request, obj)
+        invalidate_memberships(org_id=org_id)
+        bump_org_data(org_id)
+
+    def delete_queryset(self, request, queryset):
+        org_ids = list(queryset.values_list("id", flat=True))
+        super().delete_queryset(request, queryset)
+        for org_id in org_ids:
+            invalidate_memberships(org_id=org_id)
+        bump_org_data(*org_ids)
+
 
 @admin.register(Membership)
-class MembershipAdmin(admin.ModelAdmin):
+class MembershipAdmin(OrgDataAdminMixin, admin.ModelAdmin):
     list_display = ["user", "organization", "role", "joined_at"]
     list_filter = ["role"]
     search_fields = ["user__username", "organization__name"]
+
+    # Admin edits bypass the services, so invalidate cached roles here too.
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        invalidate_memberships(user_ids=(obj.user_id,))
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        invalidate_memberships(user_ids=(obj.user_id,))
+
+    def delete_queryset(self, request, queryset):
+        user_ids = tuple(queryset.values_list("user_id", flat=True))
+        super().delete_queryset(request, queryset)
+        invalidate_memberships(user_ids=user_ids)
@@ -1,11 +1,14 @@
 """Organization API endpoints."""
 
+from django.http import HttpResponse
 from ninja import Router
-from ninja.pagination import LimitOffsetPagination, paginate
+from ninja.pagination import paginate
 
 from apps.organizations.models import OrgRole
 from apps.organizations.schemas import MemberOut, MemberRoleUpdateIn, OrgCreateIn, OrgOut, OrgUpdateIn
 from apps.organizations.services import OrganizationService
+from core.etags import check_etag
+from core.pagination import CursorPagination
 from core.permissions import check_role_or_raise
 from core.schemas import ErrorOut
 
@@ -20,16 +23,17 @@ def create_organization(request, payload: OrgCreateIn):
 
 
 @router.get("", response=list[OrgOut])
-@paginate(LimitOffsetPagination)
+@paginate(CursorPagination)
 def list_organizations(request):
     """List organizations the current user belongs to."""
     return OrganizationService.get_user_organizations(request.auth)
 
 
 @router.get("/{org_id}", response={200: OrgOut, 403: ErrorOut, 404: ErrorOut})
-def get_organization(request, org_id: int):
+def get_organization(request, response: HttpResponse, org_id: int):
     """Get organization detail. Must be a member."""
     check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
+    check_etag(request, response, org_id)
     org = OrganizationService.get_organization(org_id)
     return 200, org
 
@@ -57,10 +61,11 @@ def delete_organization(request, org_id: int):
 
 
 @router.get("/{org_id}/members", response=list[MemberOut])
-@paginate(LimitOffsetPagination)
-def list_members(request, org_id: int):
+@paginate(CursorPagination)
+def list_members(request, response: HttpResponse, org_id: int):
     """List members of an organization. Must be a member."""
     check_role_or_raise(request.auth, org_id, OrgRole.MEMBER)
+    check_etag(request, response, org_id)
     return OrganizationService.get_org_members(org_id)
 
 
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-16 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0003_alter_membership_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationDataVersion',
+            fields=[
+                ('organization_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'organization_data_versions',
+            },
+        ),
+    ]
@@ -2,6 +2,8 @@
 
 Organizations represent schools/institutions. Membership is the explicit
 through-table linking users to organizations with role-based access.
+OrganizationDataVersion counts writes to an organization's data for the
+ETags of core.etags.
 """
 
 from django.conf import settings
@@ -92,3 +94,21 @@ class Membership(models.Model):
         from core.permissions import ROLE_HIERARCHY
 
         return self._role_level >= ROLE_HIERARCHY[OrgRole.OWNER]
+
+
+class OrganizationDataVersion(models.Model):
+    """Counter bumped in the same transaction as every write to an organization's data.
+
+    Keyed by organization id, with 0 for data that belongs to no organization
+    (global pictograms). Not a foreign key, so a deleted organization's
+    version keeps counting up rather than starting over.
+    """
+
+    organization_id = models.BigIntegerField(primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "organization_data_versions"
+
+    def __str__(self) -> str:
+        return f"{self.organization_id}: {self.version}"
@@ -2,9 +2,13 @@
 
 from django.db import transaction
 
+from apps.blobs.services import BlobService
 from apps.organizations.models import Membership, Organization, OrgRole
+from apps.pictograms.models import Pictogram
 from apps.users.models import User
+from core.etags import bump_org_data
 from core.exceptions import BadRequestError, ResourceNotFoundError
+from core.permissions import get_membership_or_none, invalidate_memberships
 
 
 class OrganizationService:
@@ -13,7 +17,9 @@ class OrganizationService:
     def create_organization(*, name: str, creator: User) -> Organization:
         """Create an organization and make the creator the owner."""
         org = Organization.objects.create(name=name)
-        Membership.objects.create(user=creator, organization=org, role=OrgRole.OWNER)
+        Membership.objects.create(user_id=creator.id, organization=org, role=OrgRole.OWNER)
+        invalidate_memberships(user_ids=(creator.id,))
+        bump_org_data(org.id)
         return org
 
     @staticmethod
@@ -31,16 +37,13 @@ class OrganizationService:
     @staticmethod
     def get_user_organizations(user: User):
         """Return organizations the user is a member of."""
-        org_ids = Membership.objects.filter(user=user).values_list("organization_id", flat=True)
+        org_ids = Membership.objects.filter(user_id=user.id).values_list("organization_id", flat=True)
         return Organization.objects.filter(id__in=org_ids)
 
     @staticmethod
     def get_membership(user: User, org_id: int) -> Membership | None:
         """Get the user's membership for an organization, or None."""
-        try:
-            return Membership.objects.select_related("organization").get(user=user, organization_id=org_id)
-        except Membership.DoesNotExist:
-            return None
+        return get_membership_or_none(user, org_id)
 
     @staticmethod
     def get_org_members(org_id: int):
@@ -54,14 +57,22 @@ class OrganizationService:
         org = OrganizationService._get_org_or_raise(org_id)
         org.name = name
         org.save(update_fields=["name"])
+        bump_org_data(org_id)
         return org
 
     @staticmethod
     @transaction.atomic
     def delete_organization(*, org_id: int) -> None:
-        """Delete an organization."""
+        """Delete an organization, releasing the images of the pictograms it owns."""
         org = OrganizationService._get_org_or_raise(org_id)
+        images = list(
+            Pictogram.objects.filter(organization_id=org_id).exclude(image="").values_list("image", "derivatives")
+        )
         org.delete()
+        for name, derivatives in images:
+            BlobService.release(name, derivatives)
+        invalidate_memberships(org_id=org_id)
+        bump_org_data(org_id)
 
     @staticmethod
     def _check_last_owner(org_id: int, membership: Membership) -> None:
@@ -88,6 +99,8 @@ class OrganizationService:
 
         membership.role = new_role
         membership.save(update_fields=["role"])
+        invalidate_memberships(user_ids=(target_user_id,))
+        bump_org_data(org_id)
         return membership
 
     @staticmethod
@@ -102,3 +115,5 @@ class OrganizationService:
         OrganizationService._check_last_owner(org_id, membership)
 
         membership.delete()
+        invalidate_memberships(user_ids=(target_user_id,))
+        bump_org_data(org_id)
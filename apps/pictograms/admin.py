@@ -1,10 +1,11 @@
 from django.contrib import admin
 
 from apps.pictograms.models import Pictogram
+from core.etags import OrgDataAdminMixin
 
 
 @admin.register(Pictogram)
-class PictogramAdmin(admin.ModelAdmin):
+class PictogramAdmin(OrgDataAdminMixin, admin.ModelAdmin):
     list_display = ["name", "organization", "image_url"]
     list_filter = ["organization"]
     search_fields = ["name"]
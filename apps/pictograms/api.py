@@ -1,13 +1,15 @@
 """Pictogram API endpoints."""
 
-from ninja import File, Form, Router
+from django.http import HttpResponse
+from ninja import File, Form, Query, Router
 from ninja.errors import HttpError
 from ninja.files import UploadedFile
-from ninja.pagination import LimitOffsetPagination, paginate
 
 from apps.organizations.models import OrgRole
-from apps.pictograms.schemas import PictogramCreateIn, PictogramOut
+from apps.pictograms.schemas import PictogramCreateIn, PictogramOut, PictogramPageOut
 from apps.pictograms.services import PictogramService
+from core.etags import check_etag
+from core.pagination import CursorPagination
 from core.permissions import check_role_or_raise
 from core.schemas import ErrorOut
 
@@ -28,21 +30,47 @@ def create_pictogram(request, payload: PictogramCreateIn):
     return 201, pictogram
 
 
-@router.get("", response=list[PictogramOut])
-@paginate(LimitOffsetPagination)
-def list_pictograms(request, organization_id: int | None = None):
-    """List pictograms. Returns global + org-specific if org_id provided."""
-    return PictogramService.list_pictograms(organization_id)
+@router.get("", response=PictogramPageOut)
+def list_pictograms(
+    request,
+    response: HttpResponse,
+    pagination: Query[CursorPagination.Input],
+    organization_id: int | None = None,
+    q: str | None = None,
+):
+    """List pictograms. Returns global + org-specific if org_id provided.
+
+    With `q`, returns only pictograms whose names match, ranked by full-text relevance.
+    """
+    org_ids = (None, organization_id) if organization_id else (None,)
+    check_etag(request, response, *org_ids)
+    if q is not None:
+        results = PictogramService.search_pictograms(q, organization_id)
+        return CursorPagination().paginate_queryset(results, pagination, request)
+    # Served pre-serialized from the catalog cache, bypassing schema validation.
+    # The count is free here, so only count=none leaves it out.
+    page = PictogramService.list_pictograms_page(
+        organization_id,
+        offset=pagination.offset,
+        limit=pagination.limit,
+        cursor=pagination.cursor,
+        with_count=pagination.count != "none",
+    )
+    return HttpResponse(page, content_type=response["Content-Type"], headers={"ETag": response["ETag"]})
 
 
-@router.post("/upload", response={201: PictogramOut, 403: ErrorOut})
+@router.post("/upload", response={202: PictogramOut, 403: ErrorOut, 422: ErrorOut, 503: ErrorOut})
 def upload_pictogram(
     request,
     image: File[UploadedFile],
     name: Form[str],
     organization_id: Form[int | None] = None,
 ):
-    """Upload a pictogram with an image file. Requires admin role if org-scoped."""
+    """Upload a pictogram with an image file. Requires admin role if org-scoped.
+
+    Answers once the file is stored, with status "processing"; poll GET /pictograms/{id}
+    until it is "ready" (derivatives available) or "failed" (not a valid image).
+    """
     if organization_id:
         check_role_or_raise(request.auth, organization_id, OrgRole.ADMIN)
 
@@ -51,7 +79,7 @@ def upload_pictogram(
         image=image,
         organization_id=organization_id,
     )
-    return 201, pictogram
+    return 202, pictogram
 
 
 @router.get("/{pictogram_id}", response={200: PictogramOut, 404: ErrorOut})
@@ -0,0 +1,207 @@
+"""Pre-serialized pictogram catalog pages.
+
+Listing the pictograms of an organization means merging the global set,
+which is the same for every organization, with that organization's own
+pictograms. `PictogramCatalog` keeps the global set serialized to JSON once
+per process and each organization's set next to it, both stamped with the
+data versions from core.etags. Pictogram writes bump those versions in the
+database, in the writing transaction (see `PictogramService`), and every
+page read checks them, so each worker rebuilds a stale set on its first
+read after the write commits.
+
+An organization's set also records where each of its pictograms falls in
+the merged catalog, as ordered by the database. A page is then located with
+one bisect and copied item by item, so a hit costs O(log n + limit)
+regardless of catalog size.
+
+Pages accept the signed cursors of core.pagination. A cursor is resolved to
+a position by looking up its row ids in the current sets, without a query;
+if its last row has since been deleted, the page starts at the row that
+followed it.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.db.models import Q
+
+from apps.pictograms.models import Pictogram
+from apps.pictograms.schemas import PictogramOut
+from core.etags import get_org_data_versions
+from core.exceptions import BadRequestError
+from core.pagination import decode_cursor, encode_cursor
+
+_ORDERING = ["name", "id"]
+
+
+@dataclass(frozen=True)
+class _Set:
+    versions: list[int]
+    items: list[bytes]  # serialized PictogramOut, in catalog order
+    sort_keys: list[list[Any]]  # [name, id] per item
+    # Org sets only: position of each item in the merged catalog, and the
+    # size of the global set that position was computed against.
+    merged_at: list[int]
+    global_count: int = 0
+    index: dict[int, int] = field(init=False)  # id -> position in items
+    # Org sets only: global items merged before each item (non-decreasing).
+    globals_before: list[int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "index", {key[1]: i for i, key in enumerate(self.sort_keys)})
+        object.__setattr__(self, "globals_before", [m - k for k, m in enumerate(self.merged_at)])
+
+
+class PictogramCatalog:
+    """Process-wide cache of serialized pictogram sets; see the module docstring."""
+
+    max_orgs = 1024
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._global: _Set | None = None
+        self._orgs: dict[int, _Set] = {}
+
+    def page(
+        self,
+        organization_id: int | None,
+        offset: int,
+        limit: int,
+        cursor: str | None = None,
+        *,
+        with_count: bool = True,
+    ) -> bytes:
+        """Return the JSON body of one page: {"items": [...], "count": n, "has_more": ..., "next_cursor": ...}.
+
+        With a `cursor` the page starts after the row it names and `offset` is ignored.
+        The count is known from the cached sets; `with_count=False` reports it as null.
+
+        Raises:
+            BadRequestError: The cursor is invalid.
+        """
+        if organization_id:
+            versions = get_org_data_versions(None, organization_id)
+        else:
+            versions = get_org_data_versions(None)
+
+        global_set = self._global
+        if global_set is None or global_set.versions != versions[:1]:
+            global_set = self._build_global(versions[:1])
+
+        org_set = None
+        if organization_id:
+            org_set = self._orgs.get(organization_id)
+            if org_set is None or org_set.versions != versions or org_set.global_count != len(global_set.items):
+                org_set = self._build_org(organization_id, versions)
+
+        if cursor is not None:
+            offset = _position_after(global_set, org_set, decode_cursor(_ORDERING, cursor))
+        return _render(global_set, org_set, offset, limit, with_count)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._global = None
+            self._orgs.clear()
+
+    def _build_global(self, versions: list[int]) -> _Set:
+        pictograms = Pictogram.objects.filter(organization__isnull=True).order_by(*_ORDERING)
+        built = _Set(versions, *_serialize_all(pictograms), [])
+        with self._lock:
+            self._global = built
+        return built
+
+    def _build_org(self, organization_id: int, versions: list[int]) -> _Set:
+        # One query over the merged set, so positions follow the database's collation
+        # rather than Python's string order and match the global set's snapshot.
+        pictograms = []
+        merged_at: list[int] = []
+        position = -1
+        for position, pictogram in enumerate(_merged(organization_id).order_by(*_ORDERING)):
+            if pictogram.organization_id is not None:
+                pictograms.append(pictogram)
+                merged_at.append(position)
+        built = _Set(versions, *_serialize_all(pictograms), merged_at, position + 1 - len(pictograms))
+        with self._lock:
+            self._orgs.pop(organization_id, None)
+            if len(self._orgs) >= self.max_orgs:
+                del self._orgs[next(iter(self._orgs))]
+            self._orgs[organization_id] = built
+        return built
+
+
+def _merged(organization_id: int | None):
+    if organization_id:
+        return Pictogram.objects.filter(Q(organization_id=organization_id) | Q(organization__isnull=True))
+    return Pictogram.objects.filter(organization__isnull=True)
+
+
+def _serialize_all(pictograms) -> tuple[list[bytes], list[list[Any]]]:
+    pictograms = list(pictograms)
+    items = [PictogramOut.from_orm(p).model_dump_json().encode() for p in pictograms]
+    return items, [[p.name, p.id] for p in pictograms]
+
+
+def _position_of(global_set: _Set, org_set: _Set | None, pictogram_id: Any) -> int | None:
+    """Return the merged position of the pictogram with this id, or None if it is not listed."""
+    if org_set is not None and pictogram_id in org_set.index:
+        return org_set.merged_at[org_set.index[pictogram_id]]
+    if pictogram_id in global_set.index:
+        i = global_set.index[pictogram_id]
+        # Org items sort before global item i if fewer than i + 1 globals precede them.
+        return i + (bisect_right(org_set.globals_before, i) if org_set else 0)
+    return None
+
+
+def _position_after(global_set: _Set, org_set: _Set | None, pks: list[Any]) -> int:
+    """Return the merged position of the first row after the cursor's last row.
+
+    Raises:
+        BadRequestError: Neither of the cursor's rows is listed any more.
+    """
+    last_pk, next_pk = pks
+    position = _position_of(global_set, org_set, last_pk)
+    if position is not None:
+        return position + 1
+    # The last row is gone; continue from the row that followed it.
+    position = _position_of(global_set, org_set, next_pk)
+    if position is None:
+        raise BadRequestError("Cursor has expired; request the first page again.")
+    return position
+
+
+def _render(global_set: _Set, org_set: _Set | None, offset: int, limit: int, with_count: bool) -> bytes:
+    org_items, merged_at = (org_set.items, org_set.merged_at) if org_set else ([], [])
+    count = len(global_set.items) + len(org_items)
+    end = min(offset + limit, count)
+
+    o = bisect_left(merged_at, offset)  # org items before the page
+    g = offset - o  # global items before the page
+    items = []
+    last_key = None
+    for position in range(offset, end):
+        if o < len(merged_at) and merged_at[o] == position:
+            items.append(org_items[o])
+            last_key = org_set.sort_keys[o]  # type: ignore[union-attr]
+            o += 1
+        elif g < len(global_set.items):  # Only short if a write raced the last rebuild.
+            items.append(global_set.items[g])
+            last_key = global_set.sort_keys[g]
+            g += 1
+
+    next_key = None
+    if end < count:
+        if o < len(merged_at) and merged_at[o] == end:
+            next_key = org_set.sort_keys[o]  # type: ignore[union-attr]
+        elif g < len(global_set.items):
+            next_key = global_set.sort_keys[g]
+    has_more = last_key is not None and next_key is not None
+    next_cursor = f'"{encode_cursor(_ORDERING, last_key[1], next_key[1])}"' if has_more else "null"  # type: ignore[index]
+    has_more_json = "true" if has_more else "false"
+    count_json = count if with_count else "null"
+    tail = f'], "count": {count_json}, "has_more": {has_more_json}, "next_cursor": {next_cursor}}}'
+    return b'{"items": [' + b", ".join(items) + tail.encode()
+
+
+pictogram_catalog = PictogramCatalog()
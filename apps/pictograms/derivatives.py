@@ -0,0 +1,105 @@
+"""Resized WebP and PNG derivatives of uploaded pictogram images.
+
+Phones show pictograms at 64-256px, so serving the original upload (up to
+5MB) wastes most of every download. Each uploaded image gets a copy per
+size in DERIVATIVE_SIZES and format in DERIVATIVE_FORMATS, stored next to
+the original (`grape.png` -> `grape_128.webp`). The stored names are
+recorded on `Pictogram.derivatives` as {"128": {"webp": ..., "png": ...}}
+and exposed by `PictogramOut.image_urls`.
+
+Images are never upscaled: sizes above the original's longest side are
+skipped, except that the smallest size is always produced.
+
+Uploads are rendered in the image pool by `render_upload()` (see
+core.images); `write_derivatives()` then stores the result next to the
+upload's blob (apps.blobs), so identical uploads share one set.
+"""
+
+import io
+import os
+
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from apps.blobs.models import ImageBlob
+from apps.blobs.services import BlobService
+from apps.pictograms.models import Pictogram
+from core.images import verify_image
+
+DERIVATIVE_SIZES = (64, 128, 256, 512)
+DERIVATIVE_FORMATS = ("webp", "png")
+
+_SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "png": {"format": "PNG", "optimize": True},
+}
+
+
+def derivative_name(image_name: str, size: int, fmt: str) -> str:
+    root, _ = os.path.splitext(image_name)
+    return f"{root}_{size}.{fmt}"
+
+
+def render_derivatives(source: Image.Image) -> dict[int, dict[str, bytes]]:
+    """Encode `source` at every derivative size and format; returns {size: {format: bytes}}."""
+    has_alpha = source.mode in ("RGBA", "LA") or "transparency" in source.info
+    image = source.convert("RGBA" if has_alpha else "RGB")
+    longest = max(image.size)
+    sizes = [size for size in DERIVATIVE_SIZES if size <= longest] or [DERIVATIVE_SIZES[0]]
+
+    rendered: dict[int, dict[str, bytes]] = {}
+    for size in sizes:
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+        rendered[size] = {}
+        for fmt in DERIVATIVE_FORMATS:
+            buffer = io.BytesIO()
+            resized.save(buffer, **_SAVE_OPTIONS[fmt])
+            rendered[size][fmt] = buffer.getvalue()
+    return rendered
+
+
+def render_upload(data: bytes) -> tuple[str, dict[int, dict[str, bytes]]]:
+    """Verify the bytes of an upload and render its derivatives; runs in the image pool.
+
+    Returns the image's pixel digest and the rendered derivatives.
+
+    Raises:
+        ValueError: The image is truncated or corrupt.
+    """
+    digest = verify_image(data)
+    with Image.open(io.BytesIO(data)) as source:
+        return digest, render_derivatives(source)
+
+
+def write_derivatives(storage, image_name: str, rendered: dict[int, dict[str, bytes]]) -> dict[str, dict[str, str]]:
+    """Store rendered derivatives next to the stored image `image_name`; returns the `derivatives` map."""
+    derivatives: dict[str, dict[str, str]] = {}
+    for size, encoded in rendered.items():
+        derivatives[str(size)] = {}
+        for fmt, data in encoded.items():
+            name = derivative_name(image_name, size, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            derivatives[str(size)][fmt] = storage.save(name, ContentFile(data))
+    return derivatives
+
+
+def generate_derivatives(pictogram: Pictogram) -> dict[str, dict[str, str]]:
+    """Render and store the derivatives of `pictogram.image` on this thread and record them.
+
+    Every pictogram sharing the image's blob, and the blob itself, get the new map.
+    Returns it; a pictogram without an uploaded image gets {}.
+    """
+    if not pictogram.image:
+        return {}
+    with pictogram.image.open("rb") as original, Image.open(original) as source:
+        rendered = render_derivatives(source)
+
+    name = pictogram.image.name
+    pictogram.derivatives = write_derivatives(pictogram.image.storage, name, rendered)
+    Pictogram.objects.filter(image=name).update(derivatives=pictogram.derivatives)
+    blob = ImageBlob.objects.filter(name=name).first()
+    if blob is not None:
+        BlobService.set_derivatives(blob, pictogram.derivatives)
+    return pictogram.derivatives
@@ -0,0 +1,63 @@
+"""Backfill resized derivatives for pictograms uploaded before they existed.
+
+Walks uploaded pictograms in id order and generates the WebP/PNG copies
+(see apps.pictograms.derivatives) for those that have none yet, or for all
+of them with `--force`. A pictogram whose image is missing or unreadable is
+reported and skipped. The data versions of the affected organizations are
+bumped at the end so list caches and ETags pick up the new URLs.
+
+    python manage.py generate_pictogram_derivatives --batch-size 200
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.pictograms.derivatives import generate_derivatives
+from apps.pictograms.models import Pictogram
+from core.etags import bump_org_data
+from core.images import ImageStatus
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP/PNG derivatives for uploaded pictograms that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=200, help="Pictograms loaded per query (default 200).")
+        parser.add_argument("--force", action="store_true", help="Regenerate derivatives that already exist.")
+
+    def handle(self, *args, batch_size, force, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        pictograms = (
+            Pictogram.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .exclude(status=ImageStatus.PROCESSING)  # Left to the image pool, or to retry_stale_images.
+            .order_by("id")
+        )
+        if not force:
+            pictograms = pictograms.filter(derivatives={})
+
+        generated = failed = 0
+        org_ids: set[int | None] = set()
+        started = time.monotonic()
+        for pictogram in pictograms.iterator(chunk_size=batch_size):
+            try:
+                generate_derivatives(pictogram)
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"Pictogram {pictogram.id}: {exc}")
+                continue
+            generated += 1
+            org_ids.add(pictogram.organization_id)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Pictogram {pictogram.id}: done.")
+
+        if org_ids:
+            bump_org_data(*org_ids)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated derivatives for {generated} pictograms ({failed} failed) in {elapsed:.2f}s.")
+        )
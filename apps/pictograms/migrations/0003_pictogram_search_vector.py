@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:43
+
+import core.search
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def create_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE INDEX pictograms_search_vector_idx ON pictograms USING gin (search_vector)")
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS pictograms_search_vector_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictograms', '0002_add_image_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictogram',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=core.search.TextSearchVector('name'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictograms', '0003_pictogram_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictogram',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
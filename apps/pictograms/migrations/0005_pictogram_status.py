@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictograms', '0004_pictogram_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictogram',
+            name='status',
+            field=models.CharField(choices=[('ready', 'Ready'), ('processing', 'Processing'), ('failed', 'Failed')], default='ready', max_length=16),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pictograms', '0005_pictogram_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pictogram',
+            name='processing_since',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -4,12 +4,20 @@ Pictograms are visual aids used for communication with autistic children.
 They can belong to an organization (custom) or be global (organization=None).
 """
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
 
+from core.images import ImageStatus
+from core.search import TextSearchVector
+
 
 class Pictogram(models.Model):
-    """A visual aid image used across GIRAF apps."""
+    """A visual aid image used across GIRAF apps.
+
+    `search_vector` is maintained by the database from `name`; its GIN
+    index is created on PostgreSQL in migration 0003.
+    """
 
     name = models.CharField(max_length=255)
     image_url = models.CharField(max_length=500, blank=True, default="")
@@ -25,7 +33,18 @@ class Pictogram(models.Model):
         null=True,
         blank=True,
     )
+    # "processing" while an uploaded image is verified and resized in the image pool (core.images).
+    status = models.CharField(max_length=16, choices=ImageStatus.choices, default=ImageStatus.READY)
+    # When the current image job was queued; a job lost with its worker leaves this behind (see retry_stale_images).
+    processing_since = models.DateTimeField(null=True, blank=True, editable=False)
+    # Stored names of resized copies of `image`, by size and format (see apps.pictograms.derivatives).
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    search_vector = models.GeneratedField(
+        expression=TextSearchVector("name"),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "pictograms"
@@ -14,6 +14,8 @@ class PictogramOut(Schema):
     name: str
     image_url: str
     organization_id: int | None
+    status: str = "ready"  # "processing" until an uploaded image is verified and resized; or "failed"
+    image_urls: dict[str, dict[str, str]] = {}
 
     @staticmethod
     def resolve_image_url(obj):
@@ -21,3 +23,20 @@ class PictogramOut(Schema):
         if obj.image:
             return obj.image.url
         return obj.image_url
+
+    @staticmethod
+    def resolve_image_urls(obj):
+        """Return derivative URLs by pixel size and format, e.g. {"128": {"webp": ..., "png": ...}}."""
+        if not obj.derivatives:
+            return {}
+        storage = obj.image.storage
+        return {
+            size: {fmt: storage.url(name) for fmt, name in formats.items()} for size, formats in obj.derivatives.items()
+        }
+
+
+class PictogramPageOut(Schema):
+    items: list[PictogramOut]
+    count: int | None = None
+    has_more: bool = False
+    next_cursor: str | None = None
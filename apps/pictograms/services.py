@@ -1,21 +1,28 @@
 """Business logic for pictogram operations."""
 
-import mimetypes
+from functools import partial
 
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from django.db.models import Q
-from PIL import Image
+from django.db.models import F, Q
+from django.utils import timezone
 
+from apps.blobs.services import BlobService
+from apps.pictograms.catalog import pictogram_catalog
+from apps.pictograms.derivatives import render_upload, write_derivatives
 from apps.pictograms.models import Pictogram
+from core.etags import bump_org_data
 from core.exceptions import BusinessValidationError, ResourceNotFoundError
+from core.images import ImageStatus, reserve, validate_upload
+from core.search import TextMatch, TextRank, search_terms
 
 
 class PictogramService:
     @staticmethod
-    def _get_pictogram_or_raise(pictogram_id: int) -> Pictogram:
+    def _get_pictogram_or_raise(pictogram_id: int, *, for_update: bool = False) -> Pictogram:
+        pictograms = Pictogram.objects.select_for_update() if for_update else Pictogram.objects
         try:
-            return Pictogram.objects.get(id=pictogram_id)
+            return pictograms.get(id=pictogram_id)
         except Pictogram.DoesNotExist:
             raise ResourceNotFoundError(f"Pictogram {pictogram_id} not found.")
 
@@ -23,13 +30,15 @@ class PictogramService:
     @transaction.atomic
     def create_pictogram(*, name: str, image_url: str, organization_id: int | None = None) -> Pictogram:
         try:
-            return Pictogram.objects.create(
+            pictogram = Pictogram.objects.create(
                 name=name,
                 image_url=image_url,
                 organization_id=organization_id,
             )
         except DjangoValidationError as e:
             raise BusinessValidationError(" ".join(e.messages))
+        bump_org_data(organization_id)
+        return pictogram
 
     @staticmethod
     def list_pictograms(organization_id: int | None = None):
@@ -37,41 +46,109 @@ class PictogramService:
             return Pictogram.objects.filter(Q(organization_id=organization_id) | Q(organization__isnull=True))
         return Pictogram.objects.filter(organization__isnull=True)
 
+    @staticmethod
+    def search_pictograms(q: str, organization_id: int | None = None):
+        """Return the pictograms list_pictograms() would show whose names match `q`, best match first.
+
+        Every word of `q` must start a word of the name. Ties in rank are ordered by name.
+        """
+        terms = search_terms(q)
+        if not terms:
+            return Pictogram.objects.none()
+        vector = F("search_vector")
+        return (
+            PictogramService.list_pictograms(organization_id)
+            .filter(TextMatch(vector, terms))
+            .annotate(rank=TextRank(vector, terms))
+            .order_by("-rank", "name")
+        )
+
+    @staticmethod
+    def list_pictograms_page(
+        organization_id: int | None, *, offset: int, limit: int, cursor: str | None = None, with_count: bool = True
+    ) -> bytes:
+        """Return a serialized page of list_pictograms() from the catalog cache."""
+        return pictogram_catalog.page(organization_id, offset, limit, cursor, with_count=with_count)
+
     @staticmethod
     def get_pictogram(pictogram_id: int) -> Pictogram:
         return PictogramService._get_pictogram_or_raise(pictogram_id)
 
     @staticmethod
-    @transaction.atomic
     def upload_pictogram(*, name: str, image, organization_id: int | None = None) -> Pictogram:
-        """Upload a pictogram image with validation.
+        """Store an uploaded image and queue its verification and resizing.
+
+        Only the file's header is checked here. The pictogram is returned with
+        status "processing"; the image pool sets it to "ready" once its derivatives
+        are stored, or to "failed" (and removes the file) if the image is corrupt.
+        An image identical to an earlier upload ends up sharing its blob (apps.blobs).
 
         Raises:
             BusinessValidationError: If file type or size is invalid.
+            ServiceUnavailableError: If the image pool's queue is full.
         """
-        mime_type, _ = mimetypes.guess_type(image.name)
-        allowed_types = ["image/jpeg", "image/png", "image/webp"]
-        if mime_type not in allowed_types:
-            raise BusinessValidationError("Only JPEG, PNG, and WebP images are allowed.")
-
-        max_size = 5 * 1024 * 1024
-        if image.size > max_size:
-            raise BusinessValidationError("File size must not exceed 5MB.")
-
-        try:
-            Image.open(image).verify()
+        validate_upload(image)
+        with reserve() as job:
+            data = image.read()
             image.seek(0)
-        except Exception:
-            raise BusinessValidationError("File is not a valid image.")
-
-        return Pictogram.objects.create(
-            name=name,
-            image=image,
-            organization_id=organization_id,
-        )
+            pictogram = Pictogram(
+                name=name,
+                organization_id=organization_id,
+                status=ImageStatus.PROCESSING,
+                processing_since=timezone.now(),
+            )
+            pictogram.image.save(image.name, image, save=False)
+            with transaction.atomic():
+                pictogram.save()
+                bump_org_data(organization_id)
+            job.submit(render_upload, data, on_done=partial(_finish_upload, pictogram.id, pictogram.image.name))
+        return pictogram
 
     @staticmethod
     @transaction.atomic
     def delete_pictogram(*, pictogram_id: int) -> None:
-        pictogram = PictogramService._get_pictogram_or_raise(pictogram_id)
+        """Delete a pictogram, and its image files unless another upload shares them."""
+        # Locked so the image pool cannot swap in a blob between this read and the release.
+        pictogram = PictogramService._get_pictogram_or_raise(pictogram_id, for_update=True)
         pictogram.delete()
+        if pictogram.image:
+            BlobService.release(pictogram.image.name, pictogram.derivatives)
+        bump_org_data(pictogram.organization_id)
+
+    @staticmethod
+    def retry_upload(pictogram: Pictogram) -> bool:
+        """Process on this thread an upload whose image job was lost, e.g. with a restarted worker.
+
+        Returns whether the pictogram is now ready; it is marked failed if the
+        stored upload is missing or not a valid image.
+        """
+        upload = pictogram.image.name
+        try:
+            with pictogram.image.storage.open(upload, "rb") as stored:
+                result, error = render_upload(stored.read()), None
+        except (OSError, ValueError) as exc:
+            result, error = None, exc
+        _finish_upload(pictogram.id, upload, result, error)
+        return error is None
+
+
+def _finish_upload(
+    pictogram_id: int, upload: str, result: tuple[str, dict] | None, error: BaseException | None
+) -> None:
+    """Record the image pool's result for an uploaded pictogram, moving the upload into its blob."""
+    with transaction.atomic():
+        pictogram = Pictogram.objects.select_for_update().filter(pk=pictogram_id, image=upload).first()
+        if pictogram is None:  # Deleted while processing; deletion removed the upload.
+            return
+        if error is not None:
+            BlobService.release(upload)
+            Pictogram.objects.filter(pk=pictogram_id).update(image="", status=ImageStatus.FAILED, processing_since=None)
+        else:
+            digest, rendered = result  # type: ignore[misc]
+            blob = BlobService.acquire(digest=digest, upload=upload)
+            if not blob.derivatives:
+                BlobService.set_derivatives(blob, write_derivatives(pictogram.image.storage, blob.name, rendered))
+            Pictogram.objects.filter(pk=pictogram_id).update(
+                image=blob.name, derivatives=blob.derivatives, status=ImageStatus.READY, processing_since=None
+            )
+        bump_org_data(pictogram.organization_id)
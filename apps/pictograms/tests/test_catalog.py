@@ -0,0 +1,130 @@
+"""Tests for the pre-serialized pictogram catalog."""
+
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from apps.organizations.models import Organization
+from apps.pictograms.catalog import PictogramCatalog
+from apps.pictograms.models import Pictogram
+from apps.pictograms.services import PictogramService
+
+
+def _make_image() -> SimpleUploadedFile:
+    buf = io.BytesIO()
+    Image.new("RGB", (10, 10), color="red").save(buf, format="PNG")
+    return SimpleUploadedFile("grape.png", buf.getvalue(), content_type="image/png")
+
+
+@pytest.fixture
+def catalog():
+    return PictogramCatalog()
+
+
+@pytest.fixture
+def school(db):
+    return Organization.objects.create(name="School")
+
+
+@pytest.fixture
+def pictograms(school):
+    for name in ["apple", "Banana", "cherry", "date", "Elder", "fig"]:
+        Pictogram.objects.create(name=name, image_url=f"https://example.com/{name}.png")
+    for name in ["Avocado", "cherry", "zucchini"]:
+        Pictogram.objects.create(name=name, image_url=f"https://example.com/{name}.png", organization=school)
+
+
+def _expected_ids(org_id):
+    return list(PictogramService.list_pictograms(org_id).order_by("name", "id").values_list("id", flat=True))
+
+
+def _page(catalog, org_id, offset, limit):
+    return json.loads(catalog.page(org_id, offset, limit))
+
+
+@pytest.mark.django_db
+class TestPictogramCatalog:
+    @pytest.mark.parametrize(("offset", "limit"), [(0, 100), (0, 3), (2, 4), (5, 3), (8, 5), (20, 5)])
+    def test_pages_match_database_order(self, catalog, school, pictograms, offset, limit):
+        page = _page(catalog, school.id, offset, limit)
+
+        assert [item["id"] for item in page["items"]] == _expected_ids(school.id)[offset : offset + limit]
+        assert page["count"] == 9
+
+    def test_global_only(self, catalog, pictograms):
+        page = _page(catalog, None, 0, 100)
+
+        assert [item["id"] for item in page["items"]] == _expected_ids(None)
+        assert page["count"] == 6
+
+    def test_items_are_serialized_like_the_schema(self, catalog, school, pictograms):
+        item = _page(catalog, school.id, 0, 1)["items"][0]
+        assert set(item) == {"id", "name", "image_url", "organization_id", "status", "image_urls"}
+
+    def test_hit_only_reads_the_versions(self, catalog, school, pictograms):
+        catalog.page(school.id, 0, 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            catalog.page(school.id, 3, 5)
+
+        assert len(ctx.captured_queries) == 1
+        assert "organization_data_versions" in ctx.captured_queries[0]["sql"]
+
+    def test_global_set_is_shared_between_orgs(self, catalog, school, pictograms):
+        other = Organization.objects.create(name="Other")
+        catalog.page(school.id, 0, 5)
+
+        with CaptureQueriesContext(connection) as ctx:
+            catalog.page(other.id, 0, 5)
+
+        assert len(ctx.captured_queries) == 2  # the versions and the other org's set
+
+    def test_create_invalidates(self, catalog, school, pictograms):
+        catalog.page(school.id, 0, 100)
+
+        PictogramService.create_pictogram(name="banana", image_url="https://example.com/b.png")
+
+        assert _page(catalog, school.id, 0, 100)["count"] == 10
+        assert [item["id"] for item in _page(catalog, school.id, 0, 100)["items"]] == _expected_ids(school.id)
+
+    def test_upload_invalidates(self, catalog, school, pictograms):
+        catalog.page(school.id, 0, 100)
+
+        PictogramService.upload_pictogram(name="grape", image=_make_image(), organization_id=school.id)
+
+        assert _page(catalog, school.id, 0, 100)["count"] == 10
+
+    def test_delete_invalidates(self, catalog, school, pictograms):
+        catalog.page(None, 0, 100)
+        pictogram = Pictogram.objects.filter(organization__isnull=True).first()
+
+        PictogramService.delete_pictogram(pictogram_id=pictogram.id)
+
+        assert pictogram.id not in [item["id"] for item in _page(catalog, None, 0, 100)["items"]]
+
+    def test_write_on_another_worker_invalidates(self, catalog, school, pictograms, monkeypatch):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        catalog.page(school.id, 0, 100)
+
+        # The other worker has its own per-process cache; only the database is shared.
+        with monkeypatch.context() as other_worker:
+            other_worker.setattr("core.versioning.cache", LocMemCache("other-worker", {}))
+            PictogramService.create_pictogram(
+                name="banana", image_url="https://example.com/b.png", organization_id=school.id
+            )
+
+        assert _page(catalog, school.id, 0, 100)["count"] == 10
+
+    def test_evicts_oldest_org(self, catalog, pictograms):
+        catalog.max_orgs = 2
+        orgs = [Organization.objects.create(name=f"Org {n}") for n in range(3)]
+        for org in orgs:
+            catalog.page(org.id, 0, 1)
+
+        assert list(catalog._orgs) == [orgs[1].id, orgs[2].id]
@@ -0,0 +1,108 @@
+"""Tests for resized pictogram derivatives and their backfill command."""
+
+import io
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from PIL import Image
+
+from apps.pictograms.derivatives import DERIVATIVE_SIZES, render_derivatives
+from apps.pictograms.models import Pictogram
+from apps.pictograms.schemas import PictogramOut
+from apps.pictograms.services import PictogramService
+
+
+def _upload(size=(600, 300), mode="RGB", name="grape.png") -> SimpleUploadedFile:
+    buf = io.BytesIO()
+    Image.new(mode, size, color="red").save(buf, format="PNG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+
+class TestRenderDerivatives:
+    def test_every_size_and_format_keeps_aspect_ratio(self):
+        rendered = render_derivatives(Image.new("RGB", (600, 300)))
+
+        assert list(rendered) == list(DERIVATIVE_SIZES)
+        for size, encoded in rendered.items():
+            assert set(encoded) == {"webp", "png"}
+            with Image.open(io.BytesIO(encoded["webp"])) as image:
+                assert image.format == "WEBP"
+                assert image.size == (size, size // 2)
+
+    def test_does_not_upscale(self):
+        assert list(render_derivatives(Image.new("RGB", (200, 100)))) == [64, 128]
+        assert list(render_derivatives(Image.new("RGB", (10, 10)))) == [64]
+
+    def test_keeps_transparency(self):
+        rendered = render_derivatives(Image.new("RGBA", (128, 128), (0, 0, 0, 0)))
+
+        with Image.open(io.BytesIO(rendered[64]["png"])) as image:
+            assert image.mode == "RGBA"
+
+
+@pytest.mark.django_db
+class TestUploadDerivatives:
+    def test_upload_stores_derivatives(self, media_root):
+        pictogram = PictogramService.upload_pictogram(name="Grape", image=_upload())
+
+        pictogram.refresh_from_db()
+        assert sorted(pictogram.derivatives, key=int) == ["64", "128", "256", "512"]
+        webp = pictogram.derivatives["128"]["webp"]
+        assert webp.endswith("_128.webp")
+        assert (media_root / webp).stat().st_size < (media_root / pictogram.image.name).stat().st_size
+
+    def test_schema_exposes_url_map(self):
+        pictogram = PictogramService.upload_pictogram(name="Grape", image=_upload(size=(100, 100)))
+        pictogram.refresh_from_db()
+
+        urls = PictogramOut.from_orm(pictogram).image_urls
+        assert set(urls) == {"64"}
+        assert urls["64"]["png"].startswith("/media/") and urls["64"]["png"].endswith("_64.png")
+
+    def test_url_only_pictograms_have_no_derivatives(self):
+        pictogram = PictogramService.create_pictogram(name="Remote", image_url="https://example.com/p.png")
+
+        assert PictogramOut.from_orm(pictogram).image_urls == {}
+
+
+@pytest.mark.django_db
+class TestBackfillCommand:
+    def _legacy(self, name="Old"):
+        pictogram = Pictogram.objects.create(name=name, image=_upload(size=(300, 300), name=f"{name}.png"))
+        assert pictogram.derivatives == {}
+        return pictogram
+
+    def test_fills_missing_derivatives(self):
+        pictogram = self._legacy()
+        out = StringIO()
+
+        call_command("generate_pictogram_derivatives", stdout=out)
+
+        pictogram.refresh_from_db()
+        assert sorted(pictogram.derivatives, key=int) == ["64", "128", "256"]
+        assert "Generated derivatives for 1 pictograms (0 failed)" in out.getvalue()
+
+    def test_skips_done_pictograms_unless_forced(self):
+        PictogramService.upload_pictogram(name="New", image=_upload())
+        out = StringIO()
+
+        call_command("generate_pictogram_derivatives", stdout=out)
+        assert "for 0 pictograms" in out.getvalue()
+
+        call_command("generate_pictogram_derivatives", "--force", stdout=out)
+        assert "for 1 pictograms" in out.getvalue()
+
+    def test_reports_missing_files_and_continues(self, media_root):
+        broken = self._legacy("Broken")
+        (media_root / broken.image.name).unlink()
+        fine = self._legacy("Fine")
+        out, err = StringIO(), StringIO()
+
+        call_command("generate_pictogram_derivatives", stdout=out, stderr=err)
+
+        assert f"Pictogram {broken.id}:" in err.getvalue()
+        fine.refresh_from_db()
+        assert fine.derivatives
+        assert "(1 failed)" in out.getvalue()
@@ -143,8 +143,9 @@ class TestPictogramUpload:
             data={"name": "Uploaded", "image": image, "organization_id": org.id},
             **headers,
         )
-        assert response.status_code == 201
+        assert response.status_code == 202
         assert response.json()["name"] == "Uploaded"
+        assert response.json()["status"] == "processing"
 
     def test_upload_pictogram_global(self, client, owner):
         headers = auth_header(client, "owner")
@@ -154,9 +155,34 @@ class TestPictogramUpload:
             data={"name": "Global Upload", "image": image},
             **headers,
         )
-        assert response.status_code == 201
+        assert response.status_code == 202
         assert response.json()["organization_id"] is None
 
+    def test_processed_upload_is_ready_with_derivatives(self, client, owner):
+        headers = auth_header(client, "owner")
+        response = client.post(
+            "/api/v1/pictograms/upload", data={"name": "Ready", "image": _make_test_image()}, **headers
+        )
+
+        body = client.get(f"/api/v1/pictograms/{response.json()['id']}", **headers).json()
+
+        assert body["status"] == "ready"
+        assert set(body["image_urls"]) == {"64"}
+
+    def test_truncated_upload_fails_processing(self, client, owner):
+        headers = auth_header(client, "owner")
+        buf = io.BytesIO()
+        Image.new("RGB", (64, 64), color="red").save(buf, format="PNG")
+        truncated = SimpleUploadedFile("broken.png", buf.getvalue()[:60], content_type="image/png")
+
+        response = client.post("/api/v1/pictograms/upload", data={"name": "Broken", "image": truncated}, **headers)
+
+        assert response.status_code == 202
+        body = client.get(f"/api/v1/pictograms/{response.json()['id']}", **headers).json()
+        assert body["status"] == "failed"
+        assert body["image_url"] == ""
+        assert body["image_urls"] == {}
+
 
 @pytest.mark.django_db
 class TestPictogramPermissions:
@@ -216,3 +242,61 @@ class TestPictogramPermissions:
         response = client.delete(f"/api/v1/pictograms/{p.id}", **headers)
         assert response.status_code == 204
         assert not Pictogram.objects.filter(id=p.id).exists()
+
+
+@pytest.mark.django_db
+class TestSearchPictograms:
+    @pytest.fixture
+    def catalog(self, org):
+        from apps.pictograms.models import Pictogram
+
+        other = Organization.objects.create(name="Other")
+        for name in ["Eat", "Eat breakfast", "Eating lunch together", "Great", "Sleep"]:
+            Pictogram.objects.create(name=name, image_url="https://example.com/p.png")
+        Pictogram.objects.create(name="Eat cake", image_url="https://example.com/p.png", organization=org)
+        Pictogram.objects.create(name="Eat secret", image_url="https://example.com/p.png", organization=other)
+
+    def _search(self, client, **params):
+        response = client.get("/api/v1/pictograms", params, **auth_header(client, "member"))
+        assert response.status_code == 200
+        return response.json()
+
+    def test_ranks_whole_words_and_short_names_first(self, client, org, member, catalog):
+        names = [item["name"] for item in self._search(client, q="eat")["items"]]
+
+        assert names == ["Eat", "Eat breakfast", "Eating lunch together"]
+
+    def test_respects_org_visibility(self, client, org, member, catalog):
+        names = [item["name"] for item in self._search(client, q="eat", organization_id=org.id)["items"]]
+
+        assert "Eat cake" in names
+        assert "Eat secret" not in names
+
+    def test_every_word_must_match_as_a_prefix(self, client, org, member, catalog):
+        names = [item["name"] for item in self._search(client, q="EAT break")["items"]]
+
+        assert names == ["Eat breakfast"]
+
+    def test_does_not_match_inside_words(self, client, org, member, catalog):
+        assert self._search(client, q="eat")["count"] == 3  # not "Great"
+
+    def test_query_without_words_matches_nothing(self, client, org, member, catalog):
+        assert self._search(client, q="&|!")["items"] == []
+
+    def test_cursor_pages_follow_rank(self, client, org, member, catalog):
+        first = self._search(client, q="eat", limit=2)
+        second = self._search(client, q="eat", limit=2, cursor=first["next_cursor"])
+
+        assert [item["name"] for item in first["items"] + second["items"]] == [
+            "Eat",
+            "Eat breakfast",
+            "Eating lunch together",
+        ]
+        assert second["next_cursor"] is None
+
+    def test_search_vector_follows_renames(self, client, org, member, catalog):
+        from apps.pictograms.models import Pictogram
+
+        Pictogram.objects.filter(name="Sleep").update(name="Nap time")
+
+        assert [item["name"] for item in self._search(client, q="nap")["items"]] == ["Nap time"]
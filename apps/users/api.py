@@ -53,6 +53,13 @@ def change_password(request, payload: PasswordChangeIn):
     return 200, updated
 
 
+@router.post("/users/me/logout-all", response={204: None})
+def logout_all(request):
+    """Revoke every access and refresh token issued to the current user."""
+    UserService.revoke_tokens(user_id=request.auth.id)
+    return 204, None
+
+
 @router.delete("/users/me", response={204: None})
 def delete_account(request):
     """Delete the current user's account."""
@@ -60,8 +67,12 @@ def delete_account(request):
     return 204, None
 
 
-@router.post("/users/me/profile-picture", response={200: UserOut, 422: ErrorOut})
+@router.post("/users/me/profile-picture", response={202: UserOut, 422: ErrorOut, 503: ErrorOut})
 def upload_profile_picture(request, file: File[UploadedFile]):
-    """Upload a profile picture."""
+    """Upload a profile picture.
+
+    Answers once the file is stored, with profile_picture_status "processing";
+    GET /users/me shows "ready" or "failed" once the image has been verified.
+    """
     updated = UserService.upload_profile_picture(user_id=request.auth.id, file=file)
-    return 200, updated
+    return 202, updated
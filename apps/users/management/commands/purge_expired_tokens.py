@@ -0,0 +1,77 @@
+"""Delete expired outstanding and blacklisted refresh tokens in small batches.
+
+Unlike ninja_jwt's `flushexpiredtokens`, which deletes everything in one
+statement, this walks the table in id order, commits each batch on its own
+and sleeps between batches, so it can run on a busy database. With
+`--checkpoint` the last purged id is written to a file after every batch and
+the next run resumes from there; the file is removed once the purge finishes.
+
+    python manage.py purge_expired_tokens --batch-size 1000 --sleep 0.5 \\
+        --max-batches 100 --checkpoint /var/tmp/giraf-token-purge
+"""
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.token_blacklist import purge_expired_batch
+
+
+class Command(BaseCommand):
+    help = "Delete expired OutstandingToken and BlacklistedToken rows in throttled batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tokens deleted per batch (default 1000).")
+        parser.add_argument("--sleep", type=float, default=0.5, help="Seconds to pause between batches (default 0.5).")
+        parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches.")
+        parser.add_argument("--checkpoint", type=Path, default=None, help="File recording progress between runs.")
+
+    def handle(self, *args, batch_size, sleep, max_batches, checkpoint, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        after_id = self._read_checkpoint(checkpoint)
+        if after_id:
+            self.stdout.write(f"Resuming after token id {after_id}.")
+
+        outstanding = blacklisted = batches = 0
+        finished = False
+        started = time.monotonic()
+        while max_batches is None or batches < max_batches:
+            if batches and sleep:
+                time.sleep(sleep)
+            last_id, purged, purged_blacklisted = purge_expired_batch(after_id=after_id, batch_size=batch_size)
+            if last_id is None:
+                finished = True
+                break
+
+            after_id = last_id
+            outstanding += purged
+            blacklisted += purged_blacklisted
+            batches += 1
+            if checkpoint is not None:
+                checkpoint.write_text(str(after_id))
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Batch {batches}: {purged} outstanding, {purged_blacklisted} blacklisted.")
+
+        if finished and checkpoint is not None:
+            checkpoint.unlink(missing_ok=True)
+
+        elapsed = time.monotonic() - started
+        rate = (outstanding + blacklisted) / elapsed if elapsed > 0 else 0.0
+        status = "Done" if finished else f"Stopped after {batches} batches; rerun to continue"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{status}. Purged {outstanding} outstanding and {blacklisted} blacklisted tokens "
+                f"in {elapsed:.2f}s ({rate:.0f} rows/s)."
+            )
+        )
+
+    def _read_checkpoint(self, checkpoint: Path | None) -> int:
+        if checkpoint is None or not checkpoint.exists():
+            return 0
+        try:
+            return int(checkpoint.read_text().strip() or 0)
+        except ValueError as exc:
+            raise CommandError(f"Invalid checkpoint file {checkpoint}.") from exc
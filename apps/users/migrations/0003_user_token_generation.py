@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='token_generation',
+            field=models.PositiveIntegerField(default=0, help_text="Embedded in issued tokens; bumping it revokes all of the user's tokens"),
+        ),
+    ]
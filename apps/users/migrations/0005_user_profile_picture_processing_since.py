@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 23:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_user_profile_picture_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_processing_since',
+            field=models.DateTimeField(blank=True, editable=False, help_text="When the picture's verification was queued; cleared once it is ready or failed", null=True),
+        ),
+    ]
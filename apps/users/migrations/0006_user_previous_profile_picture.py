@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 23:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_profile_picture_processing_since'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='previous_profile_picture',
+            field=models.CharField(blank=True, default='', editable=False, help_text='The picture to restore if the upload being verified fails; released once it is ready', max_length=100),
+        ),
+    ]
@@ -7,6 +7,8 @@ Users are caretakers, teachers, and staff at institutions serving kids with auti
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from core.images import ImageStatus
+
 
 class User(AbstractUser):
     """GIRAF platform user (caretaker, teacher, staff)."""
@@ -21,6 +23,29 @@ class User(AbstractUser):
         blank=True,
         help_text="User profile picture (max 5MB, JPEG/PNG/WebP)",
     )
+    profile_picture_status = models.CharField(
+        max_length=16,
+        choices=ImageStatus.choices,
+        default=ImageStatus.READY,
+        help_text="Whether the latest upload is still being verified, or failed verification",
+    )
+    profile_picture_processing_since = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the picture's verification was queued; cleared once it is ready or failed",
+    )
+    previous_profile_picture = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        editable=False,
+        help_text="The picture to restore if the upload being verified fails; released once it is ready",
+    )
+    token_generation = models.PositiveIntegerField(
+        default=0,
+        help_text="Embedded in issued tokens; bumping it revokes all of the user's tokens",
+    )
 
     class Meta:
         db_table = "users"
@@ -3,15 +3,21 @@
 All business logic lives here — never in API endpoints.
 """
 
-import mimetypes
+from functools import partial
 
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import transaction
-from PIL import Image
+from django.utils import timezone
 
+from apps.blobs.services import BlobService
+from apps.organizations.models import Membership
 from apps.users.models import User
+from core.etags import bump_org_data
 from core.exceptions import BusinessValidationError, ConflictError, ResourceNotFoundError
+from core.images import ImageStatus, reserve, validate_upload, verify_image
+from core.permissions import invalidate_memberships
+from core.token_generation import bump_token_generation, forget_token_generation
 
 
 class UserService:
@@ -64,7 +70,10 @@ class UserService:
             user.last_name = last_name
         if email is not None:
             user.email = email
-        user.save()
+        # Only the profile fields: a full save would write back a stale token generation or picture.
+        user.save(update_fields=["first_name", "last_name", "email"])
+        # Member lists show profile fields.
+        bump_org_data(*Membership.objects.filter(user_id=user_id).values_list("organization_id", flat=True))
         return user
 
     @staticmethod
@@ -86,47 +95,116 @@ class UserService:
             raise BusinessValidationError(e.messages)
 
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=["password"])
+        # A new password logs out every existing session, including this one.
+        bump_token_generation(user_id)
         return user
 
+    @staticmethod
+    @transaction.atomic
+    def revoke_tokens(*, user_id: int) -> None:
+        """Log the user out everywhere by invalidating every token issued so far."""
+        UserService._get_user_or_raise(user_id)
+        bump_token_generation(user_id)
+
     @staticmethod
     @transaction.atomic
     def delete_user(*, user_id: int) -> None:
         """Hard delete user account."""
         user = UserService._get_user_or_raise(user_id)
+        org_ids = list(Membership.objects.filter(user_id=user_id).values_list("organization_id", flat=True))
         user.delete()
+        BlobService.release(user.profile_picture.name)
+        BlobService.release(user.previous_profile_picture)
+        invalidate_memberships(user_ids=(user_id,))
+        bump_org_data(*org_ids)
+        forget_token_generation(user_id)
 
     @staticmethod
-    @transaction.atomic
     def upload_profile_picture(*, user_id: int, file) -> User:
-        """Upload and validate profile picture.
+        """Store a new profile picture and queue its verification.
+
+        Only the file's header is checked here. The user is returned with
+        `profile_picture_status` "processing"; the image pool sets it to "ready"
+        and releases the previous picture's blob (see apps.blobs), or to
+        "failed" if the image is corrupt, removing the upload and restoring the
+        previous picture.
 
         Raises:
             BusinessValidationError: If file type or size is invalid.
+            ServiceUnavailableError: If the image pool's queue is full.
         """
         user = UserService._get_user_or_raise(user_id)
+        validate_upload(file)
 
-        # Validate file type
-        mime_type, _ = mimetypes.guess_type(file.name)
-        allowed_types = ["image/jpeg", "image/png", "image/webp"]
-        if mime_type not in allowed_types:
-            raise BusinessValidationError("Only JPEG, PNG, and WebP images are allowed.")
-
-        # Validate file size (max 5MB)
-        max_size = 5 * 1024 * 1024
-        if file.size > max_size:
-            raise BusinessValidationError("File size must not exceed 5MB.")
-
-        try:
-            Image.open(file).verify()
+        with reserve() as job:
+            data = file.read()
             file.seek(0)
-        except Exception:
-            raise BusinessValidationError("File is not a valid image.")
+            user.profile_picture.save(file.name, file, save=False)
+            user.profile_picture_status = ImageStatus.PROCESSING
+            user.profile_picture_processing_since = timezone.now()
+            with transaction.atomic():
+                current, status, previous = (
+                    User.objects.select_for_update()
+                    .values_list("profile_picture", "profile_picture_status", "previous_profile_picture")
+                    .get(pk=user_id)
+                )
+                if status == ImageStatus.PROCESSING:
+                    BlobService.release(current)  # An upload still being verified; keep what it would replace.
+                else:
+                    previous = current or ""
+                user.previous_profile_picture = previous
+                user.save(
+                    update_fields=[
+                        "profile_picture",
+                        "profile_picture_status",
+                        "profile_picture_processing_since",
+                        "previous_profile_picture",
+                    ]
+                )
+            job.submit(verify_image, data, on_done=partial(_finish_profile_picture, user.id, user.profile_picture.name))
+        return user
 
-        # Delete old profile picture if exists
-        if user.profile_picture:
-            user.profile_picture.delete(save=False)
+    @staticmethod
+    def retry_profile_picture(user: User) -> bool:
+        """Verify on this thread a profile picture whose image job was lost, e.g. with a restarted worker.
 
-        # Save new profile picture
-        user.profile_picture.save(file.name, file, save=True)
-        return user
+        Returns whether the picture is now ready; the upload is removed and
+        marked failed if it is missing or not a valid image.
+        """
+        picture = user.profile_picture.name
+        try:
+            with user.profile_picture.storage.open(picture, "rb") as stored:
+                digest, error = verify_image(stored.read()), None
+        except (OSError, ValueError) as exc:
+            digest, error = None, exc
+        _finish_profile_picture(user.id, picture, digest, error)
+        return error is None
+
+
+def _finish_profile_picture(user_id: int, picture: str, digest: str | None, error: BaseException | None) -> None:
+    """Record the image pool's verdict on an uploaded profile picture, moving it into its blob."""
+    with transaction.atomic():
+        pending = User.objects.select_for_update().filter(
+            pk=user_id, profile_picture=picture, profile_picture_status=ImageStatus.PROCESSING
+        )
+        previous = pending.values_list("previous_profile_picture", flat=True).first()
+        if previous is None:  # Replaced or deleted meanwhile, which removed the upload.
+            return
+        if error is not None:
+            BlobService.release(picture)
+            pending.update(
+                profile_picture=previous or None,
+                profile_picture_status=ImageStatus.FAILED,
+                profile_picture_processing_since=None,
+                previous_profile_picture="",
+            )
+        else:
+            blob = BlobService.acquire(digest=digest, upload=picture)  # type: ignore[arg-type]
+            BlobService.release(previous)
+            pending.update(
+                profile_picture=blob.name,
+                profile_picture_status=ImageStatus.READY,
+                profile_picture_processing_since=None,
+                previous_profile_picture="",
+            )
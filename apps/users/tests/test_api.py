@@ -209,8 +209,9 @@ class TestUploadProfilePicture:
             data={"file": image_file},
             **headers,
         )
-        assert response.status_code == 200
+        assert response.status_code == 202
         data = response.json()
+        assert data["profile_picture_status"] == "processing"
         assert data["profile_picture"] is not None
         assert "profile_pictures" in data["profile_picture"]
 
@@ -245,7 +246,7 @@ class TestUploadProfilePicture:
             data={"file": image1},
             **headers,
         )
-        assert response1.status_code == 200
+        assert response1.status_code == 202
         first_path = response1.json()["profile_picture"]
 
         # Upload second image
@@ -262,12 +263,58 @@ class TestUploadProfilePicture:
             data={"file": image2},
             **headers,
         )
-        assert response2.status_code == 200
+        assert response2.status_code == 202
         second_path = response2.json()["profile_picture"]
 
         # Paths should be different
         assert first_path != second_path
 
+    def test_verified_picture_becomes_ready(self, client, user):
+        headers = get_auth_header(client)
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(buf, format="PNG")
+        image = SimpleUploadedFile("test.png", buf.getvalue(), content_type="image/png")
+
+        client.post("/api/v1/users/me/profile-picture", data={"file": image}, **headers)
+
+        data = client.get("/api/v1/users/me", **headers).json()
+        assert data["profile_picture_status"] == "ready"
+        assert "/blobs/" in data["profile_picture"]  # Moved into its content-addressed blob.
+
+    def test_truncated_picture_fails_verification(self, client, user):
+        headers = get_auth_header(client)
+        buf = io.BytesIO()
+        Image.new("RGB", (64, 64), color="red").save(buf, format="PNG")
+        good = SimpleUploadedFile("good.png", buf.getvalue(), content_type="image/png")
+        truncated = SimpleUploadedFile("test.png", buf.getvalue()[:60], content_type="image/png")
+        client.post("/api/v1/users/me/profile-picture", data={"file": good}, **headers)
+        old_picture = client.get("/api/v1/users/me", **headers).json()["profile_picture"]
+
+        response = client.post("/api/v1/users/me/profile-picture", data={"file": truncated}, **headers)
+
+        assert response.status_code == 202  # The header is intact; the pixels are not.
+        data = client.get("/api/v1/users/me", **headers).json()
+        assert data["profile_picture_status"] == "failed"
+        assert data["profile_picture"] == old_picture
+
+    def test_profile_update_keeps_a_picture_finished_meanwhile(self, user, monkeypatch):
+        from apps.users.services import UserService
+
+        # The row as loaded by a profile update that started before the image pool finished.
+        stale = User.objects.get(pk=user.pk)
+        buf = io.BytesIO()
+        Image.new("RGB", (10, 10), color="red").save(buf, format="PNG")
+        UserService.upload_profile_picture(
+            user_id=user.pk, file=SimpleUploadedFile("test.png", buf.getvalue(), content_type="image/png")
+        )
+        monkeypatch.setattr(UserService, "_get_user_or_raise", staticmethod(lambda user_id: stale))
+
+        UserService.update_user(user_id=user.pk, first_name="Changed")
+
+        user.refresh_from_db()
+        assert user.profile_picture_status == "ready"
+        assert user.profile_picture.name.startswith("blobs/")
+
     def test_upload_profile_picture_unauthenticated(self, client):
         image_file = SimpleUploadedFile(
             "test.jpg",
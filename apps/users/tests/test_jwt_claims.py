@@ -83,3 +83,27 @@ class TestJWTOrgRoleClaims:
         tokens = login(client)
         access = AccessToken(tokens["access"])
         assert access["org_roles"][str(org_b.id)] == "owner"
+
+
+@pytest.mark.django_db
+class TestCompactOrgRoleClaims:
+    @pytest.fixture(autouse=True)
+    def _compact(self, settings):
+        settings.JWT_ORG_ROLES_FORMAT = "compact"
+
+    def test_access_token_carries_packed_claim(self, client, user, orgs_with_roles):
+        from core.org_roles import decode_org_roles
+
+        org_a, org_b, org_c = orgs_with_roles
+        access = AccessToken(login(client)["access"])
+
+        assert "org_roles" not in access
+        assert decode_org_roles(access["org_roles_packed"]) == {
+            str(org_a.id): "owner",
+            str(org_b.id): "admin",
+            str(org_c.id): "member",
+        }
+
+    def test_response_body_keeps_dict(self, client, user, orgs_with_roles):
+        org_a, _, _ = orgs_with_roles
+        assert login(client)["org_roles"][str(org_a.id)] == "owner"
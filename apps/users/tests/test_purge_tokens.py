@@ -0,0 +1,69 @@
+"""Tests for the purge_expired_tokens management command."""
+
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from ninja_jwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.tests.factories import UserFactory
+
+
+def _token(user, n, *, expired=True, blacklisted=False):
+    offset = timedelta(days=-1 if expired else 1)
+    token = OutstandingToken.objects.create(user=user, jti=f"jti-{n}", token="x", expires_at=timezone.now() + offset)
+    if blacklisted:
+        BlacklistedToken.objects.create(token=token)
+    return token
+
+
+def _purge(*args):
+    out = StringIO()
+    call_command("purge_expired_tokens", "--sleep", "0", *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+class TestPurgeExpiredTokens:
+    def test_deletes_only_expired_tokens(self):
+        user = UserFactory()
+        _token(user, 1)
+        _token(user, 2, blacklisted=True)
+        live = _token(user, 3, expired=False, blacklisted=True)
+
+        output = _purge("--batch-size", "1")
+
+        assert list(OutstandingToken.objects.all()) == [live]
+        assert list(BlacklistedToken.objects.values_list("token_id", flat=True)) == [live.id]
+        assert "Purged 2 outstanding and 1 blacklisted tokens" in output
+        assert "rows/s" in output
+
+    def test_max_batches_bounds_work(self):
+        user = UserFactory()
+        for n in range(5):
+            _token(user, n)
+
+        output = _purge("--batch-size", "2", "--max-batches", "1")
+
+        assert OutstandingToken.objects.count() == 3
+        assert "Stopped after 1 batches" in output
+
+    def test_resumes_from_checkpoint(self, tmp_path):
+        user = UserFactory()
+        tokens = [_token(user, n) for n in range(4)]
+        checkpoint = tmp_path / "purge"
+
+        _purge("--batch-size", "2", "--max-batches", "1", "--checkpoint", str(checkpoint))
+        assert checkpoint.read_text() == str(tokens[1].id)
+
+        output = _purge("--batch-size", "2", "--checkpoint", str(checkpoint))
+
+        assert f"Resuming after token id {tokens[1].id}" in output
+        assert OutstandingToken.objects.count() == 0
+        assert not checkpoint.exists()
+
+    def test_rejects_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            _purge("--batch-size", "0")
@@ -58,3 +58,122 @@ class TestTokenBlacklist:
             content_type="application/json",
         )
         assert resp.status_code in (401, 422)
+
+
+def _blacklist_queries(queries) -> int:
+    return sum(1 for q in queries if "token_blacklist_blacklistedtoken" in q["sql"])
+
+
+def _blacklist_elsewhere(refresh: str) -> None:
+    """Blacklist a token the way another worker would: straight in the database."""
+    from ninja_jwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+    from ninja_jwt.tokens import UntypedToken
+
+    jti = UntypedToken(refresh)["jti"]
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=jti))
+
+
+@pytest.mark.django_db
+class TestBlacklistIndex:
+    def _login(self, client):
+        UserFactory(username="idxuser", password="testpass123")
+        resp = client.post(
+            "/api/v1/token/pair",
+            data={"username": "idxuser", "password": "testpass123"},
+            content_type="application/json",
+        )
+        return resp.json()["refresh"]
+
+    def _refresh(self, client, refresh):
+        return client.post("/api/v1/token/refresh", data={"refresh": refresh}, content_type="application/json")
+
+    def test_refresh_skips_blacklist_query_once_synced(self, client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        refresh = self._login(client)
+        assert self._refresh(client, refresh).status_code == 200
+
+        with CaptureQueriesContext(connection) as ctx:
+            assert self._refresh(client, refresh).status_code == 200
+        assert _blacklist_queries(ctx.captured_queries) == 0
+
+    def test_verify_rejects_blacklisted_token(self, client):
+        refresh = self._login(client)
+        client.post("/api/v1/token/blacklist", data={"refresh": refresh}, content_type="application/json")
+
+        resp = client.post("/api/v1/token/verify", data={"token": refresh}, content_type="application/json")
+        assert resp.status_code in (400, 401)
+
+    def test_entry_from_other_worker_seen_after_sync_interval(self, client, settings):
+        settings.JWT_BLACKLIST_SYNC_INTERVAL = 0
+        refresh = self._login(client)
+        _blacklist_elsewhere(refresh)
+
+        assert self._refresh(client, refresh).status_code == 401
+
+    def test_entry_from_other_worker_not_seen_before_sync_interval(self, client, settings):
+        settings.JWT_BLACKLIST_SYNC_INTERVAL = 3600
+        refresh = self._login(client)
+        assert self._refresh(client, refresh).status_code == 200
+        _blacklist_elsewhere(refresh)
+
+        assert self._refresh(client, refresh).status_code == 200
+
+    def test_expired_entries_are_pruned(self):
+        from core.token_blacklist import blacklist_index
+
+        blacklist_index.add("expired-jti", 0)
+        blacklist_index.add("live-jti", 2**40)
+        blacklist_index.sync()
+
+        assert "expired-jti" not in blacklist_index
+        assert "live-jti" in blacklist_index
+
+    def test_lower_id_committed_after_a_higher_one_is_picked_up(self, settings, monkeypatch):
+        from datetime import timedelta
+
+        from ninja_jwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from ninja_jwt.utils import aware_utcnow
+
+        from core import token_blacklist
+        from core.token_blacklist import blacklist_index
+
+        settings.JWT_BLACKLIST_SYNC_MARGIN = 60
+        clock = [1000.0]
+        monkeypatch.setattr(token_blacklist.time, "monotonic", lambda: clock[0])
+        expires_at = aware_utcnow() + timedelta(hours=1)
+        late, early = (OutstandingToken.objects.create(jti=jti, token=jti, expires_at=expires_at) for jti in "ab")
+        BlacklistedToken.objects.create(id=20, token=early)
+        blacklist_index.sync()
+
+        # Another worker's transaction got id 10 before id 20 but commits after the sync above.
+        clock[0] += 30
+        BlacklistedToken.objects.create(id=10, token=late)
+        blacklist_index.sync()
+
+        assert "a" in blacklist_index
+
+    def test_rescan_window_moves_past_old_rows(self, settings, monkeypatch):
+        from datetime import timedelta
+
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from ninja_jwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from ninja_jwt.utils import aware_utcnow
+
+        from core import token_blacklist
+        from core.token_blacklist import blacklist_index
+
+        settings.JWT_BLACKLIST_SYNC_MARGIN = 60
+        clock = [1000.0]
+        monkeypatch.setattr(token_blacklist.time, "monotonic", lambda: clock[0])
+        token = OutstandingToken.objects.create(jti="a", token="a", expires_at=aware_utcnow() + timedelta(hours=1))
+        BlacklistedToken.objects.create(id=20, token=token)
+        blacklist_index.sync()
+
+        clock[0] += 61
+        with CaptureQueriesContext(connection) as ctx:
+            blacklist_index.sync()
+
+        assert "> 20" in ctx.captured_queries[0]["sql"]
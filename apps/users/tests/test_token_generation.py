@@ -0,0 +1,111 @@
+"""Tests for per-user token generations ("log out everywhere")."""
+
+import pytest
+from ninja_jwt.tokens import RefreshToken
+
+from apps.users.models import User
+from conftest import auth_header
+from core.token_generation import bump_token_generation
+
+
+def _pair(client, username="member", password="testpass123"):
+    resp = client.post(
+        "/api/v1/token/pair",
+        data={"username": username, "password": password},
+        content_type="application/json",
+    )
+    return resp.json()
+
+
+def _bearer(access):
+    return {"HTTP_AUTHORIZATION": f"Bearer {access}"}
+
+
+def _post(client, path, data):
+    return client.post(path, data=data, content_type="application/json")
+
+
+@pytest.mark.django_db
+class TestTokenGeneration:
+    def test_logout_all_revokes_every_token(self, client, member):
+        first, second = _pair(client), _pair(client)
+
+        assert client.post("/api/v1/users/me/logout-all", **_bearer(first["access"])).status_code == 204
+
+        for tokens in (first, second):
+            assert client.get("/api/v1/users/me", **_bearer(tokens["access"])).status_code == 401
+            assert _post(client, "/api/v1/token/refresh/roles", {"refresh": tokens["refresh"]}).status_code == 401
+        # /token/refresh and /token/verify share the 5/min login throttle with /token/pair.
+        assert _post(client, "/api/v1/token/refresh", {"refresh": second["refresh"]}).status_code == 401
+        assert _post(client, "/api/v1/token/verify", {"token": second["access"]}).status_code == 401
+        results = _post(client, "/api/v1/token/verify/batch", {"tokens": [first["access"]]}).json()["results"]
+        assert results[0]["valid"] is False
+
+    def test_new_login_after_revocation_works(self, client, member):
+        bump_token_generation(member.id)
+
+        assert client.get("/api/v1/users/me", **auth_header(client, "member")).status_code == 200
+
+    def test_claims_mode_rejects_revoked_token(self, client, member, settings):
+        settings.JWT_CLAIMS_AUTH = True
+        tokens = _pair(client)
+        assert client.get("/api/v1/users/me", **_bearer(tokens["access"])).status_code == 200
+
+        bump_token_generation(member.id)
+
+        assert client.get("/api/v1/users/me", **_bearer(tokens["access"])).status_code == 401
+
+    def test_change_password_revokes_existing_tokens(self, client, member):
+        tokens = _pair(client)
+        resp = client.put(
+            "/api/v1/users/me/password",
+            data={"old_password": "testpass123", "new_password": "NewStr0ngPass!"},
+            content_type="application/json",
+            **_bearer(tokens["access"]),
+        )
+        assert resp.status_code == 200
+
+        assert _post(client, "/api/v1/token/refresh", {"refresh": tokens["refresh"]}).status_code == 401
+        assert "refresh" in _pair(client, password="NewStr0ngPass!")
+
+    def test_deleted_user_tokens_are_rejected(self, client, member):
+        tokens = _pair(client)
+        assert client.delete("/api/v1/users/me", **_bearer(tokens["access"])).status_code == 204
+
+        assert _post(client, "/api/v1/token/refresh", {"refresh": tokens["refresh"]}).status_code == 401
+
+    def test_tokens_without_generation_claim_count_as_zero(self, client, member):
+        refresh = RefreshToken.for_user(member)
+
+        assert _post(client, "/api/v1/token/refresh", {"refresh": str(refresh)}).status_code == 200
+
+        bump_token_generation(member.id)
+        assert _post(client, "/api/v1/token/refresh", {"refresh": str(refresh)}).status_code == 401
+
+    def test_bump_is_a_single_update(self, member, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            bump_token_generation(member.id)
+        assert User.objects.get(id=member.id).token_generation == 1
+
+    def test_generation_cache_can_be_disabled(self, member, settings):
+        from core.token_generation import current_generation
+
+        settings.TOKEN_GENERATION_CACHE_TIMEOUT = 0
+        assert current_generation(member.id) == 0
+
+        User.objects.filter(id=member.id).update(token_generation=3)  # As a bump on another worker.
+
+        assert current_generation(member.id) == 3
+
+    def test_profile_update_keeps_a_concurrent_bump(self, member, monkeypatch):
+        from apps.users.services import UserService
+
+        # The row as loaded by an update that started before the bump committed.
+        stale = User.objects.get(id=member.id)
+        monkeypatch.setattr(UserService, "_get_user_or_raise", staticmethod(lambda user_id: stale))
+        bump_token_generation(member.id)
+
+        UserService.update_user(user_id=member.id, first_name="Changed")
+
+        user = User.objects.get(id=member.id)
+        assert (user.first_name, user.token_generation) == ("Changed", 1)
@@ -0,0 +1,81 @@
+"""Tests for POST /api/v1/token/refresh/roles."""
+
+import time
+
+import pytest
+from ninja_jwt.tokens import AccessToken
+
+from apps.organizations.models import Membership, OrgRole
+
+
+def _pair(client, username="member"):
+    resp = client.post(
+        "/api/v1/token/pair",
+        data={"username": username, "password": "testpass123"},
+        content_type="application/json",
+    )
+    return resp.json()
+
+
+def _refresh_roles(client, refresh):
+    return client.post("/api/v1/token/refresh/roles", data={"refresh": refresh}, content_type="application/json")
+
+
+@pytest.mark.django_db
+class TestTokenRefreshRoles:
+    def test_picks_up_new_membership(self, client, org, second_org, member):
+        tokens = _pair(client)
+        Membership.objects.create(user=member, organization=second_org, role=OrgRole.ADMIN)
+
+        resp = _refresh_roles(client, tokens["refresh"])
+
+        assert resp.status_code == 200
+        expected = {str(org.id): "member", str(second_org.id): "admin"}
+        assert resp.json()["org_roles"] == expected
+        access = AccessToken(resp.json()["access"])
+        assert access["org_roles"] == expected
+        assert access["user_id"] == member.id
+        assert access["username"] == "member"
+
+    def test_reissued_token_has_fresh_iat(self, client, org, member):
+        tokens = _pair(client)
+        before = int(time.time())
+
+        access = AccessToken(_refresh_roles(client, tokens["refresh"]).json()["access"])
+
+        assert access["iat"] >= before
+
+    def test_uses_single_membership_query(self, client, org, member, settings, django_assert_num_queries):
+        from core.token_blacklist import blacklist_index
+        from core.token_generation import current_generation
+
+        settings.JWT_BLACKLIST_SYNC_INTERVAL = 3600
+        tokens = _pair(client)
+        blacklist_index.sync()
+        current_generation(member.id)
+
+        with django_assert_num_queries(1) as ctx:
+            assert _refresh_roles(client, tokens["refresh"]).status_code == 200
+        assert "memberships" in ctx.captured_queries[0]["sql"]
+
+    def test_compact_format(self, client, org, member, settings):
+        from core.org_roles import decode_org_roles
+
+        settings.JWT_ORG_ROLES_FORMAT = "compact"
+        tokens = _pair(client)
+
+        resp = _refresh_roles(client, tokens["refresh"])
+
+        access = AccessToken(resp.json()["access"])
+        assert "org_roles" not in access
+        assert decode_org_roles(access["org_roles_packed"]) == {str(org.id): "member"}
+        assert resp.json()["org_roles"] == {str(org.id): "member"}
+
+    def test_rejects_access_token(self, client, org, member):
+        assert _refresh_roles(client, _pair(client)["access"]).status_code == 401
+
+    def test_rejects_blacklisted_refresh_token(self, client, org, member):
+        refresh = _pair(client)["refresh"]
+        client.post("/api/v1/token/blacklist", data={"refresh": refresh}, content_type="application/json")
+
+        assert _refresh_roles(client, refresh).status_code == 401
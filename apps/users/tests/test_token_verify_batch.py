@@ -0,0 +1,83 @@
+"""Tests for POST /api/v1/token/verify/batch."""
+
+from datetime import timedelta
+
+import pytest
+from ninja_jwt.tokens import AccessToken
+
+from core.jwt import VERIFY_BATCH_MAX_TOKENS
+
+
+def _pair(client, username="member"):
+    resp = client.post(
+        "/api/v1/token/pair",
+        data={"username": username, "password": "testpass123"},
+        content_type="application/json",
+    )
+    return resp.json()
+
+
+def _verify(client, tokens):
+    return client.post("/api/v1/token/verify/batch", data={"tokens": tokens}, content_type="application/json")
+
+
+@pytest.mark.django_db
+class TestTokenVerifyBatch:
+    def test_returns_claims_per_token_in_order(self, client, org, member):
+        tokens = _pair(client)
+
+        resp = _verify(client, [tokens["access"], "not-a-token", tokens["refresh"]])
+
+        assert resp.status_code == 200
+        access, garbage, refresh = resp.json()["results"]
+        assert access["valid"] is True
+        assert access["token_type"] == "access"
+        assert access["user_id"] == member.id
+        assert access["org_roles"] == {str(org.id): "member"}
+        assert access["exp"] == AccessToken(tokens["access"])["exp"]
+        assert garbage["valid"] is False
+        assert garbage["detail"]
+        assert refresh["valid"] is True
+        assert refresh["token_type"] == "refresh"
+
+    def test_rejects_expired_token(self, client, member):
+        token = AccessToken.for_user(member)
+        token.set_exp(lifetime=timedelta(seconds=-1))
+
+        result = _verify(client, [str(token)]).json()["results"][0]
+
+        assert result["valid"] is False
+
+    def test_rejects_blacklisted_refresh_token(self, client, org, member):
+        refresh = _pair(client)["refresh"]
+        client.post("/api/v1/token/blacklist", data={"refresh": refresh}, content_type="application/json")
+
+        result = _verify(client, [refresh]).json()["results"][0]
+
+        assert result == {**result, "valid": False, "detail": "Token is blacklisted"}
+
+    def test_no_database_access_once_caches_are_warm(self, client, org, member, settings, django_assert_num_queries):
+        from core.token_blacklist import blacklist_index
+        from core.token_generation import current_generation
+
+        settings.JWT_BLACKLIST_SYNC_INTERVAL = 3600
+        tokens = _pair(client)
+        blacklist_index.sync()
+        current_generation(member.id)
+
+        with django_assert_num_queries(0):
+            resp = _verify(client, [tokens["access"], tokens["refresh"]] * 10)
+        assert all(result["valid"] for result in resp.json()["results"])
+
+    def test_limits_batch_size(self, client, org, member):
+        access = _pair(client)["access"]
+
+        assert _verify(client, [access] * (VERIFY_BATCH_MAX_TOKENS + 1)).status_code == 422
+        assert _verify(client, []).status_code == 422
+
+    def test_not_limited_by_login_throttle(self, client, org, member):
+        access = _pair(client)["access"]
+
+        statuses = {_verify(client, [access]).status_code for _ in range(10)}
+
+        assert statuses == {200}
@@ -0,0 +1,49 @@
+"""Citizen name search latency in an organization of 100k citizens.
+
+Not part of the test suite. Runs against the configured database. On
+PostgreSQL prefix and fuzzy terms are index scans (text_pattern_ops and
+pg_trgm GIN); on the test settings' SQLite every search scans the
+organization, calling the Python word_similarity() for fuzzy terms. Run with:
+
+    uv run pytest benchmarks/bench_citizen_search.py -s
+"""
+
+import random
+import time
+
+import pytest
+
+from apps.citizens.models import Citizen
+from apps.citizens.services import CitizenService
+from apps.organizations.models import Organization
+
+CITIZENS = 100_000
+ROUNDS = 20
+FIRST = ["Søren", "Anna", "Mikkel", "Freja", "Oliver", "Ida", "Noah", "Emma", "Lucas", "Alma", "Magnus", "Clara"]
+LAST = ["Jensen", "Nielsen", "Hansen", "Pedersen", "Andersen", "Christensen", "Larsen", "Sørensen", "Rasmussen"]
+QUERIES = ("s", "ma", "sor", "andersen", "freja niel", "pedersn")
+
+
+def _seconds(org_id: int, q: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        found = list(CitizenService.list_citizens(org_id, q=q).values_list("id", flat=True)[:20])
+    return (time.perf_counter() - started) / ROUNDS, len(found)
+
+
+@pytest.mark.django_db
+def test_citizen_search_latency():
+    org = Organization.objects.create(name="Big school")
+    rng = random.Random(4711)
+    citizens = []
+    for n in range(CITIZENS):
+        citizen = Citizen(organization=org, first_name=rng.choice(FIRST), last_name=f"{rng.choice(LAST)}{n % 97 or ''}")
+        citizen.refresh_name_keys()
+        citizens.append(citizen)
+    Citizen.objects.bulk_create(citizens, batch_size=5000)
+
+    print()
+    print(f"{'q':>12} {'ms/page':>9} {'rows':>5}")
+    for q in QUERIES:
+        seconds, rows = _seconds(org.id, q)
+        print(f"{q:>12} {seconds * 1e3:>9.2f} {rows:>5}")
@@ -0,0 +1,51 @@
+"""Size and decode cost of the org_roles claim: dict vs compact.
+
+Not part of the test suite. Run with:
+
+    uv run pytest benchmarks/bench_org_roles.py -s
+"""
+
+import time
+
+from ninja_jwt.tokens import AccessToken
+
+from core.org_roles import ORG_ROLES_CLAIM, ORG_ROLES_PACKED_CLAIM, encode_org_roles, org_roles_from_token
+
+MEMBERSHIP_COUNTS = (1, 10, 100)
+ROUNDS = 2000
+
+
+def _org_roles(count: int) -> dict[str, str]:
+    # Realistic ids: a staff user's orgs are spread over a few thousand rows.
+    roles = ("member", "member", "member", "admin", "owner")
+    return {str(1000 + 37 * n): roles[n % len(roles)] for n in range(count)}
+
+
+def _access_token(org_roles: dict[str, str], compact: bool) -> str:
+    token = AccessToken()
+    token["user_id"] = "4711"
+    if compact:
+        token[ORG_ROLES_PACKED_CLAIM] = encode_org_roles(org_roles)
+    else:
+        token[ORG_ROLES_CLAIM] = org_roles
+    return str(token)
+
+
+def _decode_seconds(raw: str) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        org_roles_from_token(AccessToken(raw))
+    return (time.perf_counter() - started) / ROUNDS
+
+
+def test_org_roles_claim_size_and_decode():
+    print()
+    print(f"{'orgs':>5} {'format':>8} {'header B':>9} {'decode us':>10}")
+    for count in MEMBERSHIP_COUNTS:
+        org_roles = _org_roles(count)
+        for compact in (False, True):
+            raw = _access_token(org_roles, compact)
+            assert org_roles_from_token(AccessToken(raw)) == org_roles
+            header = len(f"Bearer {raw}")
+            label = "compact" if compact else "dict"
+            print(f"{count:>5} {label:>8} {header:>9} {_decode_seconds(raw) * 1e6:>10.1f}")
@@ -0,0 +1,52 @@
+"""Ranked pictogram search latency over a 100k-row synthetic catalog.
+
+Not part of the test suite. Runs against the configured database. On
+PostgreSQL the search is a GIN index scan on the stored tsvector; on the
+test settings' SQLite every visible row goes through the Python
+text_match(). Run with:
+
+    uv run pytest benchmarks/bench_pictogram_search.py -s
+"""
+
+import random
+import time
+
+import pytest
+
+from apps.organizations.models import Organization
+from apps.pictograms.models import Pictogram
+from apps.pictograms.services import PictogramService
+
+PICTOGRAMS = 100_000
+ORG_SHARE = 0.2  # of the catalog belonging to the searched organization
+ROUNDS = 10
+WORDS = ["eat", "drink", "sleep", "play", "school", "bus", "home", "happy", "sad", "tired", "apple", "toilet", "music"]
+QUERIES = ("eat", "sch", "happy home", "toil", "zebra")
+
+
+def _seconds(org_id: int, q: str) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        found = list(PictogramService.search_pictograms(q, org_id).values_list("id", flat=True)[:20])
+    return (time.perf_counter() - started) / ROUNDS, len(found)
+
+
+@pytest.mark.django_db
+def test_pictogram_search_latency():
+    org = Organization.objects.create(name="Big school")
+    rng = random.Random(4711)
+    pictograms = [
+        Pictogram(
+            name=" ".join(rng.sample(WORDS, rng.randint(1, 3))) + f" {n}",
+            image_url="https://example.com/p.png",
+            organization=org if rng.random() < ORG_SHARE else None,
+        )
+        for n in range(PICTOGRAMS)
+    ]
+    Pictogram.objects.bulk_create(pictograms, batch_size=5000)
+
+    print()
+    print(f"{'q':>12} {'ms/page':>9} {'rows':>5}")
+    for q in QUERIES:
+        seconds, rows = _seconds(org.id, q)
+        print(f"{q:>12} {seconds * 1e3:>9.2f} {rows:>5}")
@@ -0,0 +1,49 @@
+"""Throttle checks per second: ninja's SimpleRateThrottle vs GCRAThrottle.
+
+Not part of the test suite. Each round hammers one key at a rate whose
+history list is full, so SimpleRateThrottle pays for its largest payload.
+GCRAThrottle is measured on both throttle stores; the cache store runs on
+the test settings' LocMemCache. Run with:
+
+    uv run pytest benchmarks/bench_throttling.py -s
+"""
+
+import time
+
+from django.core.cache import cache
+from ninja.throttling import AnonRateThrottle
+
+from core.throttling import AnonGCRAThrottle
+
+RATES = ("5/min", "60/min", "1000/min")
+CHECKS = 5000
+
+
+class _Request:
+    auth = None
+    META = {"REMOTE_ADDR": "10.0.0.1"}
+
+
+def _checks_per_second(throttle) -> float:
+    cache.clear()
+    request = _Request()
+    started = time.perf_counter()
+    for _ in range(CHECKS):
+        throttle.allow_request(request)
+    return CHECKS / (time.perf_counter() - started)
+
+
+def test_throttle_checks_per_second(settings, tmp_path):
+    settings.THROTTLE_SQLITE_PATH = str(tmp_path / "throttle.sqlite3")
+    print()
+    print(f"{'rate':>9} {'simple/s':>10} {'cache/s':>10} {'sqlite/s':>10}")
+    for rate in RATES:
+        simple = AnonRateThrottle(rate=rate)
+        simple.scope = "bench_simple"
+        gcra = AnonGCRAThrottle(rate=rate)
+        gcra.scope = "bench_gcra"
+        row = [_checks_per_second(simple)]
+        for store in ("cache", "sqlite"):
+            settings.THROTTLE_STORE = store
+            row.append(_checks_per_second(gcra))
+        print(f"{rate:>9} " + " ".join(f"{value:>10.0f}" for value in row))
@@ -0,0 +1,49 @@
+"""Latency of /token/refresh/roles vs a full /token/pair login.
+
+Not part of the test suite. Uses Django's default PBKDF2 hasher (the test
+settings use MD5) and disables throttling. Run with:
+
+    uv run pytest benchmarks/bench_token_refresh.py -s
+"""
+
+import time
+
+import pytest
+from django.test import Client
+
+from apps.organizations.models import Membership, Organization, OrgRole
+from apps.users.tests.factories import UserFactory
+from core.throttling import GCRAThrottle
+
+ROUNDS = 20
+MEMBERSHIPS = 10
+
+
+def _mean_ms(client, path, data):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        resp = client.post(path, data=data, content_type="application/json")
+        assert resp.status_code == 200, resp.content
+    return (time.perf_counter() - started) / ROUNDS * 1000
+
+
+@pytest.mark.django_db
+def test_refresh_roles_vs_pair(settings, monkeypatch):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+    monkeypatch.setattr(GCRAThrottle, "allow_request", lambda self, request: True)
+
+    user = UserFactory(username="bench", password="testpass123")
+    for n in range(MEMBERSHIPS):
+        org = Organization.objects.create(name=f"Org {n}")
+        Membership.objects.create(user=user, organization=org, role=OrgRole.MEMBER)
+
+    client = Client()
+    credentials = {"username": "bench", "password": "testpass123"}
+    refresh = client.post("/api/v1/token/pair", data=credentials, content_type="application/json").json()["refresh"]
+
+    pair_ms = _mean_ms(client, "/api/v1/token/pair", credentials)
+    roles_ms = _mean_ms(client, "/api/v1/token/refresh/roles", {"refresh": refresh})
+
+    print()
+    print(f"/token/pair           {pair_ms:8.2f} ms")
+    print(f"/token/refresh/roles  {roles_ms:8.2f} ms  ({pair_ms / roles_ms:.0f}x faster)")
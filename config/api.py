@@ -1,16 +1,17 @@
 """GIRAF Core — Ninja API root configuration."""
 
 from django.db import connection
+from django.http import HttpResponseNotModified
 from ninja import Schema
-from ninja_extra import NinjaExtraAPI, api_controller
+from ninja_extra import NinjaExtraAPI, api_controller, http_post
 from ninja_extra.permissions import AllowAny
-from ninja_jwt.authentication import JWTAuth
 from ninja_jwt.controller import (
     ControllerBase,
     TokenBlackListController,
     TokenObtainPairController,
     TokenVerificationController,
 )
+from ninja_jwt.exceptions import InvalidToken, TokenError
 
 from apps.citizens.api import router as citizens_router
 from apps.grades.api import router as grades_router
@@ -19,20 +20,32 @@ from apps.invitations.api import receiver_router as invitations_receiver_router
 from apps.organizations.api import router as organizations_router
 from apps.pictograms.api import router as pictograms_router
 from apps.users.api import router as users_router
+from core.authentication import GirafJWTAuth
 from core.exceptions import (
     BadRequestError,
     BusinessValidationError,
     ConflictError,
+    NotModifiedError,
     ResourceNotFoundError,
+    RowValidationError,
     ServiceError,
+    ServiceUnavailableError,
 )
-from core.throttling import LoginRateThrottle
+from core.jwt import (
+    TokenRefreshRolesInputSchema,
+    TokenRefreshRolesOutputSchema,
+    TokenVerifyBatchInputSchema,
+    TokenVerifyBatchOutputSchema,
+    refresh_with_roles,
+    verify_tokens,
+)
+from core.throttling import LoginRateThrottle, TokenRefreshRolesRateThrottle, TokenVerifyBatchRateThrottle
 
 api = NinjaExtraAPI(
     title="GIRAF Core API",
     version="1.0.0",
     description="Shared domain service for the GIRAF platform.",
-    auth=JWTAuth(),
+    auth=GirafJWTAuth(),
 )
 
 
@@ -56,6 +69,25 @@ def validation_error(request, exc):
     return api.create_response(request, {"detail": str(exc)}, status=422)
 
 
+@api.exception_handler(RowValidationError)
+def row_validation_error(request, exc):
+    return api.create_response(request, {"detail": str(exc), "errors": exc.errors}, status=422)
+
+
+@api.exception_handler(NotModifiedError)
+def not_modified(request, exc):
+    response = HttpResponseNotModified()
+    response["ETag"] = exc.etag
+    return response
+
+
+@api.exception_handler(ServiceUnavailableError)
+def service_unavailable(request, exc):
+    response = api.create_response(request, {"detail": str(exc)}, status=503)
+    response["Retry-After"] = "5"
+    return response
+
+
 @api.exception_handler(ServiceError)
 def service_error(request, exc):
     return api.create_response(request, {"detail": "An unexpected service error occurred."}, status=500)
@@ -78,6 +110,31 @@ class GirafJWTController(
 
     auto_import = False
 
+    @http_post(
+        "/verify/batch",
+        response=TokenVerifyBatchOutputSchema,
+        url_name="token_verify_batch",
+        operation_id="token_verify_batch",
+        throttle=[TokenVerifyBatchRateThrottle()],
+    )
+    def verify_token_batch(self, payload: TokenVerifyBatchInputSchema):
+        """Verify up to 100 tokens in one call; results are in input order."""
+        return {"results": verify_tokens(payload.tokens)}
+
+    @http_post(
+        "/refresh/roles",
+        response=TokenRefreshRolesOutputSchema,
+        url_name="token_refresh_roles",
+        operation_id="token_refresh_roles",
+        throttle=[TokenRefreshRolesRateThrottle()],
+    )
+    def refresh_token_roles(self, payload: TokenRefreshRolesInputSchema):
+        """Issue an access token with org_roles re-read from the database."""
+        try:
+            return refresh_with_roles(payload.refresh)
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0]) from exc
+
 
 # ---------------------------------------------------------------------------
 # Health check (unauthenticated)
@@ -3,6 +3,7 @@ GIRAF Core — Base settings shared across all environments.
 """
 
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     "apps.grades",
     "apps.pictograms",
     "apps.invitations",
+    "apps.blobs",
 ]
 
 MIDDLEWARE = [
@@ -48,6 +50,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.MembershipContextMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -109,8 +112,33 @@ NINJA_JWT = {
     "SIGNING_KEY": os.environ.get("JWT_SECRET", SECRET_KEY),
     "AUTH_HEADER_TYPES": ("Bearer",),
     "TOKEN_OBTAIN_PAIR_INPUT_SCHEMA": "core.jwt.TokenObtainPairInputSchema",
+    "TOKEN_OBTAIN_PAIR_REFRESH_INPUT_SCHEMA": "core.jwt.TokenRefreshInputSchema",
+    "TOKEN_VERIFY_INPUT_SCHEMA": "core.jwt.TokenVerifyInputSchema",
+    "TOKEN_BLACKLIST_INPUT_SCHEMA": "core.jwt.TokenBlacklistInputSchema",
 }
 
+# Max seconds before a token blacklisted by another worker is seen by this one
+# (see core/token_blacklist.py). Tokens blacklisted locally are seen immediately.
+JWT_BLACKLIST_SYNC_INTERVAL = float(os.environ.get("JWT_BLACKLIST_SYNC_INTERVAL", "5"))
+# Seconds of blacklist rows each sync re-reads, for rows whose transaction commits after a higher id.
+JWT_BLACKLIST_SYNC_MARGIN = float(os.environ.get("JWT_BLACKLIST_SYNC_MARGIN", "60"))
+
+# Seconds a user's token generation is cached (core/token_generation.py); 0 reads the row every time.
+# With a per-process cache this is how long other workers may accept tokens after "log out everywhere".
+TOKEN_GENERATION_CACHE_TIMEOUT = int(os.environ.get("TOKEN_GENERATION_CACHE_TIMEOUT", "5"))
+
+# Token encoding of the org_roles claim: "dict" ({"<org_id>": "<role>"}) or
+# "compact" (packed string in org_roles_packed, see core/org_roles.py).
+JWT_ORG_ROLES_FORMAT = os.environ.get("JWT_ORG_ROLES_FORMAT", "dict")
+
+# Claims-only authentication: build request.auth from verified token claims
+# instead of loading the User row on every request (see core/authentication.py).
+JWT_CLAIMS_AUTH = os.environ.get("JWT_CLAIMS_AUTH", "false").lower() == "true"
+
+# Claim-based authorization: decide org role checks from the token's org_roles
+# claim while it is newer than the cached membership version (see core/permissions.py).
+JWT_CLAIMS_PERMISSIONS = os.environ.get("JWT_CLAIMS_PERMISSIONS", "false").lower() == "true"
+
 # ---------------------------------------------------------------------------
 # Internationalization
 # ---------------------------------------------------------------------------
@@ -135,6 +163,15 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploaded images are verified and resized in a process pool of this many processes per
+# gunicorn worker (core/images.py); 0 processes them inline on the request thread.
+# Every worker starts its own pool, so a host runs gunicorn workers x IMAGE_WORKERS
+# processes: with gunicorn.conf.py's 2 * cpu + 1 workers, 1 already gives a host about
+# two image processes per core.
+IMAGE_WORKERS = int(os.environ.get("IMAGE_WORKERS", "1"))
+# Image jobs each worker may have queued or running before uploads are answered with 503.
+IMAGE_QUEUE_LIMIT = int(os.environ.get("IMAGE_QUEUE_LIMIT", "32"))
+
 # ---------------------------------------------------------------------------
 # CORS
 # ---------------------------------------------------------------------------
@@ -175,8 +212,9 @@ LOGGING = {
 }
 
 # ---------------------------------------------------------------------------
-# Cache (used by rate limiting)
+# Cache (used by rate limiting, the role cache and membership version stamps)
 # NOTE: Replace LocMemCache with Redis in production for multi-process support.
+# LocMemCache is per worker, so throttling falls back to THROTTLE_STORE=sqlite unless set explicitly.
 # ---------------------------------------------------------------------------
 
 CACHES = {
@@ -185,6 +223,19 @@ CACHES = {
     }
 }
 
+# Seconds a (user, org) -> role entry lives in the shared role cache (core/permissions.py).
+# Entries are invalidated early by membership version bumps; 0 disables the cache.
+# The role cache is skipped while CACHES["default"] is per process (LocMemCache).
+ROLE_CACHE_TIMEOUT = int(os.environ.get("ROLE_CACHE_TIMEOUT", "300"))
+
+# Where throttle state lives (core/throttling.py): "cache" uses CACHES["default"] and is shared
+# across hosts when that is Redis or Memcached; "sqlite" uses a file shared by the workers of one host.
+# Unset, it is "cache" when CACHES["default"] is shared by the workers and "sqlite" otherwise.
+THROTTLE_STORE = os.environ.get("THROTTLE_STORE", "")
+THROTTLE_SQLITE_PATH = os.environ.get(
+    "THROTTLE_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "giraf-throttle.sqlite3")
+)
+
 # ---------------------------------------------------------------------------
 # Default primary key field type
 # ---------------------------------------------------------------------------
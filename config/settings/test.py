@@ -24,3 +24,9 @@ NINJA_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(minutes=30),
 }
+
+# Process uploaded images inline, so tests see the finished result
+IMAGE_WORKERS = 0
+
+# One process, so the per-process cache is shared; conftest clears it between tests
+THROTTLE_STORE = "cache"
@@ -8,7 +8,9 @@ from django.core.cache import cache
 from django.test import Client
 
 from apps.organizations.models import Membership, Organization, OrgRole
+from apps.pictograms.catalog import pictogram_catalog
 from apps.users.tests.factories import UserFactory
+from core.token_blacklist import blacklist_index
 
 
 @pytest.fixture(autouse=True)
@@ -19,6 +21,25 @@ def _clear_throttle_cache():
     cache.clear()
 
 
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Store uploads under a per-test directory instead of the project's MEDIA_ROOT."""
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def _reset_blacklist_index():
+    """Row ids restart after each test's rollback, so the blacklist index must start over too."""
+    blacklist_index.reset()
+
+
+@pytest.fixture(autouse=True)
+def _clear_pictogram_catalog():
+    """Data versions restart at 0 after each test's rollback, so cached catalog sets must go too."""
+    pictogram_catalog.clear()
+
+
 @pytest.fixture
 def client():
     return Client()
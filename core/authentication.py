@@ -0,0 +1,104 @@
+"""JWT authentication for GIRAF Core API.
+
+`GirafJWTAuth` is the authenticator used by every endpoint. By default it
+behaves exactly like ninja_jwt's `JWTAuth` and loads the full `User` row on
+each request. With `JWT_CLAIMS_AUTH = True` it instead returns a
+`TokenPrincipal` built from the verified token claims, and only touches the
+database when a handler reads a field the token does not carry.
+
+In both modes the verified token is available as `request.auth.token`, and
+tokens from an older token generation (see `core.token_generation`) are
+rejected.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from ninja_jwt.authentication import JWTAuth
+from ninja_jwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from ninja_jwt.settings import api_settings
+
+from apps.users.models import User
+from core.org_roles import org_roles_from_token
+from core.token_generation import check_token_generation, token_generation
+
+# Claims copied from the token onto the principal (see core.jwt.TokenObtainPairInputSchema).
+PRINCIPAL_CLAIMS = ("username", "is_superuser", "is_active")
+
+
+class TokenPrincipal:
+    """Read-only user backed by verified access-token claims.
+
+    Exposes `id`, `pk`, `org_roles` (as a dict, whichever way the token
+    encodes it) and the claims in PRINCIPAL_CLAIMS directly. Any other
+    attribute (email, first_name, ...) lazily loads the `User` row once and
+    is served from it for the rest of the request.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token: Any) -> None:
+        values = {"token": token, "id": token[api_settings.USER_ID_CLAIM], "_user": None}
+        values["pk"] = values["id"]
+        for claim in PRINCIPAL_CLAIMS:
+            if claim in token:
+                values[claim] = token[claim]
+        org_roles = org_roles_from_token(token)
+        if org_roles is not None:
+            values["org_roles"] = org_roles
+        self.__dict__.update(values)
+
+    @property
+    def user(self) -> User:
+        """The backing `User` row, loaded on first access."""
+        user: User | None = self.__dict__["_user"]
+        if user is None:
+            try:
+                user = User.objects.get(id=self.id)
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User not found")
+            self.__dict__["_user"] = user
+        return user
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the token does not carry.
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("TokenPrincipal is read-only.")
+
+    def __eq__(self, other: object) -> bool:
+        return bool(getattr(other, "pk", None) == self.pk)
+
+    def __hash__(self) -> int:
+        return hash(self.pk)
+
+    def __str__(self) -> str:
+        return str(self.__dict__.get("username", self.id))
+
+
+class GirafJWTAuth(JWTAuth):
+    """JWTAuth with an opt-in claims-only mode (`settings.JWT_CLAIMS_AUTH`)."""
+
+    def get_user(self, validated_token) -> Any:
+        if not settings.JWT_CLAIMS_AUTH:
+            user = super().get_user(validated_token)
+            if token_generation(validated_token) != getattr(user, "token_generation", 0):
+                raise AuthenticationFailed("Token has been revoked")
+            # Keep the verified claims reachable for claim-based role checks (core.permissions).
+            user.token = validated_token  # type: ignore[attr-defined]
+            return user
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        try:
+            check_token_generation(validated_token)
+        except TokenError as exc:
+            raise AuthenticationFailed(str(exc)) from exc
+        principal = TokenPrincipal(validated_token)
+        if not principal.is_active:
+            raise AuthenticationFailed("User is inactive")
+        return principal
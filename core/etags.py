@@ -0,0 +1,95 @@
+"""Strong ETags for org-scoped reads, derived from per-organization data versions.
+
+Every service write to an organization's citizens, grades, members,
+invitations, pictograms or the organization itself calls `bump_org_data()`,
+which increments that organization's `OrganizationDataVersion` row in the
+same transaction. Versions live in the database rather than in Django's
+cache, so every worker sees a write exactly when it commits. Pictograms
+without an organization share the `GLOBAL_DATA` row.
+
+A read endpoint calls `check_etag()` after its permission check. The ETag
+hashes the request path and query string with the current versions, so it
+costs one primary-key query. When it matches `If-None-Match`,
+`NotModifiedError` is raised and answered with 304 before the endpoint
+queries or serializes anything; otherwise the ETag is set on the 200 response.
+"""
+
+import hashlib
+
+from django.db.models import F
+from django.http import HttpRequest, HttpResponse
+from django.utils.http import parse_etags, quote_etag
+
+from apps.organizations.models import OrganizationDataVersion
+from core.exceptions import NotModifiedError
+
+# Version row for data that belongs to no organization (global pictograms).
+GLOBAL_DATA = 0
+
+
+def _key(org_id: int | None) -> int:
+    return GLOBAL_DATA if org_id is None else org_id
+
+
+def bump_org_data(*org_ids: int | None) -> None:
+    """Record that data of these organizations changed (None: global data).
+
+    Call it inside the transaction that makes the change; the row lock it
+    takes is held until that transaction ends.
+    """
+    keys = sorted({_key(org_id) for org_id in org_ids})
+    if not keys:
+        return
+    rows = OrganizationDataVersion.objects.filter(organization_id__in=keys)
+    if rows.update(version=F("version") + 1) < len(keys):
+        # First write to some of them: create the missing rows, then bump those.
+        missing = set(keys) - set(rows.values_list("organization_id", flat=True))
+        OrganizationDataVersion.objects.bulk_create(
+            [OrganizationDataVersion(organization_id=key) for key in sorted(missing)], ignore_conflicts=True
+        )
+        rows.filter(organization_id__in=missing).update(version=F("version") + 1)
+
+
+def get_org_data_versions(*org_ids: int | None) -> list[int]:
+    """Return the current data version of each organization (None: global data), in one query."""
+    keys = [_key(org_id) for org_id in org_ids]
+    found = dict(
+        OrganizationDataVersion.objects.filter(organization_id__in=keys).values_list("organization_id", "version")
+    )
+    return [found.get(key, 0) for key in keys]
+
+
+def check_etag(request: HttpRequest, response: HttpResponse, *org_ids: int | None) -> None:
+    """Set the ETag for a read of these organizations' data on `response`.
+
+    Raises:
+        NotModifiedError: The request's If-None-Match already names the current ETag.
+    """
+    versions = get_org_data_versions(*org_ids)
+    digest = hashlib.sha256(repr((request.get_full_path(), versions)).encode()).hexdigest()[:32]
+    etag = quote_etag(digest)
+    if_none_match = parse_etags(request.headers.get("If-None-Match", ""))
+    if etag in if_none_match or "*" in if_none_match:
+        raise NotModifiedError(etag)
+    response["ETag"] = etag
+
+
+class OrgDataAdminMixin:
+    """ModelAdmin mixin for models with an `organization_id`.
+
+    Admin edits bypass the services, so bump the data version here too.
+    """
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)  # type: ignore[misc]
+        bump_org_data(obj.organization_id)
+
+    def delete_model(self, request, obj):
+        org_id = obj.organization_id
+        super().delete_model(request, obj)  # type: ignore[misc]
+        bump_org_data(org_id)
+
+    def delete_queryset(self, request, queryset):
+        org_ids = set(queryset.values_list("organization_id", flat=True))
+        super().delete_queryset(request, queryset)  # type: ignore[misc]
+        bump_org_data(*org_ids)
@@ -21,6 +21,18 @@ class BusinessValidationError(ServiceError):
     """The operation violates a business rule."""
 
 
+class RowValidationError(BusinessValidationError):
+    """Rows of a bulk request failed validation; `errors` holds {"index", "detail"} per row."""
+
+    def __init__(self, message: str, errors: list[dict]) -> None:
+        super().__init__(message)
+        self.errors = errors
+
+
+class ServiceUnavailableError(ServiceError):
+    """The service is temporarily overloaded; the client should retry later."""
+
+
 class InvitationError(ServiceError):
     """Base exception for invitation operations."""
 
@@ -39,3 +51,11 @@ class DuplicateInvitationError(InvitationError, ConflictError):
 
 class InvitationSendError(InvitationError, BadRequestError):
     """Generic send failure — hides specific cause to prevent enumeration."""
+
+
+class NotModifiedError(Exception):
+    """The client's cached copy is current; answered with 304 (see core.etags)."""
+
+    def __init__(self, etag: str) -> None:
+        super().__init__(etag)
+        self.etag = etag
@@ -0,0 +1,229 @@
+"""Validation of uploaded images and the pool that processes them.
+
+Decoding, verifying and resizing an upload is CPU work that would otherwise
+hold one of the two threads of a gunicorn worker (see gunicorn.conf.py) for
+the whole request. Upload endpoints instead run only the cheap checks of
+`validate_upload()` (type, size, image header), store the file and write its
+metadata row, then hand the bytes to a process pool and answer with a
+"processing" status:
+
+    with reserve() as job:
+        ...store the file, save the row with ImageStatus.PROCESSING...
+        job.submit(render, data, on_done=partial(finish, row_id))
+
+The job function runs in a pool process. `on_done(result, error)` runs back
+in the submitting process and records the outcome (status "ready" or
+"failed") in storage and the database. It runs on a small thread pool of its
+own, not on the process pool's single result thread, so one completion
+copying a blob into storage does not hold up the results of the others.
+
+IMAGE_WORKERS sets the pool size of each gunicorn worker, so a host runs
+gunicorn workers x IMAGE_WORKERS image processes; 0 runs jobs inline on the
+calling thread (tests, management commands). At most IMAGE_QUEUE_LIMIT jobs
+may be queued, running or being recorded per process: `reserve()` raises
+ServiceUnavailableError beyond that, so a burst of uploads is turned away
+rather than queued without bound.
+"""
+
+import hashlib
+import io
+import logging
+import mimetypes
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from django.conf import settings
+from django.db import connections, models
+from PIL import Image, UnidentifiedImageError
+
+from core.exceptions import BusinessValidationError, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_IMAGE_TYPES = ("image/jpeg", "image/png", "image/webp")
+MAX_IMAGE_SIZE = 5 * 1024 * 1024
+
+# Guards against decompression bombs; a 5MB upload can declare a huge canvas.
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+class ImageStatus(models.TextChoices):
+    READY = "ready", "Ready"
+    PROCESSING = "processing", "Processing"
+    FAILED = "failed", "Failed"
+
+
+def validate_upload(file) -> None:
+    """Check an upload's type, size and image header without decoding it.
+
+    Raises:
+        BusinessValidationError: If file type or size is invalid, or the file is not an image.
+    """
+    mime_type, _ = mimetypes.guess_type(file.name)
+    if mime_type not in ALLOWED_IMAGE_TYPES:
+        raise BusinessValidationError("Only JPEG, PNG, and WebP images are allowed.")
+
+    if file.size > MAX_IMAGE_SIZE:
+        raise BusinessValidationError("File size must not exceed 5MB.")
+
+    try:
+        with Image.open(file) as image:  # Reads the header only.
+            width, height = image.size
+    except (UnidentifiedImageError, OSError, ValueError):
+        raise BusinessValidationError("File is not a valid image.")
+    finally:
+        file.seek(0)
+    if width * height > MAX_IMAGE_PIXELS:
+        raise BusinessValidationError("Image dimensions are too large.")
+
+
+def verify_image(data: bytes) -> str:
+    """Fully decode `data` and return the SHA-256 of its pixels; runs in the image pool.
+
+    Files holding the same picture (say, one PNG saved with two compression
+    levels) get the same digest, which names their blob in apps.blobs.
+
+    Raises:
+        ValueError: The image is truncated or corrupt.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+        with Image.open(io.BytesIO(data)) as image:  # verify() leaves the image unusable.
+            image.load()
+            if image.mode == "P":  # Palette indices mean nothing without the palette.
+                image = image.convert("RGBA")
+            digest = hashlib.sha256(f"{image.mode} {image.width}x{image.height}\n".encode())
+            digest.update(image.tobytes())
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ValueError(f"File is not a valid image: {exc}") from exc
+    return digest.hexdigest()
+
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_recorder: ThreadPoolExecutor | None = None
+_pending = 0
+
+
+def _init_worker() -> None:
+    # Pool processes are spawned, not forked, so job functions can import Django code.
+    import django
+
+    django.setup()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def _get_recorder() -> ThreadPoolExecutor:
+    global _recorder
+    with _lock:
+        if _recorder is None:
+            _recorder = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="image-results")
+        return _recorder
+
+
+def _discard_executor(broken: ProcessPoolExecutor) -> None:
+    global _executor
+    with _lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _release() -> None:
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _report(on_done: Callable[[Any, BaseException | None], None], result: Any, error: BaseException | None) -> None:
+    if error is not None:
+        logger.warning("Image job failed: %s", error)
+    try:
+        on_done(result, error)
+    except Exception:
+        logger.exception("Recording the result of an image job failed")
+
+
+def _record(on_done: Callable[[Any, BaseException | None], None], result: Any, error: BaseException | None) -> None:
+    # Runs on a recorder thread; the job keeps its place in the queue until recorded.
+    try:
+        _report(on_done, result, error)
+    finally:
+        _release()
+        connections.close_all()  # This thread's own connections.
+
+
+class ImageJob:
+    """A place in the image pool's queue, held from `reserve()` until its job completes."""
+
+    def __init__(self) -> None:
+        self._submitted = False
+
+    def __enter__(self) -> "ImageJob":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self._submitted:
+            _release()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, on_done: Callable[[Any, BaseException | None], None]) -> None:
+        """Run `fn(*args)` in the pool, then `on_done(result, error)` in this process.
+
+        `fn` and its arguments must be picklable. Inline (IMAGE_WORKERS=0), both run before this returns.
+        """
+        if settings.IMAGE_WORKERS <= 0:
+            self._submitted = True
+            try:
+                result, error = fn(*args), None
+            except Exception as exc:
+                result, error = None, exc
+            _release()
+            _report(on_done, result, error)
+            return
+
+        executor = _get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:  # A worker died; start a fresh pool.
+            _discard_executor(executor)
+            executor = _get_executor()
+            future = executor.submit(fn, *args)
+        self._submitted = True
+
+        def done(future: Future) -> None:
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                _discard_executor(executor)
+            _get_recorder().submit(_record, on_done, None if error else future.result(), error)
+
+        future.add_done_callback(done)
+
+
+def reserve() -> ImageJob:
+    """Reserve a place for one image job; use the result as a context manager.
+
+    Raises:
+        ServiceUnavailableError: IMAGE_QUEUE_LIMIT jobs are already queued or running.
+    """
+    global _pending
+    with _lock:
+        if settings.IMAGE_WORKERS > 0 and _pending >= settings.IMAGE_QUEUE_LIMIT:
+            raise ServiceUnavailableError("Too many images are being processed. Try again shortly.")
+        _pending += 1
+    return ImageJob()
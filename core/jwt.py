@@ -1,12 +1,79 @@
 """Custom JWT token schema that embeds org_roles into the access token.
 
 When a user logs in via /token/pair, their membership roles are embedded
-as a claim in both the JWT payload and the JSON response body.
+as a claim in both the JWT payload and the JSON response body. The claim is
+a dict by default, or packed (see `core.org_roles`) with
+`JWT_ORG_ROLES_FORMAT = "compact"`; the response body is always a dict. The token
+also carries the identity fields that `core.authentication.TokenPrincipal`
+serves without a database lookup.
+
+The refresh, verify and blacklist schemas answer blacklist checks from the
+in-process `core.token_blacklist.blacklist_index` instead of querying
+`BlacklistedToken` on every call. `verify_tokens()` checks a whole batch of
+tokens the same way for `/token/verify/batch`.
+
+`refresh_with_roles()` backs `/token/refresh/roles`: it reissues an access
+token with org_roles recomputed from the memberships table, so apps can pick
+up a new membership without a password login.
 """
 
+from typing import Any
+
+from django.conf import settings
 from ninja import Schema
-from ninja_jwt.schema import TokenObtainInputSchemaBase
-from ninja_jwt.tokens import RefreshToken
+from ninja_jwt import exceptions
+from ninja_jwt.schema import (
+    SchemaInputService,
+    TokenObtainInputSchemaBase,
+)
+from ninja_jwt.schema import (
+    TokenBlacklistInputSchema as BaseTokenBlacklistInputSchema,
+)
+from ninja_jwt.schema import (
+    TokenRefreshInputSchema as BaseTokenRefreshInputSchema,
+)
+from ninja_jwt.schema import (
+    TokenVerifyInputSchema as BaseTokenVerifyInputSchema,
+)
+from ninja_jwt.settings import api_settings
+from ninja_jwt.tokens import RefreshToken, Token, UntypedToken
+from ninja_jwt.utils import token_error
+from pydantic import Field, model_validator
+
+from apps.organizations.models import Membership
+from core.org_roles import ORG_ROLES_CLAIM, ORG_ROLES_PACKED_CLAIM, encode_org_roles, org_roles_from_token
+from core.token_blacklist import blacklist_index
+from core.token_generation import GENERATION_CLAIM, check_token_generation
+
+
+class GirafRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist lookups go through the in-process index."""
+
+    def check_blacklist(self) -> None:
+        if self.payload[api_settings.JTI_CLAIM] in blacklist_index:
+            raise exceptions.TokenError("Token is blacklisted")
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_index.add(self.payload[api_settings.JTI_CLAIM], self.payload["exp"])
+        return result
+
+
+def org_roles_for_user(user_id: int) -> dict[str, str]:
+    """Build the {org_id: role} mapping for a user with one indexed query."""
+    memberships = Membership.objects.filter(user_id=user_id).values_list("organization_id", "role")
+    return {str(org_id): role for org_id, role in memberships}
+
+
+def set_org_roles_claim(token: Token, org_roles: dict[str, str]) -> None:
+    """Store org_roles on the token in the configured `JWT_ORG_ROLES_FORMAT`."""
+    for claim in (ORG_ROLES_CLAIM, ORG_ROLES_PACKED_CLAIM):
+        if claim in token:
+            del token[claim]
+    if settings.JWT_ORG_ROLES_FORMAT == "compact":
+        token[ORG_ROLES_PACKED_CLAIM] = encode_org_roles(org_roles)
+    else:
+        token[ORG_ROLES_CLAIM] = org_roles
 
 
 class TokenObtainPairOutputSchema(Schema):
@@ -23,17 +90,167 @@ class TokenObtainPairInputSchema(TokenObtainInputSchemaBase):
     @classmethod
     def get_token(cls, user) -> dict:
         values: dict[str, object] = {}
-        refresh = RefreshToken.for_user(user)
-
-        # Build org_roles: {org_id: role} from memberships
-        org_roles = {}
-        for membership in user.memberships.select_related("organization").all():
-            org_roles[str(membership.organization_id)] = membership.role
+        refresh = GirafRefreshToken.for_user(user)
 
-        # Embed in JWT payload (before generating access token)
-        refresh["org_roles"] = org_roles
+        # Embed org_roles in JWT payload (before generating access token)
+        org_roles = org_roles_for_user(user.id)
+        set_org_roles_claim(refresh, org_roles)
+        refresh["username"] = user.username
+        refresh["is_superuser"] = user.is_superuser
+        refresh["is_active"] = user.is_active
+        refresh[GENERATION_CLAIM] = user.token_generation
 
         values["refresh"] = str(refresh)
         values["access"] = str(refresh.access_token)  # type: ignore[attr-defined]
         values["org_roles"] = org_roles
         return values  # type: ignore[return-value]
+
+
+class TokenRefreshOutputSchema(Schema):
+    refresh: str
+    access: str | None
+
+    @model_validator(mode="before")
+    @classmethod
+    @token_error
+    def validate_schema(cls, values: Any) -> Any:
+        values = SchemaInputService(values, cls.model_config).get_values()
+
+        if isinstance(values, dict):
+            if not values.get("refresh"):
+                raise exceptions.ValidationError({"refresh": "refresh token is required"})
+
+            refresh = GirafRefreshToken(values["refresh"])
+            check_token_generation(refresh.payload)
+            data = {"access": str(refresh.access_token)}
+
+            if api_settings.ROTATE_REFRESH_TOKENS:
+                if api_settings.BLACKLIST_AFTER_ROTATION:
+                    refresh.blacklist()
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                data["refresh"] = str(refresh)
+            values.update(data)
+        return values
+
+
+class TokenRefreshInputSchema(BaseTokenRefreshInputSchema):
+    @classmethod
+    def get_response_schema(cls) -> type[Schema]:
+        return TokenRefreshOutputSchema
+
+
+class TokenRefreshRolesInputSchema(Schema):
+    refresh: str
+
+
+class TokenRefreshRolesOutputSchema(Schema):
+    access: str
+    org_roles: dict[str, str]
+
+
+def refresh_with_roles(raw_refresh: str) -> dict[str, Any]:
+    """Issue a new access token whose org_roles are read from the database.
+
+    The refresh token is verified (signature, expiry, blacklist, generation)
+    and left unchanged. The new token's `iat` is now, so claim-based permission
+    checks trust it over membership changes made before this call.
+    """
+    refresh = GirafRefreshToken(raw_refresh)
+    check_token_generation(refresh.payload)
+    org_roles = org_roles_for_user(refresh[api_settings.USER_ID_CLAIM])
+
+    access = refresh.access_token  # type: ignore[attr-defined]
+    set_org_roles_claim(access, org_roles)
+    access.set_iat()
+    return {"access": str(access), "org_roles": org_roles}
+
+
+class TokenVerifyInputSchema(BaseTokenVerifyInputSchema):
+    @model_validator(mode="before")
+    @classmethod
+    @token_error
+    def validate_schema(cls, values: Any) -> Any:
+        values = SchemaInputService(values, cls.model_config).get_values()
+
+        if isinstance(values, dict):
+            if not values.get("token"):
+                raise exceptions.ValidationError({"token": "token is required"})
+            token = UntypedToken(values["token"])
+            if token.get(api_settings.JTI_CLAIM or "jti") in blacklist_index:
+                raise exceptions.ValidationError("Token is blacklisted")
+            if api_settings.USER_ID_CLAIM in token:
+                check_token_generation(token.payload)
+        return values
+
+
+class TokenBlacklistInputSchema(BaseTokenBlacklistInputSchema):
+    @model_validator(mode="before")
+    @classmethod
+    @token_error
+    def validate_schema(cls, values: Any) -> Any:
+        values = SchemaInputService(values, cls.model_config).get_values()
+
+        if isinstance(values, dict):
+            if not values.get("refresh"):
+                raise exceptions.ValidationError({"refresh": "refresh token is required"})
+            GirafRefreshToken(values["refresh"]).blacklist()
+        return values
+
+
+VERIFY_BATCH_MAX_TOKENS = 100
+
+
+class TokenVerifyBatchInputSchema(Schema):
+    tokens: list[str] = Field(..., min_length=1, max_length=VERIFY_BATCH_MAX_TOKENS)
+
+
+class TokenVerifyResultSchema(Schema):
+    valid: bool
+    detail: str | None = None
+    token_type: str | None = None
+    exp: int | None = None
+    user_id: int | None = None
+    org_roles: dict[str, str] | None = None
+
+
+class TokenVerifyBatchOutputSchema(Schema):
+    results: list[TokenVerifyResultSchema]
+
+
+def verify_tokens(raw_tokens: list[str]) -> list[dict[str, Any]]:
+    """Verify each token's signature, expiry, blacklist and generation, in input order.
+
+    The database is only touched when the blacklist index is due for a sync
+    or a user's token generation is not cached.
+    """
+    results: list[dict[str, Any]] = []
+    for raw in raw_tokens:
+        try:
+            token = UntypedToken(raw)
+        except exceptions.TokenError as exc:
+            results.append({"valid": False, "detail": str(exc)})
+            continue
+
+        payload = token.payload
+        if payload.get(api_settings.JTI_CLAIM) in blacklist_index:
+            results.append({"valid": False, "detail": "Token is blacklisted"})
+            continue
+        if api_settings.USER_ID_CLAIM in payload:
+            try:
+                check_token_generation(payload)
+            except exceptions.TokenError as exc:
+                results.append({"valid": False, "detail": str(exc)})
+                continue
+
+        results.append(
+            {
+                "valid": True,
+                "token_type": payload.get(api_settings.TOKEN_TYPE_CLAIM),
+                "exp": payload.get("exp"),
+                "user_id": payload.get(api_settings.USER_ID_CLAIM),
+                "org_roles": org_roles_from_token(payload),
+            }
+        )
+    return results
@@ -0,0 +1,14 @@
+"""Request-scoped middleware for GIRAF Core."""
+
+from core.permissions import membership_context
+
+
+class MembershipContextMiddleware:
+    """Memoize membership lookups for the duration of one request (see core.permissions)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with membership_context():
+            return self.get_response(request)
@@ -0,0 +1,77 @@
+"""Encoding of the `org_roles` token claim.
+
+By default tokens carry `org_roles` as a `{"<org_id>": "<role>"}` object. With
+`JWT_ORG_ROLES_FORMAT = "compact"` they carry `org_roles_packed` instead, a
+string with one bucket per role in ROLE_ORDER, separated by `|`. Each bucket
+lists the sorted org ids in base 36, the first absolute and the rest as the
+difference to the previous id, separated by `.`:
+
+    {"1": "owner", "5": "member", "7": "member", "40": "admin"}  ->  "1|14|5.2"
+
+Empty trailing buckets are dropped. Use `org_roles_from_token()` to read
+either form.
+"""
+
+from collections.abc import Mapping
+from typing import Any
+
+ORG_ROLES_CLAIM = "org_roles"
+ORG_ROLES_PACKED_CLAIM = "org_roles_packed"
+
+# Bucket order of the packed form. Append new roles; never reorder.
+ROLE_ORDER = ("owner", "admin", "member")
+
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _to_base36(number: int) -> str:
+    digits = ""
+    while True:
+        number, digit = divmod(number, 36)
+        digits = _BASE36[digit] + digits
+        if not number:
+            return digits
+
+
+def encode_org_roles(org_roles: Mapping[str, str]) -> str:
+    """Pack a `{org_id: role}` mapping into the compact claim string."""
+    buckets: dict[str, list[int]] = {role: [] for role in ROLE_ORDER}
+    for org_id, role in org_roles.items():
+        if role not in buckets:
+            raise ValueError(f"Unknown role: {role}")
+        buckets[role].append(int(org_id))
+
+    parts = []
+    for role in ROLE_ORDER:
+        previous = 0
+        deltas = []
+        for current in sorted(buckets[role]):
+            deltas.append(_to_base36(current - previous))
+            previous = current
+        parts.append(".".join(deltas))
+    return "|".join(parts).rstrip("|")
+
+
+def decode_org_roles(packed: str) -> dict[str, str]:
+    """Unpack a compact claim string into the `{org_id: role}` mapping."""
+    buckets = packed.split("|")
+    if len(buckets) > len(ROLE_ORDER):
+        raise ValueError("Too many role buckets in org_roles_packed.")
+
+    org_roles = {}
+    for role, bucket in zip(ROLE_ORDER, buckets, strict=False):
+        org_id = 0
+        for delta in bucket.split(".") if bucket else ():
+            org_id += int(delta, 36)
+            org_roles[str(org_id)] = role
+    return org_roles
+
+
+def org_roles_from_token(token: Any) -> dict[str, str] | None:
+    """Return the token's org roles in dict form, or None if it carries none."""
+    if ORG_ROLES_CLAIM in token:
+        org_roles: dict[str, str] = token[ORG_ROLES_CLAIM]
+        return org_roles
+    if ORG_ROLES_PACKED_CLAIM in token:
+        return decode_org_roles(token[ORG_ROLES_PACKED_CLAIM])
+    return None
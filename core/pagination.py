@@ -0,0 +1,197 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+`CursorPagination` is a drop-in replacement for ninja's
+`LimitOffsetPagination`: endpoints opt in by swapping the class passed to
+`@paginate`, and their service methods keep returning plain querysets.
+
+The queryset is ordered by its own `order_by()`, or else its model's
+`Meta.ordering`, with the primary key appended as a tie-breaker. Ordering
+by a relation expands to the related model's ordering, as Django does;
+ordering by an annotation (e.g. a search rank) is kept as is.
+Each page carries `next_cursor`, an opaque value signed with SECRET_KEY
+that holds only the primary keys of the page's last row and of the row
+after it, so no column values end up in URLs or access logs. Passing it
+back as `cursor` re-reads those rows' sort keys with one primary-key query
+and fetches the rows after the last one with a `WHERE (a, b, id) > (...)`
+style filter instead of `OFFSET`, and without a `COUNT(*)` (`count` is
+null). Rows inserted or deleted elsewhere in the list do not shift later
+pages; if the last row itself is gone, the page starts at the row that
+followed it.
+
+Without `cursor` the endpoint behaves as before (`limit`/`offset`, exact
+`count`), and also returns `next_cursor`, so clients can switch over after
+their first page. Sort keys must be non-null columns.
+
+`count=exact|estimated|none` chooses what the page reports as `count`
+(default: `exact` for offset pages, `none` for cursor pages). `estimated`
+reads the planner's row estimate on PostgreSQL and counts exactly below
+`EXACT_COUNT_BELOW` rows or on other backends; `none` skips the count
+query. Every page fetches `limit + 1` rows, so `has_more` is always exact.
+"""
+
+import json
+from collections.abc import Collection
+from typing import Any, Literal
+
+from django.core import signing
+from django.db import connections
+from django.db.models import Model, Q, QuerySet
+from django.http import HttpRequest
+from ninja import Field, Schema
+from ninja.conf import settings as ninja_settings
+from ninja.pagination import PaginationBase
+
+from core.exceptions import BadRequestError
+
+# Planner estimates are coarse for small tables, and counting them is cheap.
+EXACT_COUNT_BELOW = 1000
+
+
+def ordering_keys(queryset: QuerySet) -> list[str]:
+    """Return the queryset's ordering as concrete, unique sort keys (e.g. ["-created_at", "-id"])."""
+    model = queryset.model
+    ordering = list(queryset.query.order_by or model._meta.ordering)
+    keys = _expand(model, ordering, prefix="", descending=False, annotations=queryset.query.annotations.keys())
+    pk = model._meta.pk.name
+    if pk not in keys and f"-{pk}" not in keys:
+        keys.append(f"-{pk}" if keys and keys[-1].startswith("-") else pk)
+    return keys
+
+
+def _expand(
+    model: type[Model], ordering: list[str], *, prefix: str, descending: bool, annotations: Collection[str] = ()
+) -> list[str]:
+    keys: list[str] = []
+    for key in ordering:
+        desc = key.startswith("-") != descending
+        name = key.lstrip("-")
+        if name == "pk":
+            name = model._meta.pk.name
+        elif "__" not in name and name not in annotations:
+            field = model._meta.get_field(name)
+            if field.is_relation:
+                related_ordering = list(field.related_model._meta.ordering)
+                if related_ordering:
+                    keys += _expand(field.related_model, related_ordering, prefix=f"{prefix}{name}__", descending=desc)
+                    continue
+                name = field.attname
+        keys.append(f"{'-' if desc else ''}{prefix}{name}")
+    return keys
+
+
+def encode_cursor(keys: list[str], last_pk: Any, next_pk: Any) -> str:
+    """Sign the primary keys of a page's last row and the row after it into an opaque cursor for this ordering."""
+    return signing.dumps([last_pk, next_pk], salt=_salt(keys))
+
+
+def decode_cursor(keys: list[str], cursor: str) -> list[Any]:
+    """Return the [last_pk, next_pk] in `cursor`.
+
+    Raises:
+        BadRequestError: The cursor was tampered with or issued for another ordering.
+    """
+    try:
+        pks = signing.loads(cursor, salt=_salt(keys))
+    except signing.BadSignature:
+        raise BadRequestError("Invalid cursor.") from None
+    if not isinstance(pks, list) or len(pks) != 2:
+        raise BadRequestError("Invalid cursor.")
+    return pks
+
+
+def _salt(keys: list[str]) -> str:
+    return "core.pagination:" + ",".join(keys)
+
+
+def after(keys: list[str], values: list[Any]) -> Q:
+    """Filter for rows that sort strictly after `values` under `keys`."""
+    condition = Q()
+    for i, key in enumerate(keys):
+        name = key.lstrip("-")
+        step = Q(**{f"{name}__{'lt' if key.startswith('-') else 'gt'}": values[i]})
+        for previous, value in zip(keys[:i], values, strict=False):
+            step &= Q(**{previous.lstrip("-"): value})
+        condition |= step
+    return condition
+
+
+def resume(queryset: QuerySet, keys: list[str], cursor: str) -> Q:
+    """Filter for the rows of `queryset` that follow `cursor`, reading the sort keys with one query.
+
+    Raises:
+        BadRequestError: The cursor is invalid, or both of its rows have left the queryset.
+    """
+    last_pk, next_pk = decode_cursor(keys, cursor)
+    pk = queryset.model._meta.pk.name
+    names = [key.lstrip("-") for key in keys]
+    found = {
+        row[names.index(pk)]: list(row)
+        for row in queryset.order_by().filter(pk__in=[last_pk, next_pk]).values_list(*names)
+    }
+    if last_pk in found:
+        return after(keys, found[last_pk])
+    if next_pk in found:
+        return Q(pk=next_pk) | after(keys, found[next_pk])
+    raise BadRequestError("Cursor has expired; request the first page again.")
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """Return the planner's row estimate for `queryset`, or its exact count off PostgreSQL.
+
+    Estimates below EXACT_COUNT_BELOW are replaced by an exact count.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        plan = json.loads(queryset.order_by().explain(format="json"))
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= EXACT_COUNT_BELOW:
+            return estimate
+    return queryset.count()
+
+
+class CursorPagination(PaginationBase):
+    class Input(Schema):
+        limit: int = Field(ninja_settings.PAGINATION_PER_PAGE, ge=1)
+        offset: int = Field(0, ge=0)
+        cursor: str | None = None
+        count: Literal["exact", "estimated", "none"] | None = None
+
+    class Output(Schema):
+        items: list[Any]
+        count: int | None = None
+        has_more: bool = False
+        next_cursor: str | None = None
+
+    def paginate_queryset(self, queryset: QuerySet, pagination: Input, request: HttpRequest, **params: Any) -> Any:
+        keys = ordering_keys(queryset)
+        queryset = queryset.order_by(*keys)
+        limit = pagination.limit
+
+        if pagination.cursor is not None:
+            mode = pagination.count or "none"
+            offset = None
+            rows = list(queryset.filter(resume(queryset, keys, pagination.cursor))[: limit + 1])
+        else:
+            mode = pagination.count or "exact"
+            offset = pagination.offset
+            rows = list(queryset[offset : offset + limit + 1])
+
+        has_more = len(rows) > limit
+        next_cursor = encode_cursor(keys, rows[limit - 1].pk, rows[limit].pk) if has_more else None
+        rows = rows[:limit]
+        return {
+            "items": rows,
+            "count": self._count(queryset, mode, offset, len(rows), has_more),
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
+
+    def _count(self, queryset: QuerySet, mode: str, offset: int | None, seen: int, has_more: bool) -> int | None:
+        if mode == "none":
+            return None
+        if offset is not None and not has_more and (seen or not offset):
+            return offset + seen  # The page reached the end; no query needed.
+        if mode == "estimated":
+            # Never report fewer rows than the page has already shown to exist.
+            minimum = offset + seen + 1 if offset is not None and has_more else 0
+            return max(estimate_count(queryset), minimum)
+        return self._items_count(queryset)
@@ -2,11 +2,37 @@
 
 Reusable helpers for checking organization membership and role-based access.
 All role checks use the hierarchy: OWNER > ADMIN > MEMBER.
+
+With `JWT_CLAIMS_PERMISSIONS` enabled, roles are read from the `org_roles`
+claim of the caller's access token instead of the `memberships` table. The
+claim is only trusted while it is newer than the membership version of both
+the user and the organization; services call `invalidate_memberships()`
+whenever memberships change, which sends older tokens back to the database.
+Those versions live in Django's cache, so claims are only trusted when that
+cache is shared by the workers; otherwise a bump would reach one worker only.
+
+Inside a `membership_context()` (opened per request by
+`core.middleware.MembershipContextMiddleware`) the first lookup for a user
+loads all of that user's memberships in one query; later role checks and
+service lookups in the same request are served from memory.
+
+Across requests and workers, `role_cache` keeps (user, org) -> role in
+Django's cache, stamped with the same membership versions, so a bump from
+`invalidate_memberships()` makes every worker's entry stale at once. The
+role cache is only used when that cache is shared by the workers.
 """
 
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
 from ninja.errors import HttpError
 
 from apps.organizations.models import Membership, OrgRole
+from core.org_roles import org_roles_from_token
+from core.versioning import MISSING, bump_versions, cache_is_shared, get_versioned, get_versions, set_versioned
 
 ROLE_HIERARCHY: dict[str, int] = {
     OrgRole.MEMBER: 0,
@@ -14,13 +40,140 @@ ROLE_HIERARCHY: dict[str, int] = {
     OrgRole.OWNER: 2,
 }
 
+USER_MEMBERSHIPS_SCOPE = "user_memberships"
+ORG_MEMBERSHIPS_SCOPE = "org_memberships"
+
+# Sentinel: the token claim cannot be used to decide this check.
+_UNKNOWN = object()
+
+# {user_id: {org_id: Membership}} for the current request, or None outside one.
+_request_memberships: ContextVar[dict[int, dict[int, Membership]] | None] = ContextVar(
+    "request_memberships", default=None
+)
+
+
+@contextmanager
+def membership_context() -> Iterator[None]:
+    """Memoize membership lookups until the block exits."""
+    token = _request_memberships.set({})
+    try:
+        yield
+    finally:
+        _request_memberships.reset(token)
+
+
+def invalidate_memberships(*, user_ids: tuple[int, ...] = (), org_id: int | None = None) -> None:
+    """Record that memberships of these users (or of every user in an org) changed."""
+    stamps = [(USER_MEMBERSHIPS_SCOPE, user_id) for user_id in user_ids]
+    if org_id is not None:
+        stamps.append((ORG_MEMBERSHIPS_SCOPE, org_id))
+    bump_versions(*stamps)
+
+    memo = _request_memberships.get()
+    if memo is not None:
+        if org_id is not None:
+            memo.clear()
+        for user_id in user_ids:
+            memo.pop(user_id, None)
+
+
+def _role_from_claims(user, org_id: int) -> str | None | object:
+    """Return the role from the token's org_roles claim, or _UNKNOWN if the claim can't be trusted."""
+    if not settings.JWT_CLAIMS_PERMISSIONS or not cache_is_shared():
+        return _UNKNOWN
+
+    token = getattr(user, "token", None)
+    if token is None or "iat" not in token:
+        return _UNKNOWN
+    org_roles = org_roles_from_token(token)
+    if org_roles is None:
+        return _UNKNOWN
+
+    versions = get_versions((USER_MEMBERSHIPS_SCOPE, user.id), (ORG_MEMBERSHIPS_SCOPE, org_id))
+    if token["iat"] <= max(versions):
+        return _UNKNOWN
+
+    return org_roles.get(str(org_id))
+
+
+class RoleCache:
+    """Shared (user, org) -> role cache, invalidated by membership versions.
+
+    Entries live in Django's default cache, so gunicorn workers share them
+    when that is a cache server. With a per-process cache (LocMemCache) a
+    bump would only reach the worker that made it, so every lookup goes to
+    the database instead. Non-membership is cached too. Hit and miss
+    counters are per process. Set `ROLE_CACHE_TIMEOUT = 0` to disable.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def get_role(self, user, org_id: int) -> str | None:
+        """Return the user's role in the organization, loading it on a miss."""
+        timeout = settings.ROLE_CACHE_TIMEOUT
+        if not timeout or not cache_is_shared():
+            membership = get_membership_or_none(user, org_id)
+            return membership.role if membership is not None else None
+
+        key = f"role:{user.id}:{org_id}"
+        cached, versions = get_versioned(key, (USER_MEMBERSHIPS_SCOPE, user.id), (ORG_MEMBERSHIPS_SCOPE, org_id))
+        if cached is not MISSING:
+            with self._lock:
+                self.hits += 1
+            return str(cached) or None
+
+        with self._lock:
+            self.misses += 1
+        membership = get_membership_or_none(user, org_id)
+        role = membership.role if membership is not None else None
+        set_versioned(key, role or "", versions, timeout)
+        return role
+
+
+role_cache = RoleCache()
+
+
+def get_role(user, org_id: int) -> str | None:
+    """Return the user's role in an organization, or None if not a member.
+
+    Sources in order: a fresh token claim, this request's memoized
+    memberships, the shared role cache, and finally the database.
+    """
+    role = _role_from_claims(user, org_id)
+    if role is not _UNKNOWN:
+        return role  # type: ignore[return-value]
+
+    memo = _request_memberships.get()
+    if memo is not None and user.id in memo:
+        membership = memo[user.id].get(org_id)
+        return membership.role if membership is not None else None
+
+    return role_cache.get_role(user, org_id)
+
 
 def get_membership_or_none(user, org_id: int) -> Membership | None:
     """Get the user's membership for an organization, or None if not a member."""
-    try:
-        return Membership.objects.select_related("organization").get(user=user, organization_id=org_id)
-    except Membership.DoesNotExist:
-        return None
+    memo = _request_memberships.get()
+    if memo is None:
+        try:
+            return Membership.objects.select_related("organization").get(user_id=user.id, organization_id=org_id)
+        except Membership.DoesNotExist:
+            return None
+
+    if user.id not in memo:
+        memberships = Membership.objects.select_related("organization").filter(user_id=user.id)
+        memo[user.id] = {m.organization_id: m for m in memberships}
+    return memo[user.id].get(org_id)
 
 
 def check_role(user, org_id: int, *, min_role: str) -> tuple[bool, str]:
@@ -30,17 +183,17 @@ def check_role(user, org_id: int, *, min_role: str) -> tuple[bool, str]:
         (True, "") if the user has sufficient permissions.
         (False, reason) if the user lacks permissions.
     """
-    membership = get_membership_or_none(user, org_id)
-    if membership is None:
+    role = get_role(user, org_id)
+    if role is None:
         return False, "You are not a member of this organization."
 
-    user_level = ROLE_HIERARCHY.get(membership.role, -1)
+    user_level = ROLE_HIERARCHY.get(role, -1)
     required_level = ROLE_HIERARCHY.get(min_role, 999)
 
     if user_level >= required_level:
         return True, ""
 
-    return False, f"Insufficient permissions. Required: {min_role}, your role: {membership.role}."
+    return False, f"Insufficient permissions. Required: {min_role}, your role: {role}."
 
 
 def check_role_or_raise(user, org_id: int, min_role: str) -> None:
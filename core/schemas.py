@@ -5,3 +5,12 @@ from ninja import Schema
 
 class ErrorOut(Schema):
     detail: str
+
+
+class RowErrorOut(Schema):
+    index: int
+    detail: str
+
+
+class RowErrorsOut(ErrorOut):
+    errors: list[RowErrorOut]
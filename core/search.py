@@ -0,0 +1,173 @@
+"""Name normalization and fuzzy matching shared by search endpoints.
+
+Searchable names are stored a second time in normalized form (see
+`normalize_name()`: accents stripped, Nordic letters spelled out, case
+folded, whitespace collapsed), so a search compares keys with plain
+prefix matches and one index serves every spelling.
+
+Fuzzy matching uses the `word_similar` lookup, pg_trgm's `<%` operator
+("some word of the column is similar to the term"), which a GIN
+`gin_trgm_ops` index answers on PostgreSQL. On SQLite the same lookup
+calls a Python `word_similarity()` registered on every connection: it
+approximates pg_trgm by scoring each word of the column separately.
+
+Ranked full-text search stores a `TextSearchVector` of a column in a
+GeneratedField: a tsvector on PostgreSQL (indexed with GIN), the
+lower-cased text elsewhere. `TextMatch` and `TextRank` turn the words of a
+query into a prefix tsquery (`word:* & ...`) for `@@` and `ts_rank`; on
+SQLite they call Python `text_match()`/`text_rank()` that mirror them.
+"""
+
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.contrib.postgres.search import SearchVectorField
+from django.db.backends.signals import connection_created
+from django.db.models import BooleanField, CharField, FloatField, Func, Lookup
+
+# pg_trgm's default pg_trgm.word_similarity_threshold.
+WORD_SIMILARITY_THRESHOLD = 0.6
+
+# Terms shorter than this have no trigrams worth comparing; they only prefix-match.
+FUZZY_MIN_LENGTH = 3
+
+
+# Letters that Unicode does not decompose into a base letter and an accent.
+_FOLD = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ð": "d", "đ": "d", "ł": "l", "þ": "th"})
+
+
+def normalize_name(value: str) -> str:
+    """Return `value` without accents, case folded, with single spaces ("Søren Æbelø" -> "soren aebelo")."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().translate(_FOLD).split())
+
+
+@lru_cache(maxsize=65536)
+def _trigrams(word: str) -> frozenset[str]:
+    padded = f"  {word} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+@lru_cache(maxsize=65536)  # Names repeat a lot within an organization.
+def word_similarity(term: str, text: str) -> float:
+    """Share of `term`'s trigrams found in the most similar word of `text`."""
+    if not term or not text:
+        return 0.0
+    wanted = frozenset().union(*(_trigrams(word) for word in term.lower().split()))
+    if not wanted:
+        return 0.0
+    return max(len(wanted & _trigrams(word)) / len(wanted) for word in text.lower().split())
+
+
+@CharField.register_lookup
+class WordSimilar(Lookup):
+    """`field__word_similar=term`: some word of the field is similar to `term`."""
+
+    lookup_name = "word_similar"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        sql = f"word_similarity({rhs}, {lhs}) >= {WORD_SIMILARITY_THRESHOLD}"
+        return sql, (*rhs_params, *lhs_params)
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{rhs} <%% {lhs}", (*rhs_params, *lhs_params)
+
+
+# Text search configuration: no stemming or stop words, since names are short.
+TEXT_SEARCH_CONFIG = "simple"
+
+_WORD = re.compile(r"\w+")
+
+
+def search_terms(query: str) -> list[str]:
+    """Split a query into lower-cased words, dropping tsquery syntax."""
+    return _WORD.findall(query.lower())
+
+
+class TextSearchVector(Func):
+    """The searchable form of a text column; immutable, so usable in a GeneratedField."""
+
+    function = "LOWER"
+    output_field = SearchVectorField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template=f"to_tsvector('{TEXT_SEARCH_CONFIG}'::regconfig, %(expressions)s)",
+            **extra_context,
+        )
+
+
+class _TextQueryFunc(Func):
+    """Apply a search vector to query `terms`; each term matches as a word prefix."""
+
+    python_function: str
+    postgres_template: str
+
+    def __init__(self, vector, terms: list[str], **extra) -> None:
+        self.terms = terms
+        super().__init__(vector, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        vector, params = compiler.compile(self.source_expressions[0])
+        return f"{self.python_function}({vector}, %s)", (*params, " ".join(self.terms))
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        vector, params = compiler.compile(self.source_expressions[0])
+        tsquery = " & ".join(f"{term}:*" for term in self.terms)
+        query = f"to_tsquery('{TEXT_SEARCH_CONFIG}'::regconfig, %s)"
+        return self.postgres_template.format(vector=vector, query=query), (*params, tsquery)
+
+
+class TextMatch(_TextQueryFunc):
+    """True when every term starts a word of the vector (`@@`)."""
+
+    output_field = BooleanField()
+    python_function = "text_match"
+    postgres_template = "{vector} @@ {query}"
+
+
+class TextRank(_TextQueryFunc):
+    """ts_rank of the vector for the terms, normalized by document length (1 + log(words))."""
+
+    output_field = FloatField()
+    python_function = "text_rank"
+    postgres_template = "ts_rank({vector}, {query}, 1)"
+
+
+def text_match(document: str | None, terms: str) -> bool:
+    words = _WORD.findall(document or "")
+    return all(any(word.startswith(term) for word in words) for term in terms.split())
+
+
+def text_rank(document: str | None, terms: str) -> float:
+    """Whole-word hits score 1 and prefix hits 0.5, divided by 1 + log(word count)."""
+    words = _WORD.findall(document or "")
+    if not words:
+        return 0.0
+    score = 0.0
+    for term in terms.split():
+        if term in words:
+            score += 1.0
+        elif any(word.startswith(term) for word in words):
+            score += 0.5
+    return score / (1 + math.log(len(words)))
+
+
+def _register_sqlite_functions(sender, connection, **kwargs) -> None:
+    if connection.vendor == "sqlite":
+        create_function = connection.connection.create_function
+        create_function("word_similarity", 2, word_similarity, deterministic=True)
+        create_function("text_match", 2, text_match, deterministic=True)
+        create_function("text_rank", 2, text_rank, deterministic=True)
+
+
+connection_created.connect(_register_sqlite_functions)
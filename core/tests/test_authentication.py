@@ -0,0 +1,107 @@
+"""Tests for GirafJWTAuth and the claims-only TokenPrincipal."""
+
+import pytest
+from django.test import Client
+from django.test.client import RequestFactory
+from ninja_jwt.exceptions import AuthenticationFailed
+
+from apps.citizens.models import Citizen
+from apps.users.models import User
+from conftest import auth_header
+from core.authentication import GirafJWTAuth, TokenPrincipal
+from core.token_generation import current_generation
+
+
+def _access_token(client: Client, username: str) -> str:
+    header: str = auth_header(client, username)["HTTP_AUTHORIZATION"]
+    return header.split(" ", 1)[1]
+
+
+@pytest.fixture
+def claims_auth(settings):
+    settings.JWT_CLAIMS_AUTH = True
+
+
+@pytest.mark.django_db
+class TestDefaultMode:
+    def test_returns_user_model(self, client, member):
+        token = _access_token(client, "member")
+        request = RequestFactory().get("/")
+
+        user = GirafJWTAuth().authenticate(request, token)
+
+        assert isinstance(user, User)
+        assert user.id == member.id
+
+
+@pytest.mark.django_db
+class TestClaimsMode:
+    def test_returns_principal_without_queries(self, client, member, claims_auth, django_assert_num_queries):
+        token = _access_token(client, "member")
+        request = RequestFactory().get("/")
+        current_generation(member.id)  # warm the shared generation cache
+
+        with django_assert_num_queries(0):
+            principal = GirafJWTAuth().authenticate(request, token)
+            assert principal.id == member.id
+            assert principal.username == "member"
+            assert principal.is_superuser is False
+            assert principal.is_active is True
+
+        assert isinstance(principal, TokenPrincipal)
+
+    def test_principal_carries_org_roles(self, client, org, owner, claims_auth):
+        token = _access_token(client, "owner")
+        principal = GirafJWTAuth().authenticate(RequestFactory().get("/"), token)
+        assert principal.org_roles == {str(org.id): "owner"}
+
+    def test_unknown_field_loads_user_once(self, client, member, claims_auth, django_assert_num_queries):
+        token = _access_token(client, "member")
+        principal = GirafJWTAuth().authenticate(RequestFactory().get("/"), token)
+
+        with django_assert_num_queries(1):
+            assert principal.email == member.email
+            assert principal.first_name == member.first_name
+
+    def test_principal_is_read_only(self, client, member, claims_auth):
+        token = _access_token(client, "member")
+        principal = GirafJWTAuth().authenticate(RequestFactory().get("/"), token)
+        with pytest.raises(AttributeError):
+            principal.username = "someone-else"
+
+    def test_deleted_user_fails_on_lazy_load(self, client, member, claims_auth):
+        token = _access_token(client, "member")
+        principal = GirafJWTAuth().authenticate(RequestFactory().get("/"), token)
+        member.delete()
+        with pytest.raises(AuthenticationFailed):
+            principal.email  # noqa: B018
+
+    def test_endpoint_skips_user_select(self, client, org, member, settings, django_assert_num_queries):
+        citizen = Citizen.objects.create(first_name="Alice", last_name="A", organization=org)
+        headers = auth_header(client, "member")
+        settings.ROLE_CACHE_TIMEOUT = 0
+
+        settings.JWT_CLAIMS_AUTH = False
+        with django_assert_num_queries(3):
+            assert client.get(f"/api/v1/citizens/{citizen.id}", **headers).status_code == 200
+
+        settings.JWT_CLAIMS_AUTH = True
+        current_generation(member.id)
+        with django_assert_num_queries(2):
+            assert client.get(f"/api/v1/citizens/{citizen.id}", **headers).status_code == 200
+
+    def test_me_endpoint_lazily_loads_profile(self, client, member, claims_auth):
+        resp = client.get("/api/v1/users/me", **auth_header(client, "member"))
+        assert resp.status_code == 200
+        assert resp.json()["email"] == member.email
+        assert resp.json()["display_name"] == member.display_name
+
+    def test_create_organization_with_principal(self, client, member, claims_auth):
+        resp = client.post(
+            "/api/v1/organizations",
+            data={"name": "Claims School"},
+            content_type="application/json",
+            **auth_header(client, "member"),
+        )
+        assert resp.status_code == 201
+        assert client.get("/api/v1/organizations", **auth_header(client, "member")).json()["count"] == 1
@@ -0,0 +1,147 @@
+"""Tests for conditional GET (ETag / If-None-Match) on org-scoped reads."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.citizens.models import Citizen
+from apps.citizens.services import CitizenService
+from apps.grades.services import GradeService
+from apps.organizations.services import OrganizationService
+from apps.pictograms.services import PictogramService
+from apps.users.services import UserService
+from conftest import auth_header
+
+
+@pytest.fixture
+def headers(client, org):
+    return auth_header(client, "member")
+
+
+def _get(client, path, headers, etag=None):
+    extra = {"HTTP_IF_NONE_MATCH": etag} if etag else {}
+    return client.get(path, **headers, **extra)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/v1/organizations/{org}",
+            "/api/v1/organizations/{org}/citizens",
+            "/api/v1/organizations/{org}/grades",
+            "/api/v1/organizations/{org}/members",
+            "/api/v1/pictograms?organization_id={org}",
+            "/api/v1/pictograms",
+        ],
+    )
+    def test_matching_etag_returns_304(self, client, org, headers, path):
+        path = path.format(org=org.id)
+        resp = _get(client, path, headers)
+        assert resp.status_code == 200
+        etag = resp["ETag"]
+        assert etag.startswith('"')
+
+        resp = _get(client, path, headers, etag)
+        assert resp.status_code == 304
+        assert resp["ETag"] == etag
+        assert resp.content == b""
+
+    def test_304_runs_no_list_query(self, client, org, headers):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        etag = _get(client, path, headers)["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = _get(client, path, headers, etag)
+
+        assert resp.status_code == 304
+        assert not [q for q in ctx.captured_queries if "citizens_citizen" in q["sql"]]
+
+    def test_etag_depends_on_query_string(self, client, org, headers):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        etag = _get(client, path, headers)["ETag"]
+        assert _get(client, f"{path}?limit=1", headers, etag).status_code == 200
+
+    def test_non_member_gets_403_not_304(self, client, org, headers, second_org):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        etag = _get(client, path, headers)["ETag"]
+        outsider = auth_header(client, "outsider")
+        assert _get(client, path, outsider, etag).status_code == 403
+
+    @pytest.mark.parametrize(
+        ("path", "write"),
+        [
+            ("citizens", lambda org: CitizenService.create_citizen(org_id=org.id, first_name="A", last_name="B")),
+            ("grades", lambda org: GradeService.create_grade(name="1A", org_id=org.id)),
+            ("", lambda org: OrganizationService.update_organization(org_id=org.id, name="Renamed")),
+            ("members", lambda org: UserService.update_user(user_id=org.memberships.first().user_id, first_name="X")),
+        ],
+    )
+    def test_write_changes_etag(self, client, org, headers, path, write):
+        url = f"/api/v1/organizations/{org.id}/{path}".rstrip("/")
+        etag = _get(client, url, headers)["ETag"]
+
+        write(org)
+
+        resp = _get(client, url, headers, etag)
+        assert resp.status_code == 200
+        assert resp["ETag"] != etag
+
+    def test_grade_roster_change_changes_etag(self, client, org, headers):
+        grade = GradeService.create_grade(name="1A", org_id=org.id)
+        citizen = Citizen.objects.create(organization=org, first_name="A", last_name="B")
+        url = f"/api/v1/organizations/{org.id}/grades"
+        etag = _get(client, url, headers)["ETag"]
+
+        GradeService.add_citizens(grade_id=grade.id, citizen_ids=[citizen.id])
+
+        assert _get(client, url, headers, etag).status_code == 200
+
+    def test_global_pictogram_changes_every_org_listing(self, client, org, headers):
+        url = f"/api/v1/pictograms?organization_id={org.id}"
+        etag = _get(client, url, headers)["ETag"]
+
+        PictogramService.create_pictogram(name="Sun", image_url="https://example.com/sun.png")
+
+        assert _get(client, url, headers, etag).status_code == 200
+
+    def test_other_org_write_keeps_etag(self, client, org, headers, second_org):
+        url = f"/api/v1/organizations/{org.id}/citizens"
+        etag = _get(client, url, headers)["ETag"]
+
+        CitizenService.create_citizen(org_id=second_org.id, first_name="A", last_name="B")
+
+        assert _get(client, url, headers, etag).status_code == 304
+
+
+@pytest.mark.django_db
+class TestOrgDataVersions:
+    def test_versions_live_in_the_database(self, org):
+        from django.core.cache import cache
+
+        from core.etags import bump_org_data, get_org_data_versions
+
+        bump_org_data(org.id, None)
+        cache.clear()  # Another worker shares the database, not this process's cache.
+
+        assert get_org_data_versions(None, org.id, org.id + 1) == [1, 1, 0]
+
+    def test_rolled_back_write_keeps_the_version(self, org):
+        from django.db import transaction
+
+        from core.etags import bump_org_data, get_org_data_versions
+
+        bump_org_data(org.id)
+        with pytest.raises(RuntimeError), transaction.atomic():
+            bump_org_data(org.id)
+            raise RuntimeError
+
+        assert get_org_data_versions(org.id) == [1]
+
+    def test_bump_of_an_existing_row_is_one_query(self, org, django_assert_num_queries):
+        from core.etags import bump_org_data
+
+        bump_org_data(org.id)
+        with django_assert_num_queries(1):
+            bump_org_data(org.id)
@@ -0,0 +1,108 @@
+"""Tests for upload validation and the image processing pool."""
+
+import io
+import threading
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from conftest import auth_header
+from core import images
+from core.exceptions import BusinessValidationError, ServiceUnavailableError
+from core.images import reserve, validate_upload, verify_image
+
+
+def _png(size=(10, 10)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, color="red").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestValidateUpload:
+    def test_accepts_header_of_truncated_image(self):
+        validate_upload(SimpleUploadedFile("a.png", _png((64, 64))[:60]))
+
+    def test_rejects_non_image(self):
+        with pytest.raises(BusinessValidationError, match="not a valid image"):
+            validate_upload(SimpleUploadedFile("a.png", b"not an image"))
+
+    def test_rejects_huge_canvas(self, monkeypatch):
+        monkeypatch.setattr(images, "MAX_IMAGE_PIXELS", 99)
+
+        with pytest.raises(BusinessValidationError, match="too large"):
+            validate_upload(SimpleUploadedFile("a.png", _png()))
+
+    def test_verify_rejects_truncated_image(self):
+        with pytest.raises(ValueError):
+            verify_image(_png((64, 64))[:60])
+
+
+class TestImagePool:
+    def test_runs_jobs_in_a_process_pool(self, settings):
+        settings.IMAGE_WORKERS = 1
+        finished = threading.Event()
+        outcomes = []
+
+        def on_done(result, error):
+            outcomes.append((result, error))
+            finished.set()
+
+        with reserve() as job:
+            job.submit(verify_image, _png()[:60], on_done=on_done)
+
+        assert finished.wait(timeout=60)
+        result, error = outcomes[0]
+        assert result is None and isinstance(error, ValueError)
+
+    def test_results_are_recorded_off_the_pools_result_thread(self, settings):
+        settings.IMAGE_WORKERS = 1
+        recorded = threading.Event()
+        threads = []
+
+        def on_done(result, error):
+            threads.append(threading.current_thread().name)
+            recorded.set()
+
+        with reserve() as job:
+            job.submit(verify_image, _png(), on_done=on_done)
+
+        assert recorded.wait(timeout=60)
+        assert threads[0].startswith("image-results")
+        images._get_recorder().submit(lambda: None).result()  # Let the job's release finish.
+        assert images._pending == 0
+
+    def test_full_queue_rejects_new_jobs(self, settings, monkeypatch):
+        settings.IMAGE_WORKERS = 1
+        settings.IMAGE_QUEUE_LIMIT = 2
+        monkeypatch.setattr(images, "_pending", 2)
+
+        with pytest.raises(ServiceUnavailableError):
+            reserve()
+
+    def test_unsubmitted_reservation_is_released(self):
+        with pytest.raises(RuntimeError), reserve():
+            raise RuntimeError
+
+        assert images._pending == 0
+
+    def test_callback_errors_are_contained(self):
+        def on_done(result, error):
+            raise RuntimeError("boom")
+
+        with reserve() as job:
+            job.submit(verify_image, _png(), on_done=on_done)
+
+        assert images._pending == 0
+
+
+@pytest.mark.django_db
+def test_full_queue_answers_503(client, settings, monkeypatch, owner):
+    settings.IMAGE_WORKERS = 1
+    monkeypatch.setattr(images, "_pending", settings.IMAGE_QUEUE_LIMIT)
+    image = SimpleUploadedFile("a.png", _png(), content_type="image/png")
+
+    resp = client.post("/api/v1/pictograms/upload", {"name": "Busy", "image": image}, **auth_header(client, "owner"))
+
+    assert resp.status_code == 503
+    assert resp["Retry-After"]
@@ -0,0 +1,42 @@
+"""Tests for the compact org_roles claim encoding."""
+
+import pytest
+
+from core.org_roles import decode_org_roles, encode_org_roles, org_roles_from_token
+
+
+class TestOrgRolesEncoding:
+    def test_encodes_documented_example(self):
+        org_roles = {"1": "owner", "5": "member", "7": "member", "40": "admin"}
+        assert encode_org_roles(org_roles) == "1|14|5.2"
+
+    def test_drops_empty_trailing_buckets(self):
+        assert encode_org_roles({"3": "owner"}) == "3"
+        assert encode_org_roles({}) == ""
+
+    @pytest.mark.parametrize("count", [0, 1, 10, 100])
+    def test_round_trips(self, count):
+        roles = ("owner", "admin", "member")
+        org_roles = {str(1000 + 7 * n): roles[n % 3] for n in range(count)}
+        assert decode_org_roles(encode_org_roles(org_roles)) == org_roles
+
+    def test_rejects_unknown_role(self):
+        with pytest.raises(ValueError):
+            encode_org_roles({"1": "superadmin"})
+
+    def test_rejects_malformed_claim(self):
+        with pytest.raises(ValueError):
+            decode_org_roles("1|2|3|4")
+        with pytest.raises(ValueError):
+            decode_org_roles("1.!")
+
+
+class TestOrgRolesFromToken:
+    def test_reads_dict_claim(self):
+        assert org_roles_from_token({"org_roles": {"1": "owner"}}) == {"1": "owner"}
+
+    def test_reads_packed_claim(self):
+        assert org_roles_from_token({"org_roles_packed": "|1"}) == {"1": "admin"}
+
+    def test_missing_claim(self):
+        assert org_roles_from_token({}) is None
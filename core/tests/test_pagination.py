@@ -0,0 +1,243 @@
+"""Tests for keyset (cursor) pagination."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.citizens.models import Citizen
+from apps.invitations.models import Invitation
+from apps.organizations.models import Membership
+from apps.pictograms.models import Pictogram
+from apps.users.tests.factories import UserFactory
+from conftest import auth_header
+from core.pagination import ordering_keys
+
+
+@pytest.fixture
+def headers(client, org):
+    return auth_header(client, "member")
+
+
+@pytest.fixture
+def citizens(org):
+    names = ["Ada", "Bo", "Bo", "Cy", "Di", "Ed", "Ed", "Fay"]
+    return [Citizen.objects.create(organization=org, first_name=name, last_name="X") for name in names]
+
+
+def _walk(client, path, headers, limit, **params):
+    """Follow next_cursor from the first page; return the ids seen and the page count."""
+    resp = client.get(path, {"limit": limit, **params}, **headers)
+    ids, pages = [], 0
+    while True:
+        assert resp.status_code == 200, resp.content
+        body = resp.json()
+        ids += [item["id"] for item in body["items"]]
+        pages += 1
+        if body["next_cursor"] is None:
+            return ids, pages
+        resp = client.get(path, {"limit": limit, "cursor": body["next_cursor"], **params}, **headers)
+
+
+class TestOrderingKeys:
+    def test_meta_ordering_plus_pk(self):
+        assert ordering_keys(Citizen.objects.all()) == ["first_name", "last_name", "id"]
+
+    def test_descending_tie_breaker(self):
+        assert ordering_keys(Invitation.objects.all()) == ["-created_at", "-id"]
+
+    def test_relations_expand_to_related_ordering(self):
+        assert ordering_keys(Membership.objects.all()) == ["organization__name", "user__username", "id"]
+
+    def test_explicit_order_by_wins(self):
+        assert ordering_keys(Citizen.objects.order_by("-last_name")) == ["-last_name", "-id"]
+
+
+@pytest.mark.django_db
+class TestCursorPagination:
+    def test_walks_every_row_once_in_order(self, client, org, headers, citizens):
+        ids, pages = _walk(client, f"/api/v1/organizations/{org.id}/citizens", headers, limit=3)
+
+        assert ids == list(
+            Citizen.objects.filter(organization=org)
+            .order_by("first_name", "last_name", "id")
+            .values_list("id", flat=True)
+        )
+        assert pages == 3
+
+    def test_offset_mode_is_unchanged_and_adds_cursor(self, client, org, headers, citizens):
+        body = client.get(f"/api/v1/organizations/{org.id}/citizens?limit=3&offset=3", **headers).json()
+
+        assert body["count"] == 8
+        assert [item["first_name"] for item in body["items"]] == ["Cy", "Di", "Ed"]
+        assert body["next_cursor"]
+
+    def test_cursor_page_skips_count_and_offset(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        cursor = client.get(f"{path}?limit=3", **headers).json()["next_cursor"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            body = client.get(path, {"limit": 3, "cursor": cursor}, **headers).json()
+
+        assert body["count"] is None
+        sql = [q["sql"] for q in ctx.captured_queries if "citizens" in q["sql"]]
+        assert not [q for q in sql if "COUNT(" in q or "OFFSET" in q]
+
+    def test_stable_under_concurrent_inserts(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        first = client.get(f"{path}?limit=4", **headers).json()
+        Citizen.objects.create(organization=org, first_name="Aa", last_name="X")  # sorts onto page one
+
+        second = client.get(path, {"limit": 4, "cursor": first["next_cursor"]}, **headers).json()
+
+        assert [item["first_name"] for item in second["items"]] == ["Di", "Ed", "Ed", "Fay"]
+
+    def test_descending_order_with_equal_timestamps(self, client, org, owner):
+        receivers = [UserFactory(username=f"r{n}", email=f"r{n}@example.com") for n in range(5)]
+        invitations = [Invitation.objects.create(organization=org, sender=owner, receiver=r) for r in receivers]
+        Invitation.objects.update(created_at=invitations[0].created_at)
+
+        ids, _ = _walk(client, f"/api/v1/organizations/{org.id}/invitations", auth_header(client, "owner"), limit=2)
+
+        assert ids == sorted(inv.id for inv in invitations)[::-1]
+
+    def test_members_walk(self, client, org, headers):
+        for n in range(4):
+            Membership.objects.create(user=UserFactory(username=f"m{n}"), organization=org)
+
+        ids, _ = _walk(client, f"/api/v1/organizations/{org.id}/members", headers, limit=2)
+
+        assert len(ids) == len(set(ids)) == 6
+
+    def test_tampered_cursor_is_rejected(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        cursor = client.get(f"{path}?limit=3", **headers).json()["next_cursor"]
+
+        resp = client.get(path, {"cursor": cursor[:-2] + "xx"}, **headers)
+
+        assert resp.status_code == 400
+
+    def test_cursor_holds_no_column_values(self, client, org, headers, citizens):
+        from django.core import signing
+
+        cursor = client.get(f"/api/v1/organizations/{org.id}/citizens?limit=3", **headers).json()["next_cursor"]
+
+        assert "Bo" not in signing.b64_decode(cursor.split(":")[0].encode()).decode()
+        assert cursor.startswith(signing.b64_encode(f"[{citizens[2].id},{citizens[3].id}]".encode()).decode())
+
+    def test_continues_after_deleted_row(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        first = client.get(f"{path}?limit=3", **headers).json()
+        Citizen.objects.filter(pk=first["items"][-1]["id"]).delete()
+
+        second = client.get(path, {"limit": 3, "cursor": first["next_cursor"]}, **headers).json()
+
+        assert [item["first_name"] for item in second["items"]] == ["Cy", "Di", "Ed"]
+
+    def test_cursor_with_both_rows_deleted_is_rejected(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}/citizens"
+        first = client.get(f"{path}?limit=3", **headers).json()
+        Citizen.objects.filter(first_name__in=["Bo", "Cy"]).delete()
+
+        resp = client.get(path, {"limit": 3, "cursor": first["next_cursor"]}, **headers)
+
+        assert resp.status_code == 400
+
+    def test_cursor_from_another_ordering_is_rejected(self, client, org, headers, citizens):
+        path = f"/api/v1/organizations/{org.id}"
+        cursor = client.get(f"{path}/citizens?limit=1", **headers).json()["next_cursor"]
+
+        resp = client.get(f"{path}/grades", {"cursor": cursor}, **headers)
+
+        assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+class TestPictogramCursor:
+    @pytest.fixture
+    def pictograms(self, org):
+        for name in ["a", "c", "e", "g"]:
+            Pictogram.objects.create(name=name, image_url="https://example.com/p.png")
+        for name in ["b", "d", "f"]:
+            Pictogram.objects.create(name=name, image_url="https://example.com/p.png", organization=org)
+
+    def test_walks_merged_catalog(self, client, org, headers, pictograms):
+        ids, pages = _walk(client, "/api/v1/pictograms", headers, limit=2, organization_id=org.id)
+
+        names = list(Pictogram.objects.filter(id__in=ids).order_by("name").values_list("id", flat=True))
+        assert ids == names
+        assert pages == 4
+
+    def test_continues_after_deleted_row(self, client, org, headers, pictograms):
+        path = "/api/v1/pictograms"
+        first = client.get(path, {"organization_id": org.id, "limit": 3}, **headers).json()
+        Pictogram.objects.filter(name="c").delete()  # the cursor's row
+
+        second = client.get(path, {"organization_id": org.id, "limit": 3, "cursor": first["next_cursor"]}, **headers)
+
+        assert [item["name"] for item in second.json()["items"]] == ["d", "e", "f"]
+
+
+@pytest.mark.django_db
+class TestCountModes:
+    path = "/api/v1/organizations/{}/citizens"
+
+    def _get(self, client, org, headers, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(self.path.format(org.id), params, **headers)
+        counts = [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+        return resp, counts
+
+    def test_none_skips_count_and_reports_has_more(self, client, org, headers, citizens):
+        resp, counts = self._get(client, org, headers, limit=3, count="none")
+
+        body = resp.json()
+        assert body["count"] is None
+        assert body["has_more"] is True
+        assert not counts
+
+    def test_exact_counts_when_more_rows_follow(self, client, org, headers, citizens):
+        resp, counts = self._get(client, org, headers, limit=3, count="exact")
+
+        assert resp.json()["count"] == 8
+        assert len(counts) == 1
+
+    def test_last_page_count_needs_no_query(self, client, org, headers, citizens):
+        resp, counts = self._get(client, org, headers, limit=5, offset=5)
+
+        body = resp.json()
+        assert body["count"] == 8
+        assert body["has_more"] is False
+        assert not counts
+
+    def test_estimated_is_exact_off_postgres(self, client, org, headers, citizens):
+        resp, _ = self._get(client, org, headers, limit=3, count="estimated")
+
+        assert resp.json()["count"] == 8
+
+    def test_estimate_never_undercounts_the_page(self, client, org, headers, citizens, monkeypatch):
+        monkeypatch.setattr("core.pagination.estimate_count", lambda queryset: 2)
+
+        resp, _ = self._get(client, org, headers, limit=3, offset=3, count="estimated")
+
+        assert resp.json()["count"] == 7
+
+    def test_cursor_pages_can_ask_for_a_count(self, client, org, headers, citizens):
+        cursor = client.get(self.path.format(org.id), {"limit": 3}, **headers).json()["next_cursor"]
+
+        resp, _ = self._get(client, org, headers, limit=3, cursor=cursor, count="exact")
+
+        assert resp.json()["count"] == 8
+
+    def test_unknown_mode_is_rejected(self, client, org, headers):
+        resp, _ = self._get(client, org, headers, count="roughly")
+
+        assert resp.status_code == 422
+
+    def test_pictograms_honor_none(self, client, org, headers):
+        for name in ["a", "b", "c"]:
+            Pictogram.objects.create(name=name, image_url="https://example.com/p.png")
+
+        body = client.get("/api/v1/pictograms", {"limit": 2, "count": "none"}, **headers).json()
+
+        assert body["count"] is None
+        assert body["has_more"] is True
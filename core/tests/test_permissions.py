@@ -108,3 +108,295 @@ class TestCheckRoleOrRaise:
         with pytest.raises(HttpError) as exc_info:
             check_role_or_raise(user, org.id, OrgRole.MEMBER)
         assert exc_info.value.status_code == 403
+
+
+def _principal(client, username: str):
+    from ninja_jwt.tokens import AccessToken
+
+    from conftest import auth_header
+    from core.authentication import TokenPrincipal
+
+    header = auth_header(client, username)["HTTP_AUTHORIZATION"]
+    return TokenPrincipal(AccessToken(header.split(" ", 1)[1]))
+
+
+@pytest.fixture
+def claims_permissions(settings, file_cache):
+    """Enable claim-based role checks with membership versions older than any new token."""
+    import time
+
+    from django.core.cache import cache
+
+    from core.versioning import _cache_key
+
+    settings.JWT_CLAIMS_PERMISSIONS = True
+    past = time.time() - 60
+    for scope in ("user_memberships", "org_memberships"):
+        for key in range(1, 50):
+            cache.set(_cache_key(scope, key), past, timeout=None)
+
+
+@pytest.mark.django_db
+class TestClaimBasedRoles:
+    def test_fresh_claim_skips_membership_query(
+        self, client, org, owner, claims_permissions, django_assert_num_queries
+    ):
+        from core.permissions import check_role
+
+        principal = _principal(client, "owner")
+        with django_assert_num_queries(0):
+            allowed, _ = check_role(principal, org.id, min_role=OrgRole.OWNER)
+        assert allowed is True
+
+    def test_org_missing_from_fresh_claim_is_denied(
+        self, client, member, second_org, claims_permissions, django_assert_num_queries
+    ):
+        from core.permissions import check_role
+
+        principal = _principal(client, "member")
+        with django_assert_num_queries(0):
+            allowed, msg = check_role(principal, second_org.id, min_role=OrgRole.MEMBER)
+        assert allowed is False
+        assert "not a member" in msg
+
+    def test_compact_claim_skips_membership_query(
+        self, client, org, owner, settings, claims_permissions, django_assert_num_queries
+    ):
+        from core.permissions import check_role
+
+        settings.JWT_ORG_ROLES_FORMAT = "compact"
+        principal = _principal(client, "owner")
+        assert principal.org_roles == {str(org.id): "owner"}
+        with django_assert_num_queries(0):
+            allowed, _ = check_role(principal, org.id, min_role=OrgRole.OWNER)
+        assert allowed is True
+
+    def test_demotion_revokes_claim(self, client, org, owner, member, claims_permissions):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role
+
+        Membership.objects.filter(user=member, organization=org).update(role=OrgRole.ADMIN)
+        principal = _principal(client, "member")
+        assert check_role(principal, org.id, min_role=OrgRole.ADMIN)[0] is True
+
+        OrganizationService.update_member_role(org.id, member.id, OrgRole.MEMBER)
+
+        allowed, msg = check_role(principal, org.id, min_role=OrgRole.ADMIN)
+        assert allowed is False
+        assert "your role: member" in msg
+
+    def test_removal_revokes_claim(self, client, org, member, claims_permissions):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role
+
+        principal = _principal(client, "member")
+        OrganizationService.remove_member(org.id, member.id)
+
+        assert check_role(principal, org.id, min_role=OrgRole.MEMBER)[0] is False
+
+    def test_new_membership_falls_back_to_database(self, client, member, claims_permissions):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role
+
+        principal = _principal(client, "member")
+        new_org = OrganizationService.create_organization(name="Fresh School", creator=member)
+
+        assert check_role(principal, new_org.id, min_role=OrgRole.OWNER)[0] is True
+
+    def test_unshared_cache_queries_membership(self, client, org, owner, settings, django_assert_num_queries):
+        from core.permissions import check_role
+
+        settings.JWT_CLAIMS_PERMISSIONS = True
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        principal = _principal(client, "owner")
+        with django_assert_num_queries(1):
+            assert check_role(principal, org.id, min_role=OrgRole.OWNER)[0] is True
+
+    def test_disabled_mode_queries_membership(self, client, org, owner, settings, django_assert_num_queries):
+        from core.permissions import check_role
+
+        settings.JWT_CLAIMS_PERMISSIONS = False
+        principal = _principal(client, "owner")
+        with django_assert_num_queries(1):
+            assert check_role(principal, org.id, min_role=OrgRole.OWNER)[0] is True
+
+    def test_endpoint_authorizes_from_claim(self, client, org, member, settings, claims_permissions):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from conftest import auth_header
+
+        settings.JWT_CLAIMS_AUTH = True
+        headers = auth_header(client, "member")
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(f"/api/v1/organizations/{org.id}", **headers)
+        assert resp.status_code == 200
+        assert not [q for q in ctx.captured_queries if "memberships" in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestMembershipContext:
+    def test_memoizes_all_memberships_for_user(self, org, second_org, owner, django_assert_num_queries):
+        from core.permissions import check_role, membership_context
+
+        Membership.objects.create(user=owner, organization=second_org, role=OrgRole.MEMBER)
+        with membership_context(), django_assert_num_queries(1):
+            assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is True
+            assert check_role(owner, org.id, min_role=OrgRole.MEMBER)[0] is True
+            assert check_role(owner, second_org.id, min_role=OrgRole.ADMIN)[0] is False
+
+    def test_invalidation_reloads_changed_user(self, org, owner, member):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role, membership_context
+
+        with membership_context():
+            assert check_role(member, org.id, min_role=OrgRole.MEMBER)[0] is True
+            OrganizationService.remove_member(org.id, member.id)
+            assert check_role(member, org.id, min_role=OrgRole.MEMBER)[0] is False
+
+    def test_no_memoization_outside_context(self, org, owner, settings, django_assert_num_queries):
+        from core.permissions import check_role
+
+        settings.ROLE_CACHE_TIMEOUT = 0
+        with django_assert_num_queries(2):
+            check_role(owner, org.id, min_role=OrgRole.MEMBER)
+            check_role(owner, org.id, min_role=OrgRole.MEMBER)
+
+
+def _caller_membership_lookups(queries, user_id: int) -> int:
+    return sum(
+        1 for q in queries if 'FROM "memberships"' in q["sql"] and f'"memberships"."user_id" = {user_id}' in q["sql"]
+    )
+
+
+@pytest.mark.django_db
+class TestEndpointMembershipQueries:
+    """Each endpoint resolves the caller's memberships with a single query, however many checks it runs."""
+
+    @pytest.fixture
+    def data(self, org, owner, member, non_member):
+        from apps.citizens.models import Citizen
+        from apps.grades.models import Grade
+        from apps.invitations.models import Invitation
+        from apps.pictograms.models import Pictogram
+
+        citizen = Citizen.objects.create(first_name="Alice", last_name="A", organization=org)
+        grade = Grade.objects.create(name="3A", organization=org)
+        picto = Pictogram.objects.create(name="Sun", image_url="https://example.com/sun.png", organization=org)
+        invitation = Invitation.objects.create(organization=org, sender=owner, receiver=non_member)
+        return {"org": org.id, "citizen": citizen.id, "grade": grade.id, "picto": picto.id, "inv": invitation.id}
+
+    @pytest.mark.parametrize(
+        "method,path,body",
+        [
+            ("get", "/organizations/{org}", None),
+            ("patch", "/organizations/{org}", {"name": "Renamed"}),
+            ("get", "/organizations/{org}/members", None),
+            ("post", "/organizations/{org}/citizens", {"first_name": "B", "last_name": "B"}),
+            ("get", "/organizations/{org}/citizens", None),
+            ("get", "/citizens/{citizen}", None),
+            ("patch", "/citizens/{citizen}", {"first_name": "C"}),
+            ("get", "/organizations/{org}/grades", None),
+            ("get", "/grades/{grade}", None),
+            ("post", "/grades/{grade}/citizens", {"citizen_ids": []}),
+            ("post", "/pictograms", {"name": "Moon", "image_url": "https://example.com/m.png", "organization_id": 0}),
+            ("delete", "/pictograms/{picto}", None),
+            ("get", "/organizations/{org}/invitations", None),
+            ("delete", "/organizations/{org}/invitations/{inv}", None),
+        ],
+    )
+    def test_single_membership_lookup(self, client, data, owner, method, path, body):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from conftest import auth_header
+
+        if body and "organization_id" in body:
+            body = {**body, "organization_id": data["org"]}
+        headers = auth_header(client, "owner")
+        kwargs = {"content_type": "application/json", "data": body} if body is not None else {}
+
+        with CaptureQueriesContext(connection) as ctx:
+            resp = getattr(client, method)(f"/api/v1{path.format(**data)}", **kwargs, **headers)
+
+        assert resp.status_code < 400, resp.content
+        assert _caller_membership_lookups(ctx.captured_queries, owner.id) == 1
+
+
+@pytest.fixture
+def file_cache(settings, tmp_path):
+    """Back the default cache with files, standing in for a cache shared by several workers."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": str(tmp_path)}
+    }
+
+
+@pytest.mark.django_db
+class TestRoleCache:
+    @pytest.fixture(autouse=True)
+    def _reset_stats(self):
+        from core.permissions import role_cache
+
+        role_cache.reset_stats()
+
+    def test_second_check_is_a_hit(self, org, owner, file_cache, django_assert_num_queries):
+        from core.permissions import check_role, role_cache
+
+        with django_assert_num_queries(1):
+            assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is True
+        with django_assert_num_queries(0):
+            assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is True
+        assert role_cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_caches_non_membership(self, second_org, owner, file_cache, django_assert_num_queries):
+        from core.permissions import check_role
+
+        check_role(owner, second_org.id, min_role=OrgRole.MEMBER)
+        with django_assert_num_queries(0):
+            assert check_role(owner, second_org.id, min_role=OrgRole.MEMBER)[0] is False
+
+    def test_role_change_invalidates_entry(self, org, owner, member, file_cache):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role
+
+        assert check_role(member, org.id, min_role=OrgRole.ADMIN)[0] is False
+        OrganizationService.update_member_role(org.id, member.id, OrgRole.ADMIN)
+        assert check_role(member, org.id, min_role=OrgRole.ADMIN)[0] is True
+
+    def test_accepting_invitation_invalidates_entry(self, org, owner, non_member, file_cache):
+        from apps.invitations.models import Invitation
+        from apps.invitations.services import InvitationService
+        from core.permissions import check_role
+
+        invitation = Invitation.objects.create(organization=org, sender=owner, receiver=non_member)
+        assert check_role(non_member, org.id, min_role=OrgRole.MEMBER)[0] is False
+        InvitationService.accept(invitation_id=invitation.id)
+        assert check_role(non_member, org.id, min_role=OrgRole.MEMBER)[0] is True
+
+    def test_org_delete_invalidates_entry(self, org, owner, file_cache):
+        from apps.organizations.services import OrganizationService
+        from core.permissions import check_role
+
+        assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is True
+        OrganizationService.delete_organization(org_id=org.id)
+        assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is False
+
+    def test_skipped_with_a_per_process_cache(self, org, owner, django_assert_num_queries):
+        from core.permissions import check_role, role_cache
+
+        # The test settings keep LocMemCache, which other workers would never see bumps in.
+        with django_assert_num_queries(2):
+            check_role(owner, org.id, min_role=OrgRole.OWNER)
+            check_role(owner, org.id, min_role=OrgRole.OWNER)
+        assert role_cache.stats() == {"hits": 0, "misses": 0}
+
+    def test_entry_written_under_old_version_is_ignored(self, org, owner, file_cache):
+        from core.permissions import ORG_MEMBERSHIPS_SCOPE, USER_MEMBERSHIPS_SCOPE, check_role, role_cache
+        from core.versioning import bump_versions, get_versions, set_versioned
+
+        versions = get_versions((USER_MEMBERSHIPS_SCOPE, owner.id), (ORG_MEMBERSHIPS_SCOPE, org.id))
+        bump_versions((USER_MEMBERSHIPS_SCOPE, owner.id))
+        set_versioned(f"role:{owner.id}:{org.id}", "member", versions, None)
+
+        assert check_role(owner, org.id, min_role=OrgRole.OWNER)[0] is True
+        assert role_cache.stats()["misses"] == 1
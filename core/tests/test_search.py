@@ -0,0 +1,51 @@
+"""Tests for name normalization and trigram word similarity."""
+
+import pytest
+
+from core.search import normalize_name, search_terms, text_match, text_rank, word_similarity
+
+
+class TestNormalizeName:
+    @pytest.mark.parametrize(
+        ("raw", "expected"),
+        [
+            ("Søren", "soren"),
+            ("  José  María ", "jose maria"),
+            ("ÅSE", "ase"),
+            ("Æbelø", "aebelo"),
+            ("Straße", "strasse"),
+        ],
+    )
+    def test_normalizes(self, raw, expected):
+        assert normalize_name(raw) == expected
+
+
+class TestWordSimilarity:
+    def test_identical_word_scores_one(self):
+        assert word_similarity("anders", "anders") == 1.0
+
+    def test_scores_the_best_word(self):
+        assert word_similarity("jensen", "peter jensen") == 1.0
+
+    def test_typo_is_similar(self):
+        assert word_similarity("jensem", "jensen") >= 0.6
+
+    def test_unrelated_is_not(self):
+        assert word_similarity("jensen", "olsen") < 0.6
+
+    def test_empty(self):
+        assert word_similarity("", "jensen") == 0.0
+        assert word_similarity("jensen", "") == 0.0
+
+
+class TestTextSearch:
+    def test_terms_drop_query_syntax(self):
+        assert search_terms("Eat & (break:*) | !lunch") == ["eat", "break", "lunch"]
+
+    def test_match_needs_every_term_as_a_word_prefix(self):
+        assert text_match("eat breakfast", "eat break")
+        assert not text_match("great breakfast", "eat")
+
+    def test_rank_prefers_whole_words_and_short_documents(self):
+        assert text_rank("eat", "eat") > text_rank("eating", "eat")
+        assert text_rank("eat", "eat") > text_rank("eat breakfast", "eat")
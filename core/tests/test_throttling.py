@@ -1,5 +1,10 @@
 """Tests for rate-limiting throttle classes."""
 
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pytest
 from django.test import Client
 
@@ -102,3 +107,173 @@ class TestInvitationSendRateThrottle:
             **headers,
         )
         assert resp.status_code == 429
+
+
+class _FakeRequest:
+    auth = None
+    META = {"REMOTE_ADDR": "10.0.0.1"}
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["cache", "sqlite"])
+def throttle(request, settings, tmp_path):
+    from core.throttling import AnonGCRAThrottle
+
+    settings.THROTTLE_STORE = request.param
+    settings.THROTTLE_SQLITE_PATH = str(tmp_path / "throttle.sqlite3")
+
+    throttle = AnonGCRAThrottle(rate="5/min")
+    throttle.scope = "test"
+    throttle.timer = _Clock()  # type: ignore[assignment]
+    return throttle
+
+
+class TestGCRAThrottle:
+    def test_allows_burst_up_to_rate(self, throttle):
+        assert all(throttle.allow_request(_FakeRequest()) for _ in range(5))
+        assert throttle.allow_request(_FakeRequest()) is False
+
+    def test_refills_one_request_per_interval(self, throttle):
+        for _ in range(5):
+            throttle.allow_request(_FakeRequest())
+
+        assert throttle.allow_request(_FakeRequest()) is False
+        assert throttle.wait() == pytest.approx(12)
+
+        throttle.timer.now += 12
+        assert throttle.allow_request(_FakeRequest()) is True
+        assert throttle.allow_request(_FakeRequest()) is False
+
+    def test_full_bucket_after_a_period(self, throttle):
+        for _ in range(5):
+            throttle.allow_request(_FakeRequest())
+
+        throttle.timer.now += 60
+        assert all(throttle.allow_request(_FakeRequest()) for _ in range(5))
+
+    def test_state_is_a_single_timestamp(self, throttle, settings):
+        from django.core.cache import cache
+
+        settings.THROTTLE_STORE = "cache"
+        for _ in range(5):
+            throttle.allow_request(_FakeRequest())
+
+        assert cache.get("throttle_test_10.0.0.1") == (1_000_000 + 60) * 1000
+
+    def test_skips_authenticated_requests(self, throttle):
+        request = _FakeRequest()
+        request.auth = object()  # type: ignore[assignment]
+        assert all(throttle.allow_request(request) for _ in range(10))
+
+    @pytest.mark.parametrize(
+        ("rate", "expected"), [("5/min", (5, 60)), ("3/m", (3, 60)), ("100/2h", (100, 7200)), ("1/day", (1, 86400))]
+    )
+    def test_parse_rate(self, rate, expected):
+        from core.throttling import parse_rate
+
+        assert parse_rate(rate) == expected
+
+    @pytest.mark.parametrize("rate", ["5", "5/fortnight", "x/min"])
+    def test_parse_rate_rejects_invalid(self, rate):
+        from core.throttling import parse_rate
+
+        with pytest.raises(ValueError):
+            parse_rate(rate)
+
+
+def _take_in_worker(path: str) -> int:
+    from core.throttling import SQLiteThrottleStore
+
+    store = SQLiteThrottleStore(path)
+    return sum(store.take("throttle_test_shared", time.time(), 12.0, 48.0) == 0 for _ in range(5))
+
+
+class TestThrottleStores:
+    def test_sqlite_limit_is_shared_across_processes(self, tmp_path):
+        path = str(tmp_path / "throttle.sqlite3")
+        with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("fork")) as pool:
+            admitted = sum(pool.map(_take_in_worker, [path] * 4))
+
+        assert admitted == 5
+
+    def test_sqlite_purges_passed_keys(self, tmp_path):
+        from core.throttling import SQLiteThrottleStore
+
+        store = SQLiteThrottleStore(str(tmp_path / "throttle.sqlite3"))
+        store.purge_every = 2
+        store.take("old", 0.0, 12.0, 48.0)
+        store.take("new", 100.0, 12.0, 48.0)
+
+        keys = [row[0] for row in store._connection().execute("SELECT key FROM throttle")]
+        assert keys == ["new"]
+
+    def test_cache_store_refuses_without_advancing(self):
+        from django.core.cache import cache
+
+        from core.throttling import CacheThrottleStore
+
+        store = CacheThrottleStore()
+        assert store.take("k", 1000.0, 12.0, 0.0) == 0
+        assert store.take("k", 1000.0, 12.0, 0.0) == pytest.approx(12)
+        assert cache.get("k") == 1_012_000
+
+    def test_cache_store_is_atomic_under_concurrent_checks(self):
+        from django.core.cache import cache
+
+        from core.throttling import CacheThrottleStore
+
+        class SlowCache:
+            """Delegates to the real cache after a network-like delay."""
+
+            def __getattr__(self, name):
+                method = getattr(cache, name)
+
+                def slow(*args, **kwargs):
+                    time.sleep(0.01)
+                    return method(*args, **kwargs)
+
+                return slow
+
+        store = CacheThrottleStore(SlowCache())
+        barrier = threading.Barrier(20)
+
+        def check(_):
+            barrier.wait()
+            return store.take("k", 1000.0, 12.0, 48.0) == 0
+
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            admitted = sum(pool.map(check, range(20)))
+
+        assert admitted == 5
+
+    @pytest.mark.parametrize(
+        ("backend", "expected"),
+        [
+            ("django.core.cache.backends.locmem.LocMemCache", "SQLiteThrottleStore"),
+            ("django.core.cache.backends.filebased.FileBasedCache", "CacheThrottleStore"),
+        ],
+    )
+    def test_default_store_follows_the_cache(self, settings, tmp_path, backend, expected):
+        from core.throttling import get_throttle_store
+
+        settings.THROTTLE_STORE = ""
+        settings.THROTTLE_SQLITE_PATH = str(tmp_path / "throttle.sqlite3")
+        settings.CACHES = {"default": {"BACKEND": backend, "LOCATION": str(tmp_path / "cache")}}
+
+        assert type(get_throttle_store()).__name__ == expected
+
+    def test_unknown_store_is_rejected(self, settings):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from core.throttling import get_throttle_store
+
+        settings.THROTTLE_STORE = "memcached"
+        with pytest.raises(ImproperlyConfigured):
+            get_throttle_store()
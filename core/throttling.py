@@ -1,9 +1,232 @@
-"""Rate-limiting throttle classes for sensitive endpoints."""
+"""Rate-limiting throttle classes for sensitive endpoints.
 
-from ninja.throttling import AnonRateThrottle, AuthRateThrottle
+The throttles use GCRA (generic cell rate algorithm), the continuous form
+of a token bucket. Per key, the store holds a single number: the theoretical
+arrival time (TAT) of the next request. A rate of N requests per period
+spaces requests `period / N` seconds apart and allows bursts of up to N. A
+check reads and writes that one value, while ninja's `SimpleRateThrottle`
+reads and rewrites a list of up to N timestamps.
 
+Where the TAT lives is chosen by `settings.THROTTLE_STORE`:
 
-class LoginRateThrottle(AnonRateThrottle):
+- "cache": Django's default cache, updated with atomic `add()`/`incr()`.
+  Point `CACHES` at Redis or Memcached and every worker on every host
+  shares one limit. With `LocMemCache` each worker counts on its own.
+- "sqlite": a SQLite file at `settings.THROTTLE_SQLITE_PATH`, updated in
+  one write transaction. Every worker on the host shares one limit
+  without running a cache server.
+
+Left unset, the store is "cache" when that cache is shared by the workers
+and "sqlite" otherwise, so a per-process `LocMemCache` never silently
+multiplies every limit by the number of workers.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpRequest
+from ninja.throttling import BaseThrottle
+
+from core.versioning import cache_is_shared
+
+# Throttle instances are shared by all requests; wait() reads this thread's last result.
+_local = threading.local()
+
+_PERIODS = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600, "hour": 3600, "d": 86400, "day": 86400}
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse "<count>/<period>" (e.g. "5/min", "100/2h") into (count, seconds)."""
+    try:
+        count, period = rate.split("/", 1)
+        multiplier, unit = period.rstrip("abcdefghijklmnopqrstuvwxyz"), period.lstrip("0123456789")
+        return int(count), int(multiplier or 1) * _PERIODS[unit]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate format: {rate}") from None
+
+
+class ThrottleStore:
+    """Holds the TAT per key and admits requests against it atomically."""
+
+    def take(self, key: str, now: float, interval: float, tolerance: float) -> float:
+        """Admit one request for `key` at `now`.
+
+        Returns 0 and advances the TAT by `interval` if the TAT is at most
+        `tolerance` seconds ahead of `now`; otherwise leaves it unchanged and
+        returns the seconds until a request would be admitted.
+        """
+        raise NotImplementedError(".take() must be overridden")
+
+
+class CacheThrottleStore(ThrottleStore):
+    """TAT as integer milliseconds in Django's cache.
+
+    `incr()`, `add()` and `decr()` are atomic on the Redis and Memcached
+    backends (and within one process on `LocMemCache`), so concurrent
+    workers never lose an update. Each key expires when its TAT passes.
+    """
+
+    def __init__(self, cache=default_cache) -> None:
+        self.cache = cache
+
+    def take(self, key: str, now: float, interval: float, tolerance: float) -> float:
+        now_ms, interval_ms = int(now * 1000), max(int(interval * 1000), 1)
+        try:
+            tat = self.cache.incr(key, interval_ms)
+        except ValueError:  # No state yet: the bucket is full.
+            if self.cache.add(key, now_ms + interval_ms, timeout=self._timeout(interval_ms)):
+                return 0.0
+            return self.take(key, now, interval, tolerance)  # Another worker added it first.
+
+        previous = tat - interval_ms
+        if previous < now_ms:
+            # The bucket refilled while idle: move the TAT up to now.
+            tat = self.cache.incr(key, now_ms - previous)
+        wait_ms = tat - interval_ms - now_ms - tolerance * 1000
+        if wait_ms > 0:
+            try:
+                self.cache.decr(key, interval_ms)
+            except ValueError:
+                pass  # Expired meanwhile; nothing to undo.
+            return wait_ms / 1000
+        self.cache.touch(key, timeout=self._timeout(tat - now_ms))
+        return 0.0
+
+    @staticmethod
+    def _timeout(ahead_ms: int) -> int:
+        return max(math.ceil(ahead_ms / 1000), 1)
+
+
+class SQLiteThrottleStore(ThrottleStore):
+    """TAT per key in a SQLite file shared by the workers of one host.
+
+    Each check runs in a `BEGIN IMMEDIATE` transaction, which takes the
+    file's write lock, so processes see each other's updates exactly.
+    Keys whose TAT has passed are deleted every `purge_every` checks.
+    """
+
+    purge_every = 1000
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()  # sqlite3 connections are per thread
+        self._checks = 0
+
+    def take(self, key: str, now: float, interval: float, tolerance: float) -> float:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tat FROM throttle WHERE key = ?", (key,)).fetchone()
+            tat = max(row[0], now) if row else now
+            wait = tat - tolerance - now
+            if wait <= 0:
+                conn.execute(
+                    "INSERT INTO throttle (key, tat) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET tat = excluded.tat",
+                    (key, tat + interval),
+                )
+            self._checks += 1
+            if self._checks % self.purge_every == 0:
+                conn.execute("DELETE FROM throttle WHERE tat <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return max(wait, 0.0)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS throttle (key TEXT PRIMARY KEY, tat REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+
+_stores: dict[tuple[str, str], ThrottleStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_throttle_store() -> ThrottleStore:
+    """Return the process-wide store selected by `settings.THROTTLE_STORE`."""
+    kind = settings.THROTTLE_STORE or ("cache" if cache_is_shared() else "sqlite")
+    path = settings.THROTTLE_SQLITE_PATH
+    store = _stores.get((kind, path))
+    if store is None:
+        with _stores_lock:
+            store = _stores.get((kind, path))
+            if store is None:
+                if kind == "cache":
+                    store = CacheThrottleStore()
+                elif kind == "sqlite":
+                    store = SQLiteThrottleStore(path)
+                else:
+                    raise ImproperlyConfigured(f"Unknown THROTTLE_STORE: {kind!r} (expected 'cache' or 'sqlite')")
+                _stores[(kind, path)] = store
+    return store
+
+
+class GCRAThrottle(BaseThrottle):
+    """Throttle with constant-size per-key state; subclasses define `get_cache_key()`."""
+
+    timer = time.time
+    cache_format = "throttle_%(scope)s_%(ident)s"
+    scope: str = ""
+
+    def __init__(self, rate: str) -> None:
+        self.rate = rate
+        self.num_requests, self.duration = parse_rate(rate)
+        self.interval = self.duration / self.num_requests
+        # How far the TAT may run ahead of now; allows a burst of num_requests.
+        self.tolerance = self.duration - self.interval
+
+    def get_cache_key(self, request: HttpRequest) -> str | None:
+        """Return the throttling key for this request, or None to skip throttling."""
+        raise NotImplementedError(".get_cache_key() must be overridden")
+
+    def allow_request(self, request: HttpRequest) -> bool:
+        key = self.get_cache_key(request)
+        if key is None:
+            return True
+
+        wait = get_throttle_store().take(key, self.timer(), self.interval, self.tolerance)
+        _local.wait = wait or None
+        return not wait
+
+    def wait(self) -> float | None:
+        """Seconds until the last throttled request of this thread would be allowed."""
+        return getattr(_local, "wait", None)
+
+
+class AnonGCRAThrottle(GCRAThrottle):
+    """Throttle unauthenticated requests per client IP."""
+
+    def get_cache_key(self, request: HttpRequest) -> str | None:
+        if getattr(request, "auth", None) is not None:
+            return None  # Only throttle unauthenticated requests.
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class AuthGCRAThrottle(GCRAThrottle):
+    """Throttle per authenticated user, falling back to the client IP."""
+
+    def get_cache_key(self, request: HttpRequest) -> str | None:
+        auth = getattr(request, "auth", None)
+        if auth is not None:
+            ident = hashlib.sha256(str(auth).encode()).hexdigest()
+        else:
+            ident = self.get_ident(request) or ""
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class LoginRateThrottle(AnonGCRAThrottle):
     """Limit login attempts to 5/min per IP."""
 
     scope = "login"
@@ -12,7 +235,7 @@ class LoginRateThrottle(AnonRateThrottle):
         super().__init__(rate="5/min")
 
 
-class RegisterRateThrottle(AnonRateThrottle):
+class RegisterRateThrottle(AnonGCRAThrottle):
     """Limit registration attempts to 3/min per IP."""
 
     scope = "register"
@@ -21,7 +244,25 @@ class RegisterRateThrottle(AnonRateThrottle):
         super().__init__(rate="3/min")
 
 
-class InvitationSendRateThrottle(AuthRateThrottle):
+class TokenVerifyBatchRateThrottle(AnonGCRAThrottle):
+    """Limit batch token verification to 60/min per IP."""
+
+    scope = "token_verify_batch"
+
+    def __init__(self) -> None:
+        super().__init__(rate="60/min")
+
+
+class TokenRefreshRolesRateThrottle(AnonGCRAThrottle):
+    """Limit org_roles refreshes to 30/min per IP."""
+
+    scope = "token_refresh_roles"
+
+    def __init__(self) -> None:
+        super().__init__(rate="30/min")
+
+
+class InvitationSendRateThrottle(AuthGCRAThrottle):
     """Limit invitation sends to 10/min per authenticated user."""
 
     scope = "invitation_send"
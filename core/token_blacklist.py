@@ -0,0 +1,116 @@
+"""In-process index of blacklisted refresh-token JTIs.
+
+ninja_jwt answers "is this token blacklisted?" with a `BlacklistedToken`
+query on every refresh. `BlacklistIndex` keeps the blacklisted JTIs of the
+current process in memory and catches up on entries written by other
+workers with one id-range query at most every `JWT_BLACKLIST_SYNC_INTERVAL`
+seconds. Tokens blacklisted by this process are added immediately, so the
+delay only applies across workers.
+
+Ids are allocated when a row is inserted but become visible when its
+transaction commits, so a row can appear below an id that was already read.
+Each sync therefore re-reads from the highest id seen by the last sync that
+is at least `JWT_BLACKLIST_SYNC_MARGIN` seconds old, not from the latest
+one: a row is picked up as long as it commits within that margin.
+
+Entries are dropped once their token has expired, since an expired token is
+rejected before the blacklist is consulted.
+
+`purge_expired_batch()` deletes expired `OutstandingToken` rows (and their
+`BlacklistedToken` rows) in bounded, id-ordered batches; see the
+`purge_expired_tokens` management command.
+"""
+
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from ninja_jwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from ninja_jwt.utils import aware_utcnow
+
+
+class BlacklistIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._expiry: dict[str, float] = {}  # jti -> expires_at (epoch seconds)
+        self._high_water = 0  # highest BlacklistedToken.id seen
+        self._marks: deque[tuple[float, int]] = deque()  # (time.monotonic(), high water) per sync
+        self._synced_at: float | None = None  # time.monotonic() of the last sync
+
+    def __contains__(self, jti: str) -> bool:
+        self._sync_if_due()
+        return jti in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Record a token blacklisted by this process."""
+        with self._lock:
+            self._expiry[jti] = expires_at
+
+    def sync(self) -> None:
+        """Load blacklist entries written since the last sync and drop expired ones."""
+        with self._lock:
+            synced_at = time.monotonic()
+            rows = (
+                BlacklistedToken.objects.filter(id__gt=self._rescan_from(synced_at))
+                .order_by("id")
+                .values_list("id", "token__jti", "token__expires_at")
+            )
+            for row_id, jti, expires_at in rows:
+                self._expiry[jti] = expires_at.timestamp()
+                self._high_water = max(self._high_water, row_id)
+
+            now = time.time()
+            for jti in [jti for jti, expires_at in self._expiry.items() if expires_at <= now]:
+                del self._expiry[jti]
+            self._marks.append((synced_at, self._high_water))
+            self._synced_at = synced_at
+
+    def reset(self) -> None:
+        """Forget everything; the next lookup reloads the whole blacklist."""
+        with self._lock:
+            self._expiry.clear()
+            self._high_water = 0
+            self._marks.clear()
+            self._synced_at = None
+
+    def _rescan_from(self, now: float) -> int:
+        # The high water of the newest sync at least JWT_BLACKLIST_SYNC_MARGIN old; 0 if there is none yet.
+        cutoff = now - settings.JWT_BLACKLIST_SYNC_MARGIN
+        while len(self._marks) > 1 and self._marks[1][0] <= cutoff:
+            self._marks.popleft()
+        if self._marks and self._marks[0][0] <= cutoff:
+            return self._marks[0][1]
+        return 0
+
+    def _sync_if_due(self) -> None:
+        synced_at = self._synced_at
+        if synced_at is None or time.monotonic() - synced_at >= settings.JWT_BLACKLIST_SYNC_INTERVAL:
+            self.sync()
+
+
+blacklist_index = BlacklistIndex()
+
+
+def purge_expired_batch(*, after_id: int = 0, batch_size: int = 1000) -> tuple[int | None, int, int]:
+    """Delete up to `batch_size` expired tokens with an id above `after_id`.
+
+    Returns (last_id, outstanding_deleted, blacklisted_deleted). `last_id` is
+    the highest OutstandingToken id in the batch, or None when nothing is left.
+    """
+    ids = list(
+        OutstandingToken.objects.filter(id__gt=after_id, expires_at__lte=aware_utcnow())
+        .order_by("id")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    if not ids:
+        return None, 0, 0
+
+    with transaction.atomic():
+        blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+    return ids[-1], outstanding, blacklisted
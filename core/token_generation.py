@@ -0,0 +1,70 @@
+"""Per-user token generation: revoke every token of a user with one update.
+
+Tokens issued at login carry the user's `token_generation` in the `gen`
+claim. `bump_token_generation()` increments the column, after which every
+token carrying an older number is rejected by authentication, refresh and
+verify. The current number is read through Django's cache for up to
+`TOKEN_GENERATION_CACHE_TIMEOUT` seconds, so checks that have no `User` row
+at hand (claims-only auth, refresh, verify) normally skip the database.
+A bump deletes the cached number, which reaches every worker only when that
+cache is shared; with a per-process cache (LocMemCache) other workers keep
+accepting revoked tokens until their entry expires, so the timeout is the
+revocation lag. Tokens issued before this claim existed count as
+generation 0.
+"""
+
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from ninja_jwt.exceptions import TokenError
+from ninja_jwt.settings import api_settings
+
+from apps.users.models import User
+
+GENERATION_CLAIM = "gen"
+
+
+def _cache_key(user_id: int) -> str:
+    return f"token_generation:{user_id}"
+
+
+def token_generation(payload: Any) -> int:
+    """The generation a token was issued with."""
+    generation: int = payload.get(GENERATION_CLAIM, 0)
+    return generation
+
+
+def current_generation(user_id: int) -> int | None:
+    """The user's current generation, or None if the user no longer exists."""
+    timeout = settings.TOKEN_GENERATION_CACHE_TIMEOUT
+    key = _cache_key(user_id)
+    generation: int | None = cache.get(key) if timeout else None
+    if generation is None:
+        generation = User.objects.filter(id=user_id).values_list("token_generation", flat=True).first()
+        if generation is not None and timeout:
+            cache.set(key, generation, timeout=timeout)
+    return generation
+
+
+def check_token_generation(payload: Any) -> None:
+    """Raise TokenError if the token's generation has been revoked."""
+    current = current_generation(payload[api_settings.USER_ID_CLAIM])
+    if current is None or token_generation(payload) != current:
+        raise TokenError("Token has been revoked")
+
+
+def bump_token_generation(user_id: int) -> None:
+    """Revoke every token issued to the user so far."""
+    User.objects.filter(id=user_id).update(token_generation=F("token_generation") + 1)
+    forget_token_generation(user_id)
+
+
+def forget_token_generation(user_id: int) -> None:
+    """Drop the cached generation after the user's row changed or was deleted."""
+    key = _cache_key(user_id)
+    cache.delete(key)
+    # Drop it again on commit, in case a concurrent reader cached the old value meanwhile.
+    transaction.on_commit(lambda: cache.delete(key))
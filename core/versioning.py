@@ -0,0 +1,95 @@
+"""Cache-backed version stamps for invalidating derived state.
+
+A version is the wall-clock time of the last change to a scope, e.g. the
+memberships of one user. Callers compare a timestamp they captured earlier
+(such as a token's `iat`) against the current version: anything captured
+at or before the last bump is stale. A missing key (never bumped, or
+evicted from the cache) is initialised to "now", so a cache flush errs on
+the side of treating everything as stale.
+
+`get_versioned()`/`set_versioned()` store derived values together with the
+versions they were computed under, and read both back in one round trip.
+
+Versions are only seen by every worker when Django's default cache is
+shared between processes; `cache_is_shared()` tells callers whether it is.
+"""
+
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+Stamp = tuple[str, object]
+
+# Returned by get_versioned() when no value is stored under the current versions.
+MISSING = object()
+
+# Backends whose entries live in (or never leave) the current process.
+_PROCESS_LOCAL_BACKENDS = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+
+def cache_is_shared() -> bool:
+    """Whether Django's default cache is one store for all workers (e.g. Redis), not one per process."""
+    return settings.CACHES["default"]["BACKEND"] not in _PROCESS_LOCAL_BACKENDS
+
+
+def _cache_key(scope: str, key: object) -> str:
+    return f"version:{scope}:{key}"
+
+
+def _read(extra_keys: list[str], stamps: tuple[Stamp, ...]) -> tuple[dict[str, Any], list[float]]:
+    version_keys = [_cache_key(scope, key) for scope, key in stamps]
+    found = cache.get_many(extra_keys + version_keys)
+    now = time.time()
+    for key in version_keys:
+        if key not in found:
+            found[key] = cache.get_or_set(key, now, timeout=None)
+    return found, [float(found[key]) for key in version_keys]
+
+
+def get_versions(*stamps: Stamp) -> list[float]:
+    """Return the current version of each (scope, key) pair in one cache round trip."""
+    return _read([], stamps)[1]
+
+
+def bump_versions(*stamps: Stamp) -> None:
+    """Mark each (scope, key) pair as changed now.
+
+    The bump is applied immediately and again when the surrounding transaction
+    commits, so readers that repopulate derived state from the database before
+    the commit is visible are invalidated a second time.
+    """
+    keys = [_cache_key(scope, key) for scope, key in stamps]
+
+    def _bump() -> None:
+        now = time.time()
+        cache.set_many({key: now for key in keys}, timeout=None)
+
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def get_versioned(key: str, *stamps: Stamp) -> tuple[Any, list[float]]:
+    """Return (value, versions) for a cached value derived from the given scopes.
+
+    The value is MISSING unless it was stored by set_versioned() under exactly
+    the current versions. Pass the returned versions to set_versioned() after
+    recomputing, so a bump that lands in between is not overwritten.
+    """
+    found, versions = _read([key], stamps)
+    entry = found.get(key)
+    if entry is None or entry[0] != versions:
+        return MISSING, versions
+    return entry[1], versions
+
+
+def set_versioned(key: str, value: Any, versions: list[float], timeout: int | None) -> None:
+    """Store a value computed under the given versions (see get_versioned())."""
+    cache.set(key, (versions, value), timeout)